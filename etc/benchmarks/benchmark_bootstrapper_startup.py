@@ -0,0 +1,89 @@
+#
+# Copyright 2018-2021 Elyra Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the time until the bootstrapper is able to access object storage
+
+Compares the command chain that the NotebookOp used to run before the bootstrapper,
+followed by the installation of the object storage client, with the bootstrapper zipapp.
+
+To run this benchmark from the root of the repository:
+1. Build the zipapp: make bootstrapper-zipapp
+2. python etc/benchmarks/benchmark_bootstrapper_startup.py
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BOOTSTRAPPER_DIR = 'etc/docker-scripts'
+REQUIREMENTS_FILE = 'etc/requirements-elyra.txt'
+IMPORT_BOOTSTRAPPER = 'import bootstrapper, minio'
+
+
+def get_requirement(package):
+    with open(REQUIREMENTS_FILE) as f:
+        for line in f:
+            if line.startswith(package + '=='):
+                return line.strip()
+    raise ValueError(f"{package} not found in {REQUIREMENTS_FILE}")
+
+
+def run_pip_chain(work_dir):
+    """pip install packaging, pip freeze, installation of minio by the bootstrapper and its imports"""
+    target_dir = os.path.join(work_dir, 'python3')
+    subprocess.run([sys.executable, '-m', 'pip', 'install', '-q', 'packaging'], check=True)
+    with open(os.path.join(work_dir, 'requirements-current.txt'), 'w') as f:
+        subprocess.run([sys.executable, '-m', 'pip', 'freeze'], stdout=f, check=True)
+    subprocess.run([sys.executable, '-m', 'pip', 'install', '-q', '--no-cache-dir', '--target=' + target_dir,
+                    get_requirement('minio')], check=True)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([target_dir, os.path.abspath(BOOTSTRAPPER_DIR)]))
+    subprocess.run([sys.executable, '-c', IMPORT_BOOTSTRAPPER], env=env, check=True)
+
+
+def run_zipapp(zipapp):
+    """imports of the bootstrapper and minio from the zipapp"""
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(zipapp))
+    subprocess.run([sys.executable, '-c', IMPORT_BOOTSTRAPPER], env=env, check=True)
+
+
+def measure(func, repeat, *args):
+    durations = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            t0 = time.time()
+            func(*(args or (work_dir,)))
+            durations.append(time.time() - t0)
+    return statistics.median(durations)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--zipapp', default='dist/bootstrapper.pyz', help='Bootstrapper zipapp')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each command chain')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.zipapp):
+        sys.exit(f"{args.zipapp} not found, run 'make bootstrapper-zipapp' first")
+
+    print(f"{'startup':>10} {'median secs':>12}")
+    print(f"{'pip':>10} {measure(run_pip_chain, args.repeat):>12.2f}")
+    print(f"{'zipapp':>10} {measure(run_zipapp, args.repeat, args.zipapp):>12.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#
+# Copyright 2018-2021 Elyra Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the upload throughput of FileOpBase.put_file_to_object_storage
+
+To run this benchmark from the root of the repository:
+1. Launch a local MinIO instance: make test-start-minio
+2. python etc/benchmarks/benchmark_multipart_upload.py --size 1Gi
+3. Stop the MinIO instance: make test-stop-minio
+"""
+import argparse
+import minio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('etc/docker-scripts/')
+import bootstrapper
+
+MINIO_HOST_PORT = os.getenv("MINIO_HOST_PORT", "127.0.0.1:9000")
+BUCKET_NAME = "benchmark-bucket"
+MIB = 1024 * 1024
+
+
+def run(op, file_to_upload, file_size, part_size, workers):
+    """Uploads file_to_upload and returns the throughput in MiB/s.  A part size of None
+    selects the library default (minio's fput_object), a part size of 0 the adaptive size."""
+    if part_size is None:
+        op.multipart_threshold = file_size + 1
+    else:
+        op.multipart_threshold = 0
+        op.multipart_part_size = part_size
+        op.multipart_upload_workers = workers
+    t0 = time.time()
+    op.put_file_to_object_storage(file_to_upload, 'benchmark-object')
+    return file_size / MIB / (time.time() - t0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', default='256Mi', help='Size of the uploaded file, e.g. 256Mi or 2Gi')
+    parser.add_argument('--part-sizes', default='8Mi,16Mi,64Mi', help='Comma separated part sizes')
+    parser.add_argument('--workers', default='1,4,8', help='Comma separated numbers of part upload workers')
+    args = parser.parse_args()
+
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "minioadmin")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "minioadmin")
+    bootstrapper.enable_pipeline_info = False
+
+    cos_client = minio.Minio(MINIO_HOST_PORT,
+                             access_key=os.environ["AWS_ACCESS_KEY_ID"],
+                             secret_key=os.environ["AWS_SECRET_ACCESS_KEY"],
+                             secure=False)
+    if not cos_client.bucket_exists(BUCKET_NAME):
+        cos_client.make_bucket(BUCKET_NAME)
+
+    op = bootstrapper.FileOpBase.get_instance(**{'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                                                 'cos-bucket': BUCKET_NAME,
+                                                 'filepath': 'benchmark.py'})
+
+    file_size = bootstrapper.OpUtil.parse_size(args.size)
+    with tempfile.NamedTemporaryFile() as f:
+        for _ in range(0, file_size, MIB):
+            f.write(os.urandom(min(MIB, file_size - f.tell())))
+        f.flush()
+
+        print(f"Uploading {file_size / MIB:.0f} MiB to {MINIO_HOST_PORT}")
+        print(f"{'part size':>12} {'workers':>8} {'MiB/s':>10}")
+        print(f"{'default':>12} {'-':>8} {run(op, f.name, file_size, None, 0):>10.1f}")
+        throughput = run(op, f.name, file_size, 0, 4)
+        print(f"{'adaptive':>12} {op.multipart_upload_workers:>8} {throughput:>10.1f}")
+        for part_size in args.part_sizes.split(','):
+            for workers in args.workers.split(','):
+                throughput = run(op, f.name, file_size, bootstrapper.OpUtil.parse_size(part_size), int(workers))
+                print(f"{part_size:>12} {workers:>8} {throughput:>10.1f}")
+
+    cos_client.remove_object(BUCKET_NAME, 'benchmark-object')
+    cos_client.remove_bucket(BUCKET_NAME)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#
+# Copyright 2018-2021 Elyra Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Measures the peak memory usage and wall time of the notebook kernel selection, execution and html export
+
+Compares reading the notebook from disk for each step, as the bootstrapper used to do, with sharing
+the notebook node across the steps.  Each mode is run in a separate process so that the peak resident
+set sizes can be compared.
+
+To run this benchmark from the root of the repository:
+    python etc/benchmarks/benchmark_notebook_parsing.py
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import nbformat
+
+BOOTSTRAPPER_DIR = 'etc/docker-scripts'
+
+MODES = {
+    'legacy': """
+kernel_name = NotebookFileOp.find_best_kernel('notebook.ipynb')
+papermill.execute_notebook('notebook.ipynb', 'notebook-output.ipynb', kernel_name=kernel_name,
+                           progress_bar=False)
+NotebookFileOp.convert_notebook_to_html('notebook-output.ipynb', 'notebook.html')
+""",
+    'shared': """
+kernel_name = NotebookFileOp.find_best_kernel(nbformat.read('notebook.ipynb', as_version=4))
+output_nb = papermill.execute_notebook('notebook.ipynb', 'notebook-output.ipynb', kernel_name=kernel_name,
+                                       progress_bar=False)
+NotebookFileOp.convert_notebook_to_html(output_nb, 'notebook.html')
+""",
+}
+
+RUN_MODE = """
+import json, logging, resource, sys, time
+import nbformat, papermill
+from bootstrapper import NotebookFileOp
+
+logging.disable(logging.CRITICAL)
+t0 = time.time()
+{mode}
+print(json.dumps({{'wall_time': time.time() - t0,
+                  'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def write_notebook(path, cells, output_size):
+    """Writes a notebook whose cells each print output_size bytes, the executed notebook is
+    therefore much larger than the notebook itself
+    """
+    nb = nbformat.v4.new_notebook()
+    nb.metadata.kernelspec = {'name': 'python3', 'display_name': 'Python 3', 'language': 'python'}
+    for i in range(cells):
+        nb.cells.append(nbformat.v4.new_code_cell(f"print('{i % 10}' * {output_size})"))
+    nbformat.write(nb, path)
+
+
+def run_mode(mode, work_dir):
+    env = dict(os.environ, PYTHONPATH=os.path.abspath(BOOTSTRAPPER_DIR))
+    result = subprocess.run([sys.executable, '-c', RUN_MODE.format(mode=MODES[mode])],
+                            cwd=work_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                            check=True)
+    return json.loads(result.stdout.decode().strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cells', type=int, default=20, help='Number of cells of the notebook')
+    parser.add_argument('--output-size', type=int, default=1024 * 1024, help='Size of the output of each cell')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each mode')
+    args = parser.parse_args()
+
+    print(f"{'mode':>10} {'median secs':>12} {'peak rss KiB':>14}")
+    with tempfile.TemporaryDirectory() as work_dir:
+        write_notebook(os.path.join(work_dir, 'notebook.ipynb'), args.cells, args.output_size)
+        for mode in MODES:
+            results = [run_mode(mode, work_dir) for _ in range(args.repeat)]
+            wall_time = statistics.median(result['wall_time'] for result in results)
+            peak_rss = max(result['peak_rss'] for result in results)
+            print(f"{mode:>10} {wall_time:>12.2f} {peak_rss:>14}")
+
+
+if __name__ == '__main__':
+    main()
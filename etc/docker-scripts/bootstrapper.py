@@ -13,19 +13,36 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+import base64
+import compileall
+import csv
 import glob
+import hashlib
+import html
+import importlib.util
+import io
 import json
 import logging
+import math
+import multiprocessing
 import os
+import random
+import re
+import resource
+import shutil
 import subprocess
 import sys
+import sysconfig
+import tarfile
+import threading
 import time
 
 from abc import ABC, abstractmethod
-from packaging import version
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from functools import partial, total_ordering
 from pathlib import Path
-from tempfile import TemporaryFile
-from typing import Optional, Any, Type, TypeVar
+from tempfile import NamedTemporaryFile, TemporaryFile, mkdtemp
+from typing import Optional, Any, Callable, Iterable, Iterator, List, Tuple, Type, TypeVar
 from urllib.parse import urljoin
 from urllib.parse import urlparse
 from urllib.parse import urlunparse
@@ -34,6 +51,66 @@ from urllib.parse import urlunparse
 # same-named variable in _notebook_op.py must be updated!
 INOUT_SEPARATOR = ';'
 
+# Minimum and maximum part size, and maximum number of parts of an S3 multipart upload
+MULTIPART_MIN_PART_SIZE = 5 * 1024 * 1024
+MULTIPART_MAX_PART_SIZE = 5 * 1024 * 1024 * 1024
+MULTIPART_MAX_PARTS = 10000
+
+# User metadata that stores the SHA-256 digest of uploaded outputs
+SHA256_METADATA_KEY = 'X-Amz-Meta-Elyra-Sha256'
+
+# Suffix of the files that store the SHA-256 digests of object cache entries
+DIGEST_SUFFIX = '.sha256'
+
+# Bucket prefix of the snapshots of installed python packages
+SITE_PACKAGES_SNAPSHOT_PREFIX = 'elyra-site-packages/'
+
+# Papermill engine that executes notebooks in a kernel that was started ahead of the execution
+PREWARMED_KERNEL_ENGINE = 'elyra-prewarmed-kernel'
+
+# Modules imported lazily by the bootstrapper, whose import times can be reported after precompilation
+LAZY_IMPORT_MODULES = ['minio', 'papermill', 'nbconvert']
+
+# File extensions of externalized outputs by mime type, outputs of types marked True are base64 encoded
+EXTERNALIZED_OUTPUT_TYPES = {
+    'image/png': ('.png', True),
+    'image/jpeg': ('.jpg', True),
+    'image/gif': ('.gif', True),
+    'application/pdf': ('.pdf', True),
+    'image/svg+xml': ('.svg', False),
+    'text/html': ('.html', False),
+    'text/markdown': ('.md', False),
+    'text/latex': ('.tex', False),
+    'text/plain': ('.txt', False),
+    'application/javascript': ('.js', False),
+    'application/json': ('.json', False),
+}
+
+# Runs a python script under cProfile, unlike 'python -m cProfile' the exit status of the script is preserved
+PROFILE_SCRIPT = """
+import cProfile, runpy, sys
+script, stats_file = sys.argv[1], sys.argv[2]
+sys.argv = [script]
+profiler = cProfile.Profile()
+try:
+    profiler.runcall(runpy.run_path, script, run_name='__main__')
+finally:
+    profiler.dump_stats(stats_file)
+"""
+
+# Page of the html files rendered using the minimal template of the fast html export mode
+FAST_HTML_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
 # Setup forward reference for type hint on return from class factory method.  See
 # https://stackoverflow.com/questions/39205527/can-you-annotate-return-type-when-value-is-instance-of-cls/39205612#39205612
 F = TypeVar('F', bound='FileOpBase')
@@ -80,6 +157,42 @@ class FileOpBase(ABC):
                                       secret_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
                                       secure=self.secure)
 
+        # Maximum number of concurrent object storage downloads.  The minio client
+        # is backed by a thread-safe connection pool and is shared by all workers.
+        self.max_download_workers = max(1, int(os.getenv('ELYRA_MAX_DOWNLOAD_WORKERS', '8')))
+        # Maximum number of concurrent object storage uploads.
+        self.max_upload_workers = max(1, int(os.getenv('ELYRA_MAX_UPLOAD_WORKERS', '8')))
+        # Extract the dependency archive while it is being downloaded instead of
+        # storing it in the local file system before it is expanded.
+        self.stream_dependencies_archive = \
+            os.getenv('ELYRA_STREAM_DEPENDENCIES_ARCHIVE', 'false').lower() == 'true'
+        # Files of at least this size are uploaded as multipart uploads whose parts are
+        # uploaded concurrently.  The part size is derived from the file size unless set.
+        self.multipart_threshold = OpUtil.parse_size(os.getenv('ELYRA_MULTIPART_THRESHOLD', '64Mi'))
+        self.multipart_part_size = OpUtil.parse_size(os.getenv('ELYRA_MULTIPART_PART_SIZE', '0'))
+        self.multipart_upload_workers = max(1, int(os.getenv('ELYRA_MULTIPART_UPLOAD_WORKERS', '4')))
+        # Objects of at least this size are downloaded using concurrent byte-range requests.
+        self.ranged_download_threshold = OpUtil.parse_size(os.getenv('ELYRA_RANGED_DOWNLOAD_THRESHOLD', '64Mi'))
+        self.ranged_download_chunk_size = OpUtil.parse_size(os.getenv('ELYRA_RANGED_DOWNLOAD_CHUNK_SIZE', '16Mi'))
+        self.ranged_download_workers = max(1, int(os.getenv('ELYRA_RANGED_DOWNLOAD_WORKERS', '4')))
+        # Outputs and metrics that subclasses add to the KFP UI metadata and KFP metrics files,
+        # which are written by process_metrics_and_metadata
+        self.ui_metadata_outputs = []
+        self.metrics = []
+        # Policies for retrying downloads and uploads that fail with transient errors
+        self.download_retry_policy = RetryPolicy.from_env('download')
+        self.upload_retry_policy = RetryPolicy.from_env('upload')
+        # Do not upload files that are identical to the object that is stored under the same name
+        self.skip_unchanged_outputs = os.getenv('ELYRA_SKIP_UNCHANGED_OUTPUTS', 'false').lower() == 'true'
+        # Cleared while the packages are installed concurrently with other phases
+        self.packages_installed = threading.Event()
+        self.packages_installed.set()
+        # Node-local cache of downloaded and uploaded objects
+        self.object_cache = None
+        if self.input_params.get('cache-dir'):
+            self.object_cache = ObjectCache(self.input_params.get('cache-dir'),
+                                            OpUtil.parse_size(self.input_params.get('cache-size-limit') or '10Gi'))
+
     @abstractmethod
     def execute(self) -> None:
         """Execute the operation relative to derived class"""
@@ -89,7 +202,8 @@ class FileOpBase(ABC):
         """Process dependencies
 
         If a dependency archive is present, it will be downloaded from object storage
-        and expanded into the local directory.
+        and expanded into the local directory.  If ELYRA_STREAM_DEPENDENCIES_ARCHIVE is
+        enabled the archive is extracted as it is downloaded and never stored locally.
 
         This method can be overridden by subclasses, although overrides should first
         call the superclass method.
@@ -98,18 +212,40 @@ class FileOpBase(ABC):
         t0 = time.time()
         archive_file = self.input_params.get('cos-dependencies-archive')
 
-        self.get_file_from_object_storage(archive_file)
-
+        files_to_get = []
         inputs = self.input_params.get('inputs')
         if inputs:
             input_list = inputs.split(INOUT_SEPARATOR)
             for file in input_list:
-                self.get_file_from_object_storage(file.strip())
+                files_to_get.append(file.strip())
+
+        if self.stream_dependencies_archive:
+            # extract the archive while the inputs are being downloaded
+            def extract_archive() -> None:
+                self.extract_archive_from_object_storage(archive_file)
+                self.archive_extracted()
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                extraction = executor.submit(extract_archive)
+                if files_to_get:
+                    self.get_files_from_object_storage(files_to_get)
+            extraction.result()
+        else:
+            self.get_files_from_object_storage([archive_file] + files_to_get)
+            subprocess.call(['tar', '-zxvf', archive_file])
+            self.archive_extracted()
 
-        subprocess.call(['tar', '-zxvf', archive_file])
         duration = time.time() - t0
         OpUtil.log_operation_info("dependencies processed", duration)
 
+    def archive_extracted(self) -> None:
+        """Called once the dependency archive, which contains the file to execute, has been
+        extracted, possibly while the inputs are still being downloaded.
+
+        This method can be overridden by subclasses to prepare the execution.
+        """
+        pass
+
     def process_outputs(self) -> None:
         """Process outputs
 
@@ -123,8 +259,9 @@ class FileOpBase(ABC):
         outputs = self.input_params.get('outputs')
         if outputs:
             output_list = outputs.split(INOUT_SEPARATOR)
-            for file in output_list:
-                self.process_output_file(file.strip())
+            self.put_files_to_object_storage(matched_file
+                                             for file in output_list
+                                             for matched_file in self.expand_output_file(file.strip()))
         duration = time.time() - t0
         OpUtil.log_operation_info('outputs processed', duration)
 
@@ -253,6 +390,7 @@ class FileOpBase(ABC):
                               bucket_url),
             'type': 'markdown'
         })
+        metadata['outputs'].extend(self.ui_metadata_outputs)
 
         # print the content of the augmented metadata file
         logger.debug('Output UI metadata: {}'.format(json.dumps(metadata)))
@@ -264,6 +402,28 @@ class FileOpBase(ABC):
         with open(ui_metadata_output, 'w') as f:
             json.dump(metadata, f)
 
+        #
+        # Augment kfp_metrics_filename with the metrics of the operation
+        if self.metrics:
+            metrics_output = output_path / kfp_metrics_filename
+            try:
+                # re-load the file
+                with open(metrics_output, 'r') as f:
+                    metrics = json.load(f)
+            except Exception:
+                # ignore all errors
+                metrics = {}
+
+            # Assure the 'metrics' property exists and is of the correct type
+            if not isinstance(metrics, dict) or not isinstance(metrics.get('metrics'), list):
+                metrics = {'metrics': []}
+            metrics['metrics'].extend(self.metrics)
+
+            logger.debug('Saving metrics file as {} ...'
+                         .format(metrics_output))
+            with open(metrics_output, 'w') as f:
+                json.dump(metrics, f)
+
         duration = time.time() - t0
         OpUtil.log_operation_info('metrics and metadata processed', duration)
 
@@ -282,19 +442,178 @@ class FileOpBase(ABC):
         """
 
         object_to_get = self.get_object_storage_filename(file_to_get)
+        self._get_object(file_to_get, object_to_get)
+
+    def get_files_from_object_storage(self, files_to_get: List[str]) -> None:
+        """Utility function to concurrently get multiple files from an object storage
+
+        At most ELYRA_MAX_DOWNLOAD_WORKERS files are downloaded at the same time.  If
+        any download fails, the first error is raised once all downloads have ended.
+
+        :param files_to_get: list of filenames, files that are listed more than once are downloaded once
+        """
+
+        # Resolve object names up front so that they are derived in a predictable order, downloading
+        # a file twice at the same time would have both downloads write to the same '.part' file
+        objects_to_get = [(file, self.get_object_storage_filename(file)) for file in dict.fromkeys(files_to_get)]
+        workers = min(self.max_download_workers, len(objects_to_get)) or 1
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._get_object, file, object_name) for file, object_name in objects_to_get]
+        for future in futures:
+            future.result()  # re-raise errors, if any
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"downloaded {len(objects_to_get)} file(s) from bucket: {self.cos_bucket} "
+                                  f"using {workers} worker(s)", duration)
+
+    def _get_object(self, file_to_get: str, object_to_get: str) -> None:
+        """Downloads object_to_get into file_to_get and logs the duration of the download
+
+        The object is stored in a '.part' file that is renamed once the download completed.
+        Objects of at least ELYRA_RANGED_DOWNLOAD_THRESHOLD bytes are downloaded using
+        concurrent byte-range requests.  If a node-local cache is configured, the object is
+        retrieved from the cache if it contains the object's current version.
+        """
         t0 = time.time()
-        self.cos_client.fget_object(bucket_name=self.cos_bucket,
-                                    object_name=object_to_get,
-                                    file_path=file_to_get)
+        stat = self.download_retry_policy.call(f"stat of {object_to_get}",
+                                               self.cos_client.stat_object,
+                                               bucket_name=self.cos_bucket,
+                                               object_name=object_to_get)
+
+        if self.object_cache and self.object_cache.get(self.cos_bucket, object_to_get, stat.etag, file_to_get):
+            duration = time.time() - t0
+            OpUtil.log_operation_info(f"retrieved {file_to_get} from cache for bucket: {self.cos_bucket}, "
+                                      f"object: {object_to_get}", duration)
+            return
+
+        if os.path.dirname(file_to_get):
+            os.makedirs(os.path.dirname(file_to_get), exist_ok=True)
+        file_part_path = file_to_get + '.part'
+        with open(file_part_path, 'wb') as f:
+            if hasattr(os, 'posix_fallocate') and stat.size:
+                os.posix_fallocate(f.fileno(), 0, stat.size)
+            else:
+                f.truncate(stat.size)
+
+        try:
+            if stat.size >= self.ranged_download_threshold:
+                self._get_object_ranges(file_part_path, object_to_get, stat.etag, stat.size)
+            else:
+                self._get_object_range(file_part_path, object_to_get, stat.etag, 0, stat.size)
+        except Exception:
+            os.remove(file_part_path)
+            raise
+        os.replace(file_part_path, file_to_get)
+        if self.object_cache:
+            self.object_cache.put(self.cos_bucket, object_to_get, stat.etag, file_to_get)
+
         duration = time.time() - t0
         OpUtil.log_operation_info(f"downloaded {file_to_get} from bucket: {self.cos_bucket}, object: {object_to_get}",
                                   duration)
 
-    def put_file_to_object_storage(self, file_to_upload: str, object_name: Optional[str] = None) -> None:
+    def _get_object_ranges(self, file_part_path: str, object_to_get: str, etag: str, object_size: int) -> None:
+        """Downloads object_to_get into file_part_path using up to ELYRA_RANGED_DOWNLOAD_WORKERS
+        concurrent byte-range requests of ELYRA_RANGED_DOWNLOAD_CHUNK_SIZE bytes.  Each range is
+        written at its offset into the preallocated file.
+        """
+        chunk_size = max(1, self.ranged_download_chunk_size)
+        ranges = [(offset, min(chunk_size, object_size - offset)) for offset in range(0, object_size, chunk_size)]
+        workers = min(self.ranged_download_workers, len(ranges))
+
+        logger.debug(f"Downloading {object_to_get} ({object_size} bytes) in {len(ranges)} ranges "
+                     f"using {workers} worker(s) ...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._get_object_range, file_part_path, object_to_get, etag, offset, length)
+                       for offset, length in ranges]
+        for future in futures:
+            future.result()  # re-raise errors, if any
+
+    def _get_object_range(self, file_part_path: str, object_to_get: str, etag: str, offset: int, length: int) -> None:
+        """Downloads length bytes of object_to_get, starting at offset, into file_part_path at
+        the same offset.  Interrupted downloads are retried per the download retry policy and
+        resume from the first missing byte, provided that the object's etag is unchanged.
+        """
+        received = 0
+
+        def get_remaining_bytes() -> None:
+            nonlocal received
+            with open(file_part_path, 'r+b') as f:
+                f.seek(offset + received)
+                response = self.cos_client.get_partial_object(self.cos_bucket, object_to_get,
+                                                              offset + received, length - received,
+                                                              request_headers={'If-Match': etag})
+                try:
+                    for data in response.stream(amt=1024 * 1024):
+                        f.write(data)
+                finally:
+                    received = f.tell() - offset
+                    response.close()
+                    response.release_conn()
+            if received < length:
+                raise ConnectionError(f"Download of {object_to_get} ended at byte {offset + received} "
+                                      f"instead of byte {offset + length}.")
+
+        if length:
+            self.download_retry_policy.call(f"download of {object_to_get}", get_remaining_bytes)
+
+    def extract_archive_from_object_storage(self, archive_file: str) -> None:
+        """Utility function to stream an archive from an object storage into the local directory
+
+        The archive is decompressed and extracted while it is being downloaded.  Members
+        that would be extracted outside of the local directory are rejected.
+
+        :param archive_file: archive filename
+        """
+
+        object_to_get = self.get_object_storage_filename(archive_file)
+        target_dir = os.path.realpath('.')
+        members = 0
+        t0 = time.time()
+        response = self.download_retry_policy.call(f"download of {object_to_get}",
+                                                   self.cos_client.get_object,
+                                                   bucket_name=self.cos_bucket,
+                                                   object_name=object_to_get)
+        try:
+            with tarfile.open(fileobj=response, mode='r|*') as tar:
+                for member in tar:
+                    FileOpBase._validate_archive_member(member, target_dir)
+                    tar.extract(member, path=target_dir)
+                    members += 1
+            bytes_read = response.tell()
+        finally:
+            response.close()
+            response.release_conn()
+        duration = time.time() - t0
+        throughput = bytes_read / duration / (1024 * 1024) if duration else 0
+        OpUtil.log_operation_info(f"extracted {members} member(s) from {archive_file} in bucket: {self.cos_bucket}, "
+                                  f"object: {object_to_get} ({bytes_read} bytes, {throughput:.2f} MB/s)",
+                                  duration)
+
+    @staticmethod
+    def _validate_archive_member(member: tarfile.TarInfo, target_dir: str) -> None:
+        """Raises a ValueError if member cannot be safely extracted into target_dir"""
+
+        def ensure_within_target_dir(path: str) -> None:
+            resolved_path = os.path.realpath(os.path.join(target_dir, path))
+            if os.path.commonpath([target_dir, resolved_path]) != target_dir:
+                raise ValueError(f"Archive member '{member.name}' refers to a location outside of '{target_dir}'.")
+
+        if not (member.isfile() or member.isdir() or member.issym() or member.islnk()):
+            raise ValueError(f"Archive member '{member.name}' has an unsupported type.")
+        ensure_within_target_dir(member.name)
+        if member.issym():
+            ensure_within_target_dir(os.path.join(os.path.dirname(member.name), member.linkname))
+        elif member.islnk():
+            ensure_within_target_dir(member.linkname)
+
+    def put_file_to_object_storage(self, file_to_upload: str, object_name: Optional[str] = None,
+                                   cache: bool = True) -> bool:
         """Utility function to put files into an object storage
 
         :param file_to_upload: filename
         :param object_name: remote filename (used to rename)
+        :param cache: whether to add the file to the node-local object cache, if any
+        :return: False if the upload was skipped because the stored object is unchanged, True otherwise
         """
 
         object_to_upload = object_name
@@ -303,12 +622,207 @@ class FileOpBase(ABC):
 
         object_to_upload = self.get_object_storage_filename(object_to_upload)
         t0 = time.time()
-        self.cos_client.fput_object(bucket_name=self.cos_bucket,
-                                    object_name=object_to_upload,
-                                    file_path=file_to_upload)
+        file_size = os.path.getsize(file_to_upload)
+        metadata = None
+        if self.skip_unchanged_outputs:
+            unchanged, sha256 = self._compare_file_with_object(file_to_upload, object_to_upload, file_size)
+            if unchanged:
+                OpUtil.log_operation_info(f"skipped upload of unchanged {file_to_upload} to bucket: "
+                                          f"{self.cos_bucket} object: {object_to_upload}", time.time() - t0)
+                return False
+            metadata = {SHA256_METADATA_KEY: sha256}
+
+        if file_size >= self.multipart_threshold:
+            etag = self._put_multipart_object(file_to_upload, object_to_upload, file_size, metadata)
+        else:
+            etag, _ = self.upload_retry_policy.call(f"upload of {object_to_upload}",
+                                                    self.cos_client.fput_object,
+                                                    bucket_name=self.cos_bucket,
+                                                    object_name=object_to_upload,
+                                                    file_path=file_to_upload,
+                                                    metadata=metadata)
+        if self.object_cache and cache:
+            # downstream operations on this node can retrieve the output from the cache
+            self.object_cache.put(self.cos_bucket, object_to_upload, etag, file_to_upload)
         duration = time.time() - t0
         OpUtil.log_operation_info(f"uploaded {file_to_upload} to bucket: {self.cos_bucket} object: {object_to_upload}",
                                   duration)
+        return True
+
+    def _compare_file_with_object(self, file_to_upload: str, object_to_upload: str,
+                                  file_size: int) -> Tuple[bool, Optional[str]]:
+        """Determines whether file_to_upload is identical to the stored object_to_upload
+
+        If an object of the same size exists, the file's digests are compared with the SHA-256
+        digest stored in the object's user metadata or, if there is none, with the object's ETag,
+        which for multipart uploads is derived from the digests of the individual parts.
+
+        :return: a tuple of whether the file is unchanged and its SHA-256 digest, which is
+                 recorded with the upload of a changed file
+        """
+        import minio
+
+        try:
+            stat = self.upload_retry_policy.call(f"stat of {object_to_upload}",
+                                                 self.cos_client.stat_object,
+                                                 bucket_name=self.cos_bucket,
+                                                 object_name=object_to_upload)
+        except minio.error.NoSuchKey:
+            stat = None
+        if not stat or stat.size != file_size:
+            return False, OpUtil.compute_file_digests(file_to_upload)['sha256']
+
+        part_sizes = []
+        part_count = int(stat.etag.split('-')[1]) if '-' in stat.etag else 0
+        if part_count:
+            # The part size is not recorded, so consider the part size this bootstrapper
+            # would use as well as the part sizes that other clients commonly use
+            # (5MiB for minio, 8MiB for the AWS CLI and boto3).
+            mib = 1024 * 1024
+            part_sizes = {self.get_multipart_part_size(file_size),
+                          math.ceil(file_size / part_count),
+                          math.ceil(file_size / part_count / mib) * mib,
+                          5 * mib, 8 * mib, 16 * mib}
+            part_sizes = [part_size for part_size in part_sizes if math.ceil(file_size / part_size) == part_count]
+
+        digests = OpUtil.compute_file_digests(file_to_upload, part_sizes)
+        stored_sha256 = next((value for key, value in (stat.metadata or {}).items()
+                              if key.lower() == SHA256_METADATA_KEY.lower()), None)
+        if stored_sha256:
+            return stored_sha256 == digests['sha256'], digests['sha256']
+        if part_count:
+            return stat.etag in digests['multipart_etags'], digests['sha256']
+        return stat.etag == digests['md5'], digests['sha256']
+
+    def get_multipart_part_size(self, file_size: int) -> int:
+        """Returns the part size of a multipart upload of a file of size file_size
+
+        Unless ELYRA_MULTIPART_PART_SIZE is set, files of up to 8GiB are uploaded in 16MiB
+        parts.  Larger files are uploaded in 512 parts that are aligned to 1MiB.
+
+        :param file_size: size of the file in bytes
+        :return: the part size in bytes
+        """
+        part_size = self.multipart_part_size
+        if not part_size:
+            mib = 1024 * 1024
+            part_size = max(16 * mib, math.ceil(file_size / 512 / mib) * mib)
+        part_size = max(part_size, math.ceil(file_size / MULTIPART_MAX_PARTS), MULTIPART_MIN_PART_SIZE)
+        return min(part_size, MULTIPART_MAX_PART_SIZE)
+
+    def _put_multipart_object(self, file_to_upload: str, object_to_upload: str, file_size: int,
+                              metadata: Optional[dict] = None) -> str:
+        """Uploads file_to_upload as a multipart upload, uploading up to
+        ELYRA_MULTIPART_UPLOAD_WORKERS parts concurrently.  Each part is read by the worker
+        that uploads it, limiting memory use to one part per worker.  Failed part uploads are
+        retried per the upload retry policy without uploading completed parts again.  Once a
+        part upload has failed, the parts that are not yet uploading are not uploaded.
+
+        :return: the ETag of the uploaded object
+        """
+        # minio 6.x uploads at most three parts at a time and buffers all parts in memory,
+        # so the upload is driven here using the client's multipart primitives.
+        from minio.definitions import UploadPart
+
+        part_size = self.get_multipart_part_size(file_size)
+        part_count = math.ceil(file_size / part_size)
+        workers = min(self.multipart_upload_workers, part_count)
+        # Set once a part upload failed, workers may start parts before the pending parts are cancelled
+        part_failed = threading.Event()
+
+        def upload_part(part_number: int) -> Optional[UploadPart]:
+            if part_failed.is_set():
+                return None
+            try:
+                with open(file_to_upload, 'rb') as f:
+                    f.seek((part_number - 1) * part_size)
+                    part_data = f.read(part_size)
+                etag, _ = self.upload_retry_policy.call(f"upload of part {part_number} of {object_to_upload}",
+                                                        self.cos_client._do_put_object,
+                                                        self.cos_bucket, object_to_upload,
+                                                        part_data, len(part_data),
+                                                        upload_id=upload_id, part_number=part_number)
+            except Exception:
+                part_failed.set()
+                raise
+            return UploadPart(self.cos_bucket, object_to_upload, upload_id, part_number, etag, None, len(part_data))
+
+        logger.debug(f"Uploading {file_to_upload} ({file_size} bytes) in {part_count} parts of "
+                     f"{part_size} bytes using {workers} worker(s) ...")
+        upload_id = self.upload_retry_policy.call(f"upload of {object_to_upload}",
+                                                  self.cos_client._new_multipart_upload,
+                                                  self.cos_bucket, object_to_upload,
+                                                  dict(metadata or {}, **{'Content-Type': 'application/octet-stream'}))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(upload_part, part_number) for part_number in range(1, part_count + 1)]
+                _, not_done = wait(futures, return_when=FIRST_EXCEPTION)
+                for future in not_done:
+                    future.cancel()
+            # parts are started in order, so a failed part precedes the parts that were cancelled or skipped
+            uploaded_parts = {part.part_number: part for part in (future.result() for future in futures)}
+            result, _ = self.upload_retry_policy.call(f"upload of {object_to_upload}",
+                                                      self.cos_client._complete_multipart_upload,
+                                                      self.cos_bucket, object_to_upload, upload_id, uploaded_parts)
+        except Exception:
+            try:
+                self.cos_client._remove_incomplete_upload(self.cos_bucket, object_to_upload, upload_id)
+            except Exception as ex:
+                # report the failure of the upload rather than the failure to abort it
+                logger.warning(f"Failed to abort the multipart upload {upload_id} of {object_to_upload}: {ex}")
+            raise
+        return result.etag
+
+    def put_files_to_object_storage(self, files_to_upload: Iterable[str]) -> None:
+        """Utility function to concurrently put multiple files into an object storage
+
+        At most ELYRA_MAX_UPLOAD_WORKERS files are uploaded at the same time.  files_to_upload
+        is consumed lazily and only a bounded number of uploads is queued, so large output
+        directories are never enumerated ahead of the uploads.  Once an upload fails no new
+        uploads are scheduled.  The first error is raised after in-flight uploads have drained.
+
+        :param files_to_upload: iterable of filenames
+        """
+
+        workers = self.max_upload_workers
+        # Bounds the number of queued and in-flight uploads (backpressure)
+        pending = threading.BoundedSemaphore(workers * 2)
+        errors = []
+        submitted = 0
+        # Counts of this call only, other calls may upload files concurrently
+        skipped_lock = threading.Lock()
+        skipped_uploads = skipped_upload_bytes = 0
+
+        def upload_done(file, future):
+            nonlocal skipped_uploads, skipped_upload_bytes
+            if future.exception() is not None:
+                errors.append(future.exception())
+            elif not future.result():
+                with skipped_lock:
+                    skipped_uploads += 1
+                    skipped_upload_bytes += os.path.getsize(file)
+            pending.release()
+
+        t0 = time.time()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for file in files_to_upload:
+                pending.acquire()
+                if errors:
+                    pending.release()
+                    break
+                future = executor.submit(self.put_file_to_object_storage, file)
+                future.add_done_callback(partial(upload_done, file))
+                submitted += 1
+        # Leaving the executor context waits for all in-flight uploads to complete
+        duration = time.time() - t0
+        if errors:
+            logger.error(f"{len(errors)} of {submitted} scheduled upload(s) to bucket {self.cos_bucket} failed.")
+            raise errors[0]
+        skipped_clause = ''
+        if self.skip_unchanged_outputs:
+            skipped_clause = f", skipped {skipped_uploads} unchanged file(s) ({skipped_upload_bytes} bytes)"
+        OpUtil.log_operation_info(f"uploaded {submitted - skipped_uploads} file(s) to bucket: {self.cos_bucket} "
+                                  f"using {workers} worker(s){skipped_clause}", duration)
 
     def has_wildcard(self, filename):
         wildcards = ['*', '?']
@@ -317,6 +831,11 @@ class FileOpBase(ABC):
     def process_output_file(self, output_file):
         """Puts the file to object storage.  Handles wildcards and directories. """
 
+        self.put_files_to_object_storage(self.expand_output_file(output_file))
+
+    def expand_output_file(self, output_file: str) -> Iterator[str]:
+        """Yields the files that output_file refers to.  Handles wildcards and directories. """
+
         matched_files = [output_file]
         if self.has_wildcard(output_file):  # explode the wildcarded file
             matched_files = glob.glob(output_file)
@@ -324,106 +843,545 @@ class FileOpBase(ABC):
         for matched_file in matched_files:
             if os.path.isdir(matched_file):
                 for file in os.listdir(matched_file):
-                    self.process_output_file(os.path.join(matched_file, file))
+                    yield from self.expand_output_file(os.path.join(matched_file, file))
             else:
-                self.put_file_to_object_storage(matched_file)
+                yield matched_file
 
 
 class NotebookFileOp(FileOpBase):
     """Perform Notebook File Operation"""
 
+    # html exporters by html export mode, which are reused across conversions
+    html_exporters = {}
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        # Start the kernel once the notebook has been extracted instead of when it is executed.
+        # A kernel started in the prepare phase would not be available to the execute phase.
+        self.prewarm_kernel = os.getenv('ELYRA_PREWARM_KERNEL', 'false').lower() == 'true' and \
+            (self.input_params.get('phase') or 'all') == 'all'
+        self.kernel_startup = None
+        # The notebook is parsed once and shared by the kernel selection, the execution and the html export
+        self.notebook_node = None
+        self.notebook_lock = threading.Lock()
+        # 'full' renders the classic template with inlined images, 'fast' renders a minimal template
+        # and uploads the images as separate objects, 'none' does not convert the notebook to html
+        self.html_export = self.input_params.get('html-export') or 'full'
+        # Interval in seconds at which the partially executed output notebook is uploaded
+        self.checkpoint_interval = float(self.input_params.get('checkpoint-interval') or 0)
+        # Outputs of at least this size are moved from the output notebook to separate objects
+        self.externalize_outputs_threshold = None
+        if self.input_params.get('externalize-outputs'):
+            self.externalize_outputs_threshold = OpUtil.parse_size(self.input_params.get('externalize-outputs'))
+
+    def archive_extracted(self) -> None:
+        super().archive_extracted()
+        if self.prewarm_kernel and not self.kernel_startup:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='kernel')
+            self.kernel_startup = executor.submit(self.start_kernel)
+            executor.shutdown(wait=False)
+
+    def read_notebook(self) -> Any:
+        """Returns the notebook node of the notebook, parsing the notebook on first use"""
+        import nbformat
+
+        with self.notebook_lock:
+            if self.notebook_node is None:
+                self.notebook_node = nbformat.read(os.path.basename(self.filepath), as_version=4)
+            return self.notebook_node
+
+    def get_kernel_name(self) -> str:
+        """Returns the kernel pinned when the pipeline was compiled, if any, or the best kernel for the notebook"""
+        if self.input_params.get('kernel-name'):
+            return self.input_params.get('kernel-name')
+        return NotebookFileOp.find_best_kernel(self.read_notebook())
+
+    def start_kernel(self) -> Any:
+        """Starts the kernel for the notebook once the packages have been installed, waits
+        until it replies to requests and returns its kernel manager.
+        """
+        from jupyter_client.manager import KernelManager
+
+        self.packages_installed.wait()
+        t0 = time.time()
+        kernel_name = self.get_kernel_name()
+        kernel_manager = KernelManager(kernel_name=kernel_name)
+        # equivalent to the arguments of kernels started by papermill
+        extra_arguments = ['--HistoryManager.hist_file=:memory:'] if kernel_manager.ipykernel else []
+        kernel_manager.start_kernel(extra_arguments=extra_arguments, cwd=os.getcwd())
+        kernel_client = kernel_manager.blocking_client()
+        kernel_client.start_channels()
+        try:
+            kernel_client.wait_for_ready(timeout=60)
+        except RuntimeError:
+            kernel_manager.shutdown_kernel(now=True)
+            raise
+        finally:
+            kernel_client.stop_channels()
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"started kernel '{kernel_name}' ahead of the notebook execution", duration)
+        return kernel_manager
+
+    def get_prewarmed_kernel(self) -> Any:
+        """Returns the kernel manager of the kernel started ahead of the execution, if any"""
+        if not self.kernel_startup:
+            return None
+        try:
+            return self.kernel_startup.result()
+        except Exception as ex:
+            logger.warning(f"Unable to start kernel ahead of the notebook execution: {ex}")
+            return None
+
     def execute(self) -> None:
         """Execute the Notebook and upload results to object storage"""
         notebook = os.path.basename(self.filepath)
         notebook_name = notebook.replace('.ipynb', '')
         notebook_output = notebook_name + '-output.ipynb'
         notebook_html = notebook_name + '.html'
+        html_exporter_load = None
 
         try:
             OpUtil.log_operation_info(f"executing notebook using 'papermill {notebook} {notebook_output}'")
             t0 = time.time()
             # Include kernel selection in execution time
-            kernel_name = NotebookFileOp.find_best_kernel(notebook)
+            kernel_name = self.get_kernel_name()
 
             import papermill
-            papermill.execute_notebook(notebook, notebook_output, kernel_name=kernel_name)
+            kernel_manager = self.get_prewarmed_kernel()
+            # load the html exporter while the notebook is executed, forked html exports inherit it
+            if self.html_export != 'none':
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='html-exporter')
+                html_exporter_load = executor.submit(NotebookFileOp.get_html_exporter, self.html_export)
+                executor.shutdown(wait=False)
+            checkpoints = self.start_checkpoints(notebook_output, notebook)
+            try:
+                # papermill parameterizes its own copy of the notebook and returns the executed notebook,
+                # which is exported to html without reading back the output notebook it has written
+                if kernel_manager:
+                    output_nb = papermill.execute_notebook(notebook, notebook_output, kernel_name=kernel_name,
+                                                           engine_name=NotebookFileOp.get_prewarmed_kernel_engine(),
+                                                           km=kernel_manager)
+                else:
+                    output_nb = papermill.execute_notebook(notebook, notebook_output, kernel_name=kernel_name)
+            finally:
+                self.stop_checkpoints(checkpoints)
+                # the engine shuts the kernel down, unless the execution failed before it connected to it
+                if kernel_manager and kernel_manager.has_kernel:
+                    kernel_manager.shutdown_kernel(now=True)
             duration = time.time() - t0
             OpUtil.log_operation_info("notebook execution completed", duration)
+            # the notebook node is no longer needed
+            self.notebook_node = None
+            self.add_cell_timing_report(output_nb, duration)
 
-            NotebookFileOp.convert_notebook_to_html(notebook_output, notebook_html)
-            self.put_file_to_object_storage(notebook_output, notebook)
-            self.put_file_to_object_storage(notebook_html)
-            self.process_outputs()
+            OpUtil.log_operation_info(f"peak memory usage of the bootstrapper: {OpUtil.get_peak_rss()} KiB")
+
+            if html_exporter_load:
+                wait([html_exporter_load])
+            html_export = self.start_html_export(output_nb, notebook_html)
+            self.upload_results(notebook, notebook_output, notebook_html, output_nb, html_export,
+                                include_outputs=True)
         except Exception as ex:
             # log in case of errors
             logger.error("Unexpected error: {}".format(sys.exc_info()[0]))
 
-            NotebookFileOp.convert_notebook_to_html(notebook_output, notebook_html)
-            self.put_file_to_object_storage(notebook_output, notebook)
-            self.put_file_to_object_storage(notebook_html)
+            output_nb = notebook_output
+            if self.externalize_outputs_threshold and os.path.isfile(notebook_output):
+                import nbformat
+                output_nb = nbformat.read(notebook_output, as_version=4)
+            if html_exporter_load:
+                # a process forked while the loader thread holds an import lock would block on it
+                wait([html_exporter_load])
+            html_export = self.start_html_export(output_nb, notebook_html)
+            self.upload_results(notebook, notebook_output, notebook_html, output_nb, html_export,
+                                include_outputs=False)
             raise ex
 
+    def add_cell_timing_report(self, nb: Any, duration: float) -> None:
+        """Adds the cells that took longest to execute, according to the execution times recorded
+        by papermill, to the KFP UI metadata, and the execution time of the notebook to the KFP metrics.
+        At most ELYRA_HOT_CELLS cells are listed.
+        """
+        cell_timings = []
+        for index, cell in enumerate(nb.cells):
+            cell_metadata = cell.metadata.get('papermill', {})
+            if cell.cell_type != 'code' or cell_metadata.get('duration') is None:
+                continue
+            source_lines = cell.source.strip().splitlines()
+            cell_timings.append((cell_metadata['duration'], index + 1, cell_metadata.get('status', ''),
+                                 source_lines[0] if source_lines else ''))
+        cell_timings.sort(key=lambda cell_timing: cell_timing[0], reverse=True)
+
+        hot_cells = io.StringIO()
+        writer = csv.writer(hot_cells)
+        for cell_duration, cell_number, status, source in cell_timings[:int(os.getenv('ELYRA_HOT_CELLS', '20'))]:
+            writer.writerow([cell_number, f"{cell_duration:.3f}", status, source])
+        self.ui_metadata_outputs.append({
+            'storage': 'inline',
+            'format': 'csv',
+            'header': ['cell', 'duration (secs)', 'status', 'source'],
+            'source': hot_cells.getvalue(),
+            'type': 'table'
+        })
+        self.metrics.append({
+            'name': 'elyra-execution-seconds',
+            'numberValue': round(duration, 3),
+            'format': 'RAW'
+        })
+
+    def start_checkpoints(self, notebook_output: str, object_name: str) -> Any:
+        """Starts uploading the output notebook, which papermill writes as cells complete, to object_name every
+        checkpoint interval while the notebook is executed.  Returns the checkpoint thread and its stop event.
+        """
+        if not self.checkpoint_interval:
+            return None
+        stop = threading.Event()
+        thread = threading.Thread(target=self.checkpoint_output_notebook, args=(notebook_output, object_name, stop),
+                                  name='checkpoint', daemon=True)
+        thread.start()
+        return thread, stop
+
+    def stop_checkpoints(self, checkpoints: Any) -> None:
+        """Stops uploading checkpoints, waiting for an ongoing upload so that it does not replace the
+        output notebook uploaded once the execution has completed.
+        """
+        if checkpoints:
+            thread, stop = checkpoints
+            stop.set()
+            thread.join()
+
+    def checkpoint_output_notebook(self, notebook_output: str, object_name: str, stop: threading.Event) -> None:
+        """Uploads the output notebook every checkpoint interval until stop is set, unless it is unchanged.
+        A copy of the notebook is uploaded once papermill has not written it for at least a second, so that
+        only completely written notebooks are uploaded.
+        """
+        checkpoint_file = notebook_output + '.checkpoint'
+        last_checkpoint = None
+        checkpoints = 0
+        while not stop.wait(self.checkpoint_interval):
+            try:
+                stat = os.stat(notebook_output)
+                checkpoint = (stat.st_mtime_ns, stat.st_size)
+                if checkpoint == last_checkpoint or time.time() - stat.st_mtime < 1:
+                    continue
+                shutil.copyfile(notebook_output, checkpoint_file)
+                stat = os.stat(notebook_output)
+                if (stat.st_mtime_ns, stat.st_size) != checkpoint or \
+                        os.path.getsize(checkpoint_file) != stat.st_size:
+                    continue  # written while it was copied
+                self.put_file_to_object_storage(checkpoint_file, object_name, cache=False)
+                last_checkpoint = checkpoint
+                checkpoints += 1
+            except FileNotFoundError:
+                continue  # not yet written by papermill
+            except Exception as ex:
+                logger.warning(f"Unable to upload checkpoint of {notebook_output}: {ex}")
+
+        if os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+        OpUtil.log_operation_info(f"uploaded {checkpoints} checkpoint(s) of {notebook_output}")
+
+    def upload_results(self, notebook: str, notebook_output: str, notebook_html: str, output_nb: Any,
+                       html_export: Any, include_outputs: bool) -> None:
+        """Uploads the output notebook, and the declared outputs if include_outputs is set, while the
+        notebook is converted to html, then uploads the html file once the conversion has completed.
+        """
+        def upload_output_notebook() -> None:
+            # the html export has its own copy of the notebook node
+            externalized_files = []
+            if self.externalize_outputs_threshold and not isinstance(output_nb, str):
+                outputs_dir = os.path.splitext(notebook)[0] + '-outputs'
+                externalized_files = NotebookFileOp.externalize_outputs(output_nb, notebook_output, outputs_dir,
+                                                                        self.externalize_outputs_threshold)
+            self.put_file_to_object_storage(notebook_output, notebook)
+            if externalized_files:
+                self.put_files_to_object_storage(externalized_files)
+
+        t0 = time.time()
+        html_exported = False
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='upload') as executor:
+                notebook_upload = executor.submit(upload_output_notebook)
+                if include_outputs:
+                    self.process_outputs()
+                notebook_upload.result()
+        finally:
+            html_exported = html_export is not None and NotebookFileOp.finish_html_export(html_export, notebook_html)
+        if html_exported:
+            html_files_dir = NotebookFileOp.get_html_files_dir(notebook_html)
+            if os.path.isdir(html_files_dir):
+                # images that are linked by the html file
+                self.put_files_to_object_storage([notebook_html, *self.expand_output_file(html_files_dir)])
+            else:
+                self.put_file_to_object_storage(notebook_html)
+        duration = time.time() - t0
+        OpUtil.log_operation_info("notebook results uploaded", duration)
+
     @staticmethod
-    def convert_notebook_to_html(notebook_file: str, html_file: str) -> str:
+    def externalize_outputs(nb: Any, notebook_file: str, outputs_dir: str, threshold: int) -> List[str]:
+        """Moves the outputs of at least threshold bytes to files in outputs_dir, which are referenced
+        by the output's metadata, and writes the notebook to notebook_file as compact JSON.
+
+        :return: the files that the outputs have been moved to
+        """
+        from nbformat.v4.rwbase import strip_transient
+
+        t0 = time.time()
+        externalized_files = []
+
+        def write_output(cell_index: int, output_index: int, extension: str, content: Any) -> str:
+            output_file = os.path.join(outputs_dir, f"output_{cell_index}_{output_index}{extension}")
+            os.makedirs(outputs_dir, exist_ok=True)
+            if isinstance(content, bytes):
+                with open(output_file, 'wb') as f:
+                    f.write(content)
+            else:
+                # independent of the locale, like the files written by nbformat
+                with open(output_file, 'w', encoding='utf-8') as f:
+                    f.write(content)
+            externalized_files.append(output_file)
+            return Path(output_file).as_posix()
+
+        for cell_index, cell in enumerate(nb.cells):
+            for output_index, output in enumerate(cell.get('outputs', [])):
+                if output.output_type == 'stream':
+                    text = ''.join(output.text) if isinstance(output.text, list) else output.text
+                    if len(text) >= threshold:
+                        reference = write_output(cell_index, output_index, '.txt', text)
+                        output.text = f"[{len(text)} characters of {output.name} output stored in {reference}]\n"
+                    continue
+
+                references = {}
+                for mime_type, data in list(output.get('data', {}).items()):
+                    if isinstance(data, dict):
+                        content = json.dumps(data)
+                    else:
+                        content = ''.join(data) if isinstance(data, list) else data
+                    if len(content) < threshold:
+                        continue
+                    extension, encoded = EXTERNALIZED_OUTPUT_TYPES.get(mime_type, ('', False))
+                    if encoded:
+                        content = base64.b64decode(content)
+                    references[mime_type] = write_output(cell_index, output_index, extension, content)
+                    del output.data[mime_type]
+
+                if references:
+                    output.metadata.setdefault('elyra', {})['externalized_outputs'] = references
+                    if 'text/plain' not in output.data:
+                        placeholders = [f"[{mime_type} output stored in {reference}]"
+                                        for mime_type, reference in references.items()]
+                        output.data['text/plain'] = '\n'.join(placeholders)
+
+        with open(notebook_file, 'w', encoding='utf-8') as f:
+            json.dump(strip_transient(nb), f, ensure_ascii=False, separators=(',', ':'))
+
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"moved {len(externalized_files)} output(s) of {notebook_file} "
+                                  f"to {outputs_dir}", duration)
+        return externalized_files
+
+    def start_html_export(self, notebook_file: Any, html_file: str) -> Any:
+        """Starts converting the notebook to html in a separate process, where the conversion does not
+        compete with the uploads for the interpreter, and returns the process.  Returns None if the
+        notebook is not converted to html.
+        """
+        if self.html_export == 'none':
+            return None
+        # a forked process inherits the notebook node instead of receiving a copy of it
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        process = multiprocessing.get_context(start_method).Process(target=NotebookFileOp.convert_notebook_to_html,
+                                                                    args=(notebook_file, html_file,
+                                                                          self.html_export),
+                                                                    name='html-export',
+                                                                    daemon=True)
+        process.start()
+        return process
+
+    @staticmethod
+    def finish_html_export(process: Any, html_file: str) -> bool:
+        """Waits for the conversion to html for at most ELYRA_HTML_EXPORT_TIMEOUT seconds.
+        Returns False if the conversion did not complete successfully.
+        """
+        timeout = float(os.getenv('ELYRA_HTML_EXPORT_TIMEOUT', '600'))
+        process.join(timeout)
+        if process.is_alive():
+            process.terminate()
+            process.join()
+            logger.error(f"Conversion of the notebook to {html_file} did not complete within {timeout} secs, "
+                         f"{html_file} is not uploaded.")
+            return False
+        if process.exitcode != 0:
+            logger.error(f"Conversion of the notebook to {html_file} failed with exit code {process.exitcode}, "
+                         f"{html_file} is not uploaded.")
+            return False
+        return True
+
+    @staticmethod
+    def get_prewarmed_kernel_engine() -> str:
+        """Registers the papermill engine that executes notebooks in the running kernel of the kernel manager
+        that is passed as km, and returns its name.
+
+        nbclient only creates kernel clients for the kernels that it starts itself (before 0.5.x) and
+        papermill does not pass kernel clients on, so the engine's notebook client connects to the kernel.
+        The kernel is shut down once the notebook has been executed, as papermill does with its own kernels.
+        """
+        from nbclient.util import ensure_async, run_sync
+        from papermill.clientwrap import PapermillNotebookClient
+        from papermill.engines import NBClientEngine, papermill_engines
+        from papermill.exceptions import PapermillException
+        from papermill.log import logger as papermill_logger
+        from papermill.utils import merge_kwargs, remove_args
+
+        try:
+            papermill_engines.get_engine(PREWARMED_KERNEL_ENGINE)
+            return PREWARMED_KERNEL_ENGINE
+        except PapermillException:
+            pass  # not registered yet
+
+        class PrewarmedKernelNotebookClient(PapermillNotebookClient):
+            async def async_connect_kernel_client(self) -> None:
+                # equivalent to the kernel clients that nbclient creates
+                self.km.client_class = 'jupyter_client.asynchronous.AsyncKernelClient'
+                self.kc = self.km.client()
+                await ensure_async(self.kc.start_channels())
+                try:
+                    await ensure_async(self.kc.wait_for_ready(timeout=self.startup_timeout))
+                except RuntimeError:
+                    await ensure_async(self.kc.stop_channels())
+                    raise
+                self.kc.allow_stdin = False
+
+            connect_kernel_client = run_sync(async_connect_kernel_client)
+
+            def execute(self, **kwargs: Any) -> Any:
+                self.connect_kernel_client()
+                return super().execute(cleanup_kc=True, **kwargs)
+
+        class PrewarmedKernelEngine(NBClientEngine):
+            @classmethod
+            def execute_managed_notebook(cls, nb_man: Any, kernel_name: str, log_output: bool = False,
+                                         stdout_file: Any = None, stderr_file: Any = None, start_timeout: int = 60,
+                                         execution_timeout: Optional[int] = None, **kwargs: Any) -> Any:
+                # same arguments as those of NBClientEngine's notebook client
+                safe_kwargs = remove_args(['input_path', 'timeout', 'startup_timeout'], **kwargs)
+                final_kwargs = merge_kwargs(safe_kwargs,
+                                            timeout=execution_timeout if execution_timeout else kwargs.get('timeout'),
+                                            startup_timeout=start_timeout,
+                                            kernel_name=kernel_name,
+                                            log=papermill_logger,
+                                            log_output=log_output,
+                                            stdout_file=stdout_file,
+                                            stderr_file=stderr_file)
+                return PrewarmedKernelNotebookClient(nb_man, **final_kwargs).execute()
+
+        papermill_engines.register(PREWARMED_KERNEL_ENGINE, PrewarmedKernelEngine)
+        return PREWARMED_KERNEL_ENGINE
+
+    @staticmethod
+    def get_html_exporter(export_mode: str = 'full') -> Any:
+        """Returns the html exporter of the html export mode, which is created on first use"""
+        if export_mode not in NotebookFileOp.html_exporters:
+            import nbconvert
+            import nbformat
+            from traitlets.config import Config
+
+            config = Config()
+            if export_mode == 'fast':
+                if PackageVersion(nbconvert.__version__) >= PackageVersion('6'):
+                    config.HTMLExporter.template_name = 'basic'
+                else:
+                    config.HTMLExporter.template_file = 'basic'
+                config.ExtractOutputPreprocessor.enabled = True
+            html_exporter = nbconvert.HTMLExporter(config=config)
+            # loads and compiles the template, nbconvert < 6 registers the template's filters when converting
+            html_exporter.from_notebook_node(nbformat.v4.new_notebook())
+            NotebookFileOp.html_exporters[export_mode] = html_exporter
+        return NotebookFileOp.html_exporters[export_mode]
+
+    @staticmethod
+    def get_html_files_dir(html_file: str) -> str:
+        """Returns the directory of the images that are linked by html files of the fast html export mode"""
+        return os.path.splitext(html_file)[0] + '_files'
+
+    @staticmethod
+    def convert_notebook_to_html(notebook_file: Any, html_file: str, export_mode: str = 'full') -> str:
         """Function to convert a Jupyter notebook file (.ipynb) into an html file
 
-        :param notebook_file: object storage client
+        :param notebook_file: path of the notebook file or its already parsed notebook node
         :param html_file: name of what the html output file should be
+        :param export_mode: 'full' or 'fast', which writes the images to get_html_files_dir(html_file)
         :return: html_file: the converted notebook in html format
         """
-        import nbconvert
         import nbformat
 
-        OpUtil.log_operation_info(f"converting from {notebook_file} to {html_file}")
+        notebook_source = notebook_file if isinstance(notebook_file, str) else 'notebook'
+        OpUtil.log_operation_info(f"converting from {notebook_source} to {html_file}")
         t0 = time.time()
-        nb = nbformat.read(notebook_file, as_version=4)
-        html_exporter = nbconvert.HTMLExporter()
-        data, resources = html_exporter.from_notebook_node(nb)
+        if isinstance(notebook_file, str):
+            nb = nbformat.read(notebook_file, as_version=4)
+        else:
+            nb = notebook_file
+        html_exporter = NotebookFileOp.get_html_exporter(export_mode)
+        if export_mode == 'fast':
+            html_files_dir = NotebookFileOp.get_html_files_dir(html_file)
+            body, resources = html_exporter.from_notebook_node(
+                nb, resources={'output_files_dir': os.path.basename(html_files_dir)})
+            title = os.path.splitext(os.path.basename(html_file))[0]
+            data = FAST_HTML_PAGE.format(title=html.escape(title), body=body)
+            for filename, output in resources.get('outputs', {}).items():
+                output_file = os.path.join(os.path.dirname(html_file), filename)
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                with open(output_file, 'wb') as f:
+                    f.write(output)
+        else:
+            data, resources = html_exporter.from_notebook_node(nb)
         with open(html_file, "w") as f:
             f.write(data)
             f.close()
 
         duration = time.time() - t0
-        OpUtil.log_operation_info(f"{notebook_file} converted to {html_file}", duration)
+        OpUtil.log_operation_info(f"{notebook_source} converted to {html_file}", duration)
         return html_file
 
     @staticmethod
-    def find_best_kernel(notebook_file: str) -> str:
+    def find_best_kernel(notebook_file: Any, kernelspec_index: Optional['KernelSpecIndex'] = None) -> str:
         """Determines the best kernel to use via the following algorithm:
 
-           1. Loads notebook and gets kernel_name and kernel_language from NB metadata.
-           2. Gets the list of configured kernels using KernelSpecManager.
-           3. If notebook kernel_name is in list, use that, else
-           4. If not found, load each configured kernel.json file and find a language match.
+           1. Loads notebook (unless a notebook node is given) and gets kernel_name and kernel_language
+              from NB metadata.
+           2. If a kernel named kernel_name is installed, use that, else
+           3. Gets the list of configured kernels and their languages from the KernelSpecIndex.
+           4. If notebook kernel_name is in list, use that, else find a language match.
            5. On first match, log info message regarding the switch and use that kernel.
            6. If no language match is found, revert to notebook kernel and log warning message.
         """
-        import json
         import nbformat
-        from jupyter_client.kernelspec import KernelSpecManager
 
-        nb = nbformat.read(notebook_file, 4)
+        if isinstance(notebook_file, str):
+            nb = nbformat.read(notebook_file, 4)
+        else:
+            nb = notebook_file
 
         nb_kspec = nb.metadata.kernelspec
         nb_kernel_name = nb_kspec.get('name')
         nb_kernel_lang = nb_kspec.get('language')
 
-        kernel_specs = KernelSpecManager().find_kernel_specs()
+        kernelspec_index = kernelspec_index or KernelSpecIndex()
+        # see if we have a direct match, which does not require the index...
+        if kernelspec_index.has_kernel(nb_kernel_name):
+            return nb_kernel_name
 
-        # see if we have a direct match...
-        if nb_kernel_name in kernel_specs.keys():
+        kernel_languages = kernelspec_index.get_kernel_languages()
+        if nb_kernel_name in kernel_languages.keys():
             return nb_kernel_name
 
         # no match found for kernel, try matching language...
-        for name, file in kernel_specs.items():
-            # load file (JSON) and pick out language, if match, use first found
-            with open(os.path.join(file, 'kernel.json')) as f:
-                kspec = json.load(f)
-                if kspec.get('language').lower() == nb_kernel_lang.lower():
-                    matched_kernel = os.path.basename(file)
-                    logger.info(f"Matched kernel by language ({nb_kernel_lang}), using kernel "
-                                f"'{matched_kernel}' instead of the missing kernel '{nb_kernel_name}'.")
-                    return matched_kernel
+        for matched_kernel, language in kernel_languages.items():
+            # use the first kernel whose language matches
+            if language and language.lower() == nb_kernel_lang.lower():
+                logger.info(f"Matched kernel by language ({nb_kernel_lang}), using kernel "
+                            f"'{matched_kernel}' instead of the missing kernel '{nb_kernel_name}'.")
+                return matched_kernel
 
         # no match found for language, return notebook kernel and let execution fail
         logger.warning(f"Reverting back to missing notebook kernel '{nb_kernel_name}' since no "
@@ -440,17 +1398,27 @@ class PythonFileOp(FileOpBase):
         python_script_name = python_script.replace('.py', '')
         python_script_output = python_script_name + '.log'
 
+        profile_stats = python_script_name + '.pstats'
+        profile_stacks = python_script_name + '.collapsed.txt'
+        profile = self.input_params.get('profile')
+        command = ['python3', python_script]
+        if profile:
+            command = ['python3', '-c', PROFILE_SCRIPT, python_script, profile_stats]
+
         try:
             OpUtil.log_operation_info(f"executing python script using "
-                                      f"'python3 {python_script}' to '{python_script_output}'")
+                                      f"'python3 {python_script}'{' under cProfile' if profile else ''} "
+                                      f"to '{python_script_output}'")
             t0 = time.time()
             with open(python_script_output, "w") as log_file:
-                subprocess.run(['python3', python_script], stdout=log_file, stderr=subprocess.STDOUT, check=True)
+                subprocess.run(command, stdout=log_file, stderr=subprocess.STDOUT, check=True)
 
             duration = time.time() - t0
             OpUtil.log_operation_info("python script execution completed", duration)
 
             self.put_file_to_object_storage(python_script_output, python_script_output)
+            if profile:
+                self.process_profile(profile_stats, profile_stacks)
             self.process_outputs()
         except Exception as ex:
             # log in case of errors
@@ -458,8 +1426,85 @@ class PythonFileOp(FileOpBase):
             logger.error("Error details: {}".format(ex))
 
             self.put_file_to_object_storage(python_script_output, python_script_output)
+            if profile and os.path.isfile(profile_stats):
+                try:
+                    self.process_profile(profile_stats, profile_stacks)
+                except Exception as pe:
+                    logger.warning(f"Unable to process profile {profile_stats}: {pe}")
             raise ex
 
+    def process_profile(self, profile_stats: str, profile_stacks: str) -> None:
+        """Uploads the profile of the script and its collapsed stacks, which can be rendered as flame graph,
+        and adds the ELYRA_PROFILE_TOP_FUNCTIONS functions with the highest cumulative time to the KFP UI metadata.
+        """
+        import pstats
+
+        t0 = time.time()
+        stats = pstats.Stats(profile_stats)
+        PythonFileOp.write_collapsed_stacks(stats, profile_stacks)
+
+        top_functions = io.StringIO()
+        writer = csv.writer(top_functions)
+        functions = sorted(stats.stats.items(), key=lambda function: function[1][3], reverse=True)
+        for function, (_, calls, total_time, cumulative_time, _) in \
+                functions[:int(os.getenv('ELYRA_PROFILE_TOP_FUNCTIONS', '20'))]:
+            writer.writerow([pstats.func_std_string(function), calls, f"{total_time:.3f}", f"{cumulative_time:.3f}"])
+        self.ui_metadata_outputs.append({
+            'storage': 'inline',
+            'format': 'csv',
+            'header': ['function', 'calls', 'total time (secs)', 'cumulative time (secs)'],
+            'source': top_functions.getvalue(),
+            'type': 'table'
+        })
+
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"processed profile {profile_stats}", duration)
+        self.put_files_to_object_storage([profile_stats, profile_stacks])
+
+    @staticmethod
+    def write_collapsed_stacks(stats: Any, stacks_file: str, max_depth: int = 100) -> None:
+        """Writes the stacks of the profiled functions in the collapsed format of flame graph tools
+        (one 'frame;frame;frame microseconds' line per stack).
+
+        Profiles record the time spent in each function by caller, but not by stack.  The time spent in
+        a function is therefore attributed to the stacks leading to it in proportion to the time its
+        callers spent in it.  Stacks accounting for less than 0.01% of the total time are omitted.
+        """
+        callees = {}
+        for function, (_, _, _, _, callers) in stats.stats.items():
+            for caller, caller_stats in callers.items():
+                callees.setdefault(caller, []).append((function, caller_stats[3]))
+        roots = [function for function, function_stats in stats.stats.items() if not function_stats[4]]
+        min_time = sum(stats.stats[root][3] for root in roots) / 10000
+
+        def frame(function: Tuple[str, int, str]) -> str:
+            filename, line, name = function
+            if filename == '~':
+                return name.replace(';', ':')
+            return f"{os.path.basename(filename)}:{line}({name})".replace(';', ':')
+
+        stacks = {}
+        # (function, frames of the stack, share of the function's time that is attributed to the stack)
+        pending = [(root, (frame(root),), 1.0, (root,)) for root in roots]
+        while pending:
+            function, frames, share, path = pending.pop()
+            _, _, total_time, cumulative_time, _ = stats.stats[function]
+            stack = ';'.join(frames)
+            stacks[stack] = stacks.get(stack, 0) + total_time * share
+            if len(frames) >= max_depth:
+                continue
+            for callee, time_in_callee in callees.get(function, []):
+                callee_share = share * time_in_callee / stats.stats[callee][3] if stats.stats[callee][3] else 0
+                # recursive calls are attributed to the outermost call
+                if callee not in path and time_in_callee * share >= min_time:
+                    pending.append((callee, frames + (frame(callee),), callee_share, path + (callee,)))
+
+        with open(stacks_file, 'w') as f:
+            for stack, stack_time in sorted(stacks.items()):
+                microseconds = int(stack_time * 1000000)
+                if microseconds > 0:
+                    f.write(f"{stack} {microseconds}\n")
+
 
 class RFileOp(FileOpBase):
     """Perform R File Operation"""
@@ -494,45 +1539,316 @@ class RFileOp(FileOpBase):
 class OpUtil(object):
     """Utility functions for preparing file execution."""
     @classmethod
-    def package_install(cls, user_volume_path) -> None:
+    def package_install(cls, user_volume_path, wheelhouse: Optional[str] = None,
+                        snapshot_store: Optional['SitePackagesSnapshotStore'] = None,
+                        precompile: bool = False, to_install_list: Optional[List[str]] = None) -> None:
+        """Installs the packages listed in requirements-elyra.txt that are missing or outdated.
+
+        The packages to install are determined by get_packages_to_install unless to_install_list
+        is provided, so that pip is only invoked if packages actually need to be installed.  If a
+        wheelhouse directory is provided and exists, packages are installed from it without consulting
+        the package index, unless it lacks some of the required distributions.  If a snapshot store
+        is provided, packages that are installed into user_volume_path are restored from the
+        snapshot of an identical installation, which is published after installing the packages
+        if it was found to be missing.
+        If precompile is set, pip does not compile the packages that it installs into
+        user_volume_path, they are compiled to bytecode in parallel before the snapshot is published.
+        """
         OpUtil.log_operation_info("Installing packages")
         t0 = time.time()
+        if to_install_list is None:
+            to_install_list = cls.get_packages_to_install(user_volume_path)
+
+        snapshot_key = None
+        if to_install_list and snapshot_store and user_volume_path:
+            snapshot_key = snapshot_store.get_snapshot_key(to_install_list)
+            restored = snapshot_store.restore(snapshot_key, user_volume_path)
+            if restored:
+                to_install_list = []
+            if restored is not False:
+                # only publish snapshots that are known to be missing
+                snapshot_key = None
+
+        if to_install_list:
+            install_options = []
+            if user_volume_path:
+                install_options.append('--target=' + user_volume_path)
+                install_options.append('--no-cache-dir')
+                if precompile:
+                    install_options.append('--no-compile')  # compiled by precompile_packages
+
+            pip_install = [sys.executable, '-m', 'pip', 'install']
+            if wheelhouse and not os.path.isdir(wheelhouse):
+                logger.warning(f"WARNING: Wheelhouse {wheelhouse} does not exist. Installing from the package index...")
+            elif wheelhouse:
+                missing_list = cls.find_missing_distributions(wheelhouse, to_install_list)
+                if missing_list:
+                    logger.warning(f"WARNING: Wheelhouse {wheelhouse} is missing distributions for "
+                                   f"{', '.join(missing_list)}. Installing from the package index...")
+                    pip_install.append('--find-links=' + wheelhouse)
+                else:
+                    try:
+                        subprocess.run(pip_install + ['--no-index', '--find-links=' + wheelhouse] +
+                                       install_options + to_install_list, check=True)
+                        pip_install = None
+                    except subprocess.CalledProcessError:
+                        # e.g. a dependency of a required package is missing from the wheelhouse
+                        logger.warning(f"WARNING: Installation from wheelhouse {wheelhouse} failed. "
+                                       f"Installing from the package index...")
+                        pip_install.append('--find-links=' + wheelhouse)
+
+            if pip_install:
+                subprocess.run(pip_install + install_options + to_install_list, check=True)
+
+        if precompile and user_volume_path and to_install_list:
+            cls.precompile_packages(user_volume_path)
+
+        if snapshot_key:
+            snapshot_store.publish(snapshot_key, user_volume_path)
+
+        if user_volume_path:
+            os.environ["PIP_CONFIG_FILE"] = user_volume_path + "/pip.conf"
+
+        installed_list = cls.package_dict_to_list(cls.get_installed_packages(user_volume_path))
+        logger.debug("Installed packages:\n" + "\n".join(installed_list))
+        duration = time.time() - t0
+        OpUtil.log_operation_info("Packages installed", duration)
+
+    @classmethod
+    def get_packages_to_install(cls, user_volume_path: Optional[str] = None) -> List[str]:
+        """Returns the 'package==version' requirements of requirements-elyra.txt that are missing or outdated.
+
+        Installed packages are taken from requirements-current.txt if present, otherwise they
+        are determined in-process from the installed distributions' metadata.
+        """
         elyra_packages = cls.package_list_to_dict("requirements-elyra.txt")
-        current_packages = cls.package_list_to_dict("requirements-current.txt")
+        if os.path.exists("requirements-current.txt"):
+            current_packages = cls.package_list_to_dict("requirements-current.txt")
+        else:
+            current_packages = cls.get_installed_packages(user_volume_path)
+        current_packages = {cls.normalize_package_name(package): ver for package, ver in current_packages.items()}
         to_install_list = []
 
         for package, ver in elyra_packages.items():
-            if package in current_packages:
-                if "git+" in current_packages[package]:
+            current_ver = current_packages.get(cls.normalize_package_name(package))
+            if current_ver is not None:
+                if "git+" in current_ver:
                     logger.warning(f"WARNING: Source package {package} found already installed from "
-                                   f"{current_packages[package]}. This may conflict with the required "
+                                   f"{current_ver}. This may conflict with the required "
                                    f"version: {ver} . Skipping...")
-                elif isinstance(version.parse(current_packages[package]), version.LegacyVersion):
+                elif not PackageVersion.is_valid(current_ver):
                     logger.warning(f"WARNING: Package {package} found with unsupported Legacy version "
-                                   f"scheme {current_packages[package]} already installed. Skipping...")
-                elif version.parse(ver) > version.parse(current_packages[package]):
-                    logger.info(f"Updating {package} package from version {current_packages[package]} to {ver}...")
+                                   f"scheme {current_ver} already installed. Skipping...")
+                elif PackageVersion(ver) > PackageVersion(current_ver):
+                    logger.info(f"Updating {package} package from version {current_ver} to {ver}...")
                     to_install_list.append(package + '==' + ver)
-                elif version.parse(ver) < version.parse(current_packages[package]):
-                    logger.info(f"Newer {package} package with version {current_packages[package]} "
+                elif PackageVersion(ver) < PackageVersion(current_ver):
+                    logger.info(f"Newer {package} package with version {current_ver} "
                                 f"already installed. Skipping...")
             else:
                 logger.info(f"Package not found. Installing {package} package with version {ver}...")
                 to_install_list.append(package + '==' + ver)
+        return to_install_list
 
-        if to_install_list:
-            if user_volume_path:
-                to_install_list.insert(0, '--target=' + user_volume_path)
-                to_install_list.append('--no-cache-dir')
+    @classmethod
+    def install_object_storage_client(cls, wheelhouse: Optional[str] = None) -> None:
+        """Installs minio and its dependencies, constrained to the versions of requirements-elyra.txt,
+        into a directory of this process, which is added to sys.path.  The prepare phase of an init
+        container whose image lacks minio requires it, which is not installed into the user volume
+        if the operation's image provides it.
+        """
+        target_dir = mkdtemp(prefix='elyra-bootstrap-')
+        pip_install = [sys.executable, '-m', 'pip', 'install', '--target=' + target_dir, '--no-cache-dir',
+                       '--constraint=requirements-elyra.txt']
+        if wheelhouse and os.path.isdir(wheelhouse):
+            pip_install.append('--find-links=' + wheelhouse)
+        subprocess.run(pip_install + ['minio'], check=True)
+        sys.path.insert(0, target_dir)
+        importlib.invalidate_caches()
+
+    @classmethod
+    def get_dependency_closure(cls, package: str) -> set:
+        """Returns the normalized names of package and of the installed distributions that it
+        requires, directly or indirectly.  Requirements of extras are ignored, requirements with
+        other environment markers are included whether or not they apply.
+        """
+        try:
+            from importlib import metadata
+            get_requirements = metadata.requires
+        except ImportError:  # Python < 3.8
+            import pkg_resources
+
+            def get_requirements(name):
+                return [str(requirement) for requirement in pkg_resources.get_distribution(name).requires()]
+
+        closure = set()
+        packages = [package]
+        while packages:
+            name = cls.normalize_package_name(packages.pop())
+            if name in closure:
+                continue
+            closure.add(name)
+            try:
+                requirements = get_requirements(name) or []
+            except Exception:  # e.g. not installed
+                continue
+            packages.extend(re.match(r"[A-Za-z0-9._-]+", requirement).group(0) for requirement in requirements
+                            if not re.search(r"\bextra\s*==", requirement))
+        return closure
 
-            subprocess.run([sys.executable, '-m', 'pip', 'install'] + to_install_list, check=True)
+    @classmethod
+    def write_installed_packages(cls, filename: str, user_volume_path: Optional[str] = None) -> None:
+        """Writes the installed distributions to filename, e.g. requirements-current.txt, so that
+        packages can be installed for this environment by a process running in another one.
+        """
+        installed_list = cls.package_dict_to_list(cls.get_installed_packages(user_volume_path))
+        with open(filename, 'w') as f:
+            f.writelines(f"{package}\n" for package in installed_list)
+        OpUtil.log_operation_info(f"listed {len(installed_list)} installed package(s) in {filename}")
 
-        if user_volume_path:
-            os.environ["PIP_CONFIG_FILE"] = user_volume_path + "/pip.conf"
+    @classmethod
+    def package_dict_to_list(cls, package_dict: dict) -> List[str]:
+        """Returns the sorted lines of a package list that package_list_to_dict reads as package_dict"""
+        return [f"{package} @ {ver}" if "://" in ver else f"{package}=={ver}"
+                for package, ver in sorted(package_dict.items())]
 
-        subprocess.run([sys.executable, '-m', 'pip', 'freeze'])
+    @classmethod
+    def get_installed_packages(cls, user_volume_path: Optional[str] = None) -> dict:
+        """Returns the distributions that are installed in user_volume_path or on sys.path,
+        using the same name/version notation as package_list_to_dict.  Distributions that
+        were installed from a source repository map to their URL instead of a version.
+        """
+        import importlib
+        importlib.invalidate_caches()  # pick up distributions installed by this process
+
+        search_path = [user_volume_path] if user_volume_path else []
+        # packages bundled with the bootstrapper zipapp are not available to the notebook kernel
+        search_path.extend(path for path in sys.path if path != user_volume_path and not path.endswith('.pyz'))
+        installed_packages = {}
+        try:
+            from importlib import metadata
+        except ImportError:  # Python < 3.8
+            import pkg_resources
+            for dist in pkg_resources.WorkingSet(search_path):
+                installed_packages.setdefault(dist.project_name, dist.version)
+            return installed_packages
+
+        for dist in metadata.distributions(path=search_path):
+            name = dist.metadata['Name']
+            if not name or name in installed_packages:
+                continue  # distributions found earlier on the search path take precedence
+            installed_packages[name] = dist.version
+            direct_url = dist.read_text('direct_url.json')
+            if direct_url:
+                direct_url = json.loads(direct_url)
+                vcs_info = direct_url.get('vcs_info')
+                if vcs_info:
+                    installed_packages[name] = f"{vcs_info['vcs']}+{direct_url['url']}@{vcs_info['commit_id']}"
+                elif not direct_url.get('dir_info', {}).get('editable'):
+                    installed_packages[name] = direct_url['url']
+        return installed_packages
+
+    @classmethod
+    def precompile_packages(cls, packages_dir: str) -> None:
+        """Compiles the python modules in packages_dir to bytecode using one process per CPU
+        that the container may use, or ELYRA_PRECOMPILE_WORKERS processes if set.
+        If ELYRA_MEASURE_IMPORT_TIMES is set to true, the import times of the lazily imported
+        modules before and after the compilation are logged, which takes two extra interpreter launches.
+        """
+        measure_import_times = os.getenv('ELYRA_MEASURE_IMPORT_TIMES', 'false').lower() == 'true'
+        if measure_import_times:
+            import_times_before = cls.measure_import_times(LAZY_IMPORT_MODULES, write_bytecode=False)
+        # compileall's default of os.cpu_count() processes ignores the container's CPU limit
+        workers = max(1, int(os.getenv('ELYRA_PRECOMPILE_WORKERS', '0')) or cls.get_usable_cpu_count())
+        t0 = time.time()
+        if not compileall.compile_dir(packages_dir, quiet=1, workers=workers):
+            # e.g. modules of packages that use a different Python version's syntax
+            logger.warning(f"WARNING: Some python modules in {packages_dir} could not be compiled")
         duration = time.time() - t0
-        OpUtil.log_operation_info("Packages installed", duration)
+        OpUtil.log_operation_info(f"precompiled packages in {packages_dir}", duration)
+        if not measure_import_times:
+            return
+        import_times_after = cls.measure_import_times(LAZY_IMPORT_MODULES, write_bytecode=True)
+        logger.info("Import times before/after precompilation: " +
+                    ", ".join(f"{module} {import_times_before.get(module, float('nan')):.3f}/"
+                              f"{import_times_after.get(module, float('nan')):.3f} secs"
+                              for module in LAZY_IMPORT_MODULES))
+
+    @classmethod
+    def get_usable_cpu_count(cls, cgroup_root: str = '/sys/fs/cgroup') -> int:
+        """Returns the number of CPUs the process may run on, limited by the CPU quota of its
+        cgroup, which is how the CPU limit of a container is enforced.
+        """
+        try:
+            cpu_count = len(os.sched_getaffinity(0))
+        except AttributeError:  # not available on all platforms
+            cpu_count = os.cpu_count() or 1
+        try:
+            # cgroup v2 ('max 100000' if unlimited), else cgroup v1 (-1 if unlimited)
+            with open(os.path.join(cgroup_root, 'cpu.max')) as f:
+                quota, period = f.read().split()[:2]
+        except OSError:
+            try:
+                with open(os.path.join(cgroup_root, 'cpu', 'cpu.cfs_quota_us')) as f:
+                    quota = f.read().strip()
+                with open(os.path.join(cgroup_root, 'cpu', 'cpu.cfs_period_us')) as f:
+                    period = f.read().strip()
+            except OSError:
+                return cpu_count
+        if quota in ('max', '-1'):
+            return cpu_count
+        return max(1, min(cpu_count, math.ceil(int(quota) / int(period))))
+
+    @classmethod
+    def measure_import_times(cls, modules: List[str], write_bytecode: bool = True) -> dict:
+        """Returns the times in seconds to import each module in a new interpreter.  Modules
+        that cannot be imported are omitted.  Unless write_bytecode is set, the interpreter
+        does not write bytecode, which would otherwise affect subsequent measurements.
+        """
+        script = ("import importlib, json, time\n"
+                  "import_times = {}\n"
+                  f"for module in {modules!r}:\n"
+                  "    t0 = time.perf_counter()\n"
+                  "    try:\n"
+                  "        importlib.import_module(module)\n"
+                  "    except ImportError:\n"
+                  "        continue\n"
+                  "    import_times[module] = time.perf_counter() - t0\n"
+                  "print(json.dumps(import_times))\n")
+        command = [sys.executable] + ([] if write_bytecode else ['-B']) + ['-c', script]
+        result = subprocess.run(command, stdout=subprocess.PIPE, universal_newlines=True)
+        if result.returncode != 0:
+            return {}
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    @classmethod
+    def find_missing_distributions(cls, wheelhouse: str, requirements: List[str]) -> List[str]:
+        """Returns the 'package==version' requirements without a wheel or source
+        distribution in the wheelhouse directory.
+        """
+        available = set()
+        for filename in os.listdir(wheelhouse):
+            if filename.endswith('.whl'):
+                # {distribution}-{version}(-{build tag})?-{python tag}-{abi tag}-{platform tag}.whl
+                package, ver = filename.split('-')[:2]
+            elif filename.endswith(('.tar.gz', '.zip')):
+                package, _, ver = filename.rsplit('.', 2 if filename.endswith('.tar.gz') else 1)[0].rpartition('-')
+            else:
+                continue
+            if PackageVersion.is_valid(ver):
+                available.add((cls.normalize_package_name(package), PackageVersion(ver).key))
+
+        missing = []
+        for requirement in requirements:
+            package, ver = requirement.split('==')
+            if (cls.normalize_package_name(package), PackageVersion(ver).key) not in available:
+                missing.append(requirement)
+        return missing
+
+    @classmethod
+    def normalize_package_name(cls, package_name: str) -> str:
+        """Normalizes package_name as defined by PEP 503."""
+        return re.sub(r"[-_.]+", "-", package_name).lower()
 
     @classmethod
     def package_list_to_dict(cls, filename: str) -> dict:
@@ -551,6 +1867,50 @@ class OpUtil(object):
 
         return package_dict
 
+    @classmethod
+    def compute_file_digests(cls, filename: str, part_sizes: Iterable[int] = ()) -> dict:
+        """Computes, in a single pass over the file, its MD5 and SHA-256 digests as well as the
+        ETags of multipart uploads of the file for each of the given part sizes.
+
+        :return: dict with keys 'md5', 'sha256' (hex digests) and 'multipart_etags' (list)
+        """
+        md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        parts = {part_size: {'digests': [], 'md5': hashlib.md5(), 'size': 0} for part_size in part_sizes}
+        with open(filename, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                md5.update(block)
+                sha256.update(block)
+                for part_size, part in parts.items():
+                    view = memoryview(block)
+                    while view:
+                        length = min(len(view), part_size - part['size'])
+                        part['md5'].update(view[:length])
+                        part['size'] += length
+                        view = view[length:]
+                        if part['size'] == part_size:
+                            part['digests'].append(part['md5'].digest())
+                            part['md5'] = hashlib.md5()
+                            part['size'] = 0
+
+        multipart_etags = []
+        for part in parts.values():
+            if part['size']:
+                part['digests'].append(part['md5'].digest())
+            multipart_etags.append(f"{hashlib.md5(b''.join(part['digests'])).hexdigest()}-{len(part['digests'])}")
+        return {'md5': md5.hexdigest(), 'sha256': sha256.hexdigest(), 'multipart_etags': multipart_etags}
+
+    @classmethod
+    def parse_size(cls, size: str) -> int:
+        """Converts a size such as '512', '16Mi' or '2G' into a number of bytes.
+        Suffixes K, M, G and T (optionally followed by 'i' and/or 'B') denote binary multiples.
+        """
+        multipliers = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+        value = size.strip().upper().rstrip('B').rstrip('I')
+        if value and value[-1] in multipliers:
+            return int(float(value[:-1]) * multipliers[value[-1]])
+        return int(value)
+
     @classmethod
     def parse_arguments(cls, args) -> dict:
         import argparse
@@ -571,6 +1931,37 @@ class OpUtil(object):
         parser.add_argument('-i', '--inputs', dest="inputs", help='Files to pull in from parent node', required=False)
         parser.add_argument('-p', '--user-volume-path', dest="user-volume-path",
                             help='Directory in Volume to install python libraries into', required=False)
+        parser.add_argument('--phase', dest="phase", choices=['all', 'inventory', 'prepare', 'execute'],
+                            default='all',
+                            help='Phases to run: inventory (list the installed packages for a prepare phase '
+                                 'that runs in another image), prepare (install packages and download '
+                                 'dependencies), execute (execute the file and upload outputs) or all',
+                            required=False)
+        parser.add_argument('--site-packages-snapshot', dest="site-packages-snapshot", action='store_true',
+                            help='Restore packages installed into the user volume from a snapshot in object storage',
+                            required=False)
+        parser.add_argument('--wheelhouse', dest="wheelhouse",
+                            help='Directory containing the distributions of the required python packages',
+                            required=False)
+        parser.add_argument('--cache-dir', dest="cache-dir",
+                            help='Node-local directory in which downloaded and uploaded objects are cached',
+                            required=False)
+        parser.add_argument('--cache-size-limit', dest="cache-size-limit",
+                            help='Maximum size of the node-local object cache, e.g. 10Gi', required=False)
+        parser.add_argument('--html-export', dest="html-export", choices=['full', 'fast', 'none'], default='full',
+                            help='Conversion of the executed notebook to html: full, fast (minimal template '
+                                 'with separately uploaded images) or none', required=False)
+        parser.add_argument('--checkpoint-interval', dest="checkpoint-interval",
+                            help='Interval in seconds at which the partially executed notebook is uploaded',
+                            required=False)
+        parser.add_argument('--externalize-outputs', dest="externalize-outputs",
+                            help='Move notebook outputs of at least this size, e.g. 1Mi, to separate objects',
+                            required=False)
+        parser.add_argument('--profile', dest="profile", action='store_true',
+                            help='Profile python scripts and upload their profiles', required=False)
+        parser.add_argument('--kernel-name', dest="kernel-name",
+                            help='Kernel to execute the notebook with instead of finding the best kernel',
+                            required=False)
         parsed_args = vars(parser.parse_args(args))
 
         # cos-directory is the pipeline name, set as global
@@ -599,6 +1990,542 @@ class OpUtil(object):
             duration_clause = f"({duration_secs:.3f} secs)" if duration_secs else ""
             logger.info(f"'{pipeline_name}':'{operation_name}' - {action_clause} {duration_clause}")
 
+    @classmethod
+    def configure_ca_certificates(cls) -> None:
+        """Points SSL_CERT_FILE, which minio prefers over certifi's CA bundle, to the system's
+        CA bundle if certifi's CA bundle is not a file.  On Python < 3.7, certifi does not extract
+        its CA bundle from the bootstrapper zipapp and returns a path inside the archive.
+        """
+        if os.getenv('SSL_CERT_FILE'):
+            return
+        try:
+            import certifi
+        except ImportError:
+            return
+        if os.path.isfile(certifi.where()):
+            return
+        import ssl
+        default_paths = ssl.get_default_verify_paths()
+        for ca_file in [default_paths.cafile, default_paths.openssl_cafile,
+                        '/etc/ssl/certs/ca-certificates.crt', '/etc/pki/tls/certs/ca-bundle.crt']:
+            if ca_file and os.path.isfile(ca_file):
+                logger.debug(f"Using the CA certificates in {ca_file}")
+                os.environ['SSL_CERT_FILE'] = ca_file
+                return
+        logger.warning(f"WARNING: No CA certificates found, the CA bundle {certifi.where()} is not a file")
+
+    @classmethod
+    def get_peak_rss(cls) -> int:
+        """Returns the peak resident set size of the bootstrapper process in KiB"""
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # reported in bytes on macOS
+        return peak_rss // 1024 if sys.platform == 'darwin' else peak_rss
+
+
+@total_ordering
+class PackageVersion(object):
+    """Comparable PEP 440 version, equivalent to packaging.version.Version.
+
+    Vendored to avoid installing packaging before the bootstrapper can run.
+    """
+    pattern = re.compile(r"""
+        ^\s*v?
+        (?:(?P<epoch>[0-9]+)!)?
+        (?P<release>[0-9]+(?:\.[0-9]+)*)
+        (?P<pre>[-_.]?(?P<pre_l>alpha|a|beta|b|preview|pre|c|rc)[-_.]?(?P<pre_n>[0-9]+)?)?
+        (?P<post>(?:-(?P<post_n1>[0-9]+))|(?:[-_.]?(?P<post_l>post|rev|r)[-_.]?(?P<post_n2>[0-9]+)?))?
+        (?P<dev>[-_.]?(?P<dev_l>dev)[-_.]?(?P<dev_n>[0-9]+)?)?
+        (?:\+(?P<local>[a-z0-9]+(?:[-_.][a-z0-9]+)*))?
+        \s*$""", re.VERBOSE | re.IGNORECASE)
+    pre_labels = {'alpha': 'a', 'beta': 'b', 'c': 'rc', 'pre': 'rc', 'preview': 'rc'}
+
+    def __init__(self, version: str) -> None:
+        match = self.pattern.match(version)
+        if not match:
+            raise ValueError(f"Invalid version: '{version}'")
+        self.version = version
+
+        release = [int(i) for i in match.group('release').split('.')]
+        while len(release) > 1 and release[-1] == 0:
+            release.pop()  # 1.0 == 1.0.0
+        # Missing segments are represented by tuples that sort before or after all present segments
+        if match.group('pre'):
+            pre_l = match.group('pre_l').lower()
+            pre = (1, self.pre_labels.get(pre_l, pre_l), int(match.group('pre_n') or 0))
+        elif match.group('dev') and not match.group('post'):
+            pre = (0,)  # 1.0.dev0 < 1.0a0
+        else:
+            pre = (2,)
+        if match.group('post'):
+            post = (1, int(match.group('post_n1') or match.group('post_n2') or 0))
+        else:
+            post = (0,)
+        dev = (0, int(match.group('dev_n') or 0)) if match.group('dev') else (1,)
+        local = tuple((1, int(part), '') if part.isdigit() else (0, 0, part.lower())
+                      for part in re.split(r"[-_.]", match.group('local') or '') if part)
+        self.key = (int(match.group('epoch') or 0), tuple(release), pre, post, dev, local)
+
+    @classmethod
+    def is_valid(cls, version: str) -> bool:
+        return cls.pattern.match(version) is not None
+
+    def __eq__(self, other: 'PackageVersion') -> bool:
+        return self.key == other.key
+
+    def __lt__(self, other: 'PackageVersion') -> bool:
+        return self.key < other.key
+
+    def __repr__(self) -> str:
+        return f"<PackageVersion('{self.version}')>"
+
+
+class PhaseScheduler(object):
+    """Runs the phases of an operation, concurrently if they are independent of each other,
+    and records when each phase started and completed.
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.time()
+        self.timeline = []  # (phase, start, end) relative to t0, in the order in which phases completed
+        self._timeline_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(thread_name_prefix='phase')
+
+    def run(self, phase: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Runs the phase in the calling thread and returns its result"""
+        start = time.time() - self.t0
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._timeline_lock:
+                self.timeline.append((phase, start, time.time() - self.t0))
+
+    def submit(self, phase: str, func: Callable, *args: Any, **kwargs: Any) -> Future:
+        """Starts the phase in a worker thread"""
+        return self._executor.submit(self.run, phase, func, *args, **kwargs)
+
+    def join(self, *phases: Future) -> None:
+        """Waits until all phases completed and raises the error of the first failed phase, if any"""
+        wait(phases)
+        for phase in phases:
+            phase.result()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def log_timeline(self) -> None:
+        for phase, start, end in sorted(self.timeline, key=lambda entry: entry[1]):
+            OpUtil.log_operation_info(f"phase '{phase}' ran from {start:.3f} to {end:.3f} secs", end - start)
+        if self.timeline:
+            wall_clock = max(end for _, _, end in self.timeline) - min(start for _, start, _ in self.timeline)
+            sequential = sum(end - start for _, start, end in self.timeline)
+            OpUtil.log_operation_info(f"phases completed in {wall_clock:.3f} secs, "
+                                      f"{sequential - wall_clock:.3f} secs less than if run sequentially")
+
+
+class SitePackagesSnapshotStore(object):
+    """Stores snapshots of the packages installed into the user volume in object storage.
+
+    Snapshots are keyed by the list of installed packages, the Python version and the
+    platform.  Since the minio package might not be installed before the Elyra requirements,
+    it is imported lazily and snapshots can only be restored if it is already available.
+    Snapshots are only published by operations that found them to be missing and are never
+    overwritten.  Errors are logged, but do not fail the operation, which then installs the packages.
+    """
+
+    def __init__(self, cos_endpoint: str, cos_bucket: str) -> None:
+        self.cos_endpoint = urlparse(cos_endpoint)
+        self.cos_bucket = cos_bucket
+        self.cos_client = None
+        self.download_retry_policy = RetryPolicy.from_env('download')
+        self.upload_retry_policy = RetryPolicy.from_env('upload')
+
+    def get_cos_client(self) -> Optional[Any]:
+        if not self.cos_client:
+            try:
+                import importlib
+                importlib.invalidate_caches()  # minio might have been installed by this process
+                import minio
+            except ImportError:
+                return None
+            self.cos_client = minio.Minio(self.cos_endpoint.netloc,
+                                          access_key=os.getenv('AWS_ACCESS_KEY_ID'),
+                                          secret_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+                                          secure=self.cos_endpoint.scheme == 'https')
+        return self.cos_client
+
+    @classmethod
+    def get_snapshot_key(cls, install_list: List[str]) -> str:
+        install_plan = {'python': f"{sys.version_info[0]}.{sys.version_info[1]}",
+                        'platform': sysconfig.get_platform(),
+                        'packages': sorted(install_list)}
+        return hashlib.sha256(json.dumps(install_plan, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get_object_name(self, snapshot_key: str) -> str:
+        return f"{SITE_PACKAGES_SNAPSHOT_PREFIX}{snapshot_key}.tar.gz"
+
+    def restore(self, snapshot_key: str, target_dir: str) -> Optional[bool]:
+        """Extracts the snapshot into target_dir.  Returns False if the snapshot does not exist and
+        None if it cannot be restored.  target_dir is left unchanged unless the snapshot is restored.
+        """
+        cos_client = self.get_cos_client()
+        if not cos_client:
+            logger.info("Package snapshots cannot be restored before minio is installed")
+            return None
+
+        import minio
+        object_name = self.get_object_name(snapshot_key)
+        restore_dir = os.path.join(target_dir, '.elyra-snapshot')
+        t0 = time.time()
+        try:
+            response = self.download_retry_policy.call(f"download of {object_name}", cos_client.get_object,
+                                                       bucket_name=self.cos_bucket, object_name=object_name)
+        except minio.error.NoSuchKey:
+            logger.info(f"Package snapshot {object_name} not found in bucket: {self.cos_bucket}")
+            return False
+        except Exception as ex:
+            logger.warning(f"Unable to restore package snapshot {object_name}: {ex}")
+            return None
+
+        shutil.rmtree(restore_dir, ignore_errors=True)
+        moved_entries = []
+        try:
+            # extract into a temporary directory so that a failed restore leaves no partial installation
+            with tarfile.open(fileobj=response, mode='r|gz') as tar:
+                for member in tar:
+                    FileOpBase._validate_archive_member(member, os.path.realpath(restore_dir))
+                    tar.extract(member, path=restore_dir)
+            bytes_read = response.tell()
+            entries = os.listdir(restore_dir)
+            conflicts = [entry for entry in entries if os.path.lexists(os.path.join(target_dir, entry))]
+            if conflicts:
+                raise FileExistsError(f"{', '.join(sorted(conflicts))} already present in {target_dir}")
+            for entry in entries:
+                os.rename(os.path.join(restore_dir, entry), os.path.join(target_dir, entry))
+                moved_entries.append(entry)
+        except Exception as ex:
+            logger.warning(f"Unable to restore package snapshot {object_name}: {ex}")
+            # remove the entries that were already moved into target_dir
+            for entry in moved_entries:
+                path = os.path.join(target_dir, entry)
+                if os.path.isdir(path) and not os.path.islink(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.remove(path)
+            return None
+        finally:
+            response.close()
+            response.release_conn()
+            shutil.rmtree(restore_dir, ignore_errors=True)
+
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"restored package snapshot from bucket: {self.cos_bucket}, "
+                                  f"object: {object_name} ({bytes_read} bytes)", duration)
+        return True
+
+    def publish(self, snapshot_key: str, source_dir: str) -> None:
+        """Uploads a snapshot of the packages installed in source_dir, unless the snapshot was
+        published in the meantime.
+        """
+        cos_client = self.get_cos_client()
+        if not cos_client:
+            logger.warning("Package snapshot cannot be published without minio")
+            return
+
+        import minio
+        object_name = self.get_object_name(snapshot_key)
+        t0 = time.time()
+        try:
+            self.upload_retry_policy.call(f"stat of {object_name}", cos_client.stat_object,
+                                          bucket_name=self.cos_bucket, object_name=object_name)
+            logger.info(f"Package snapshot {object_name} already published to bucket: {self.cos_bucket}")
+            return
+        except minio.error.NoSuchKey:
+            pass
+        except Exception as ex:
+            logger.warning(f"Unable to publish package snapshot {object_name}: {ex}")
+            return
+
+        try:
+            with NamedTemporaryFile(suffix='.tar.gz') as snapshot_file:
+                # favor speed over size, the snapshot is mostly restored on the same network
+                with tarfile.open(fileobj=snapshot_file, mode='w:gz', compresslevel=1) as tar:
+                    for entry in sorted(os.listdir(source_dir)):
+                        if entry != 'pip.conf':  # provided by NotebookOp
+                            tar.add(os.path.join(source_dir, entry), arcname=entry)
+                snapshot_file.flush()
+                self.upload_retry_policy.call(f"upload of {object_name}", cos_client.fput_object,
+                                              bucket_name=self.cos_bucket, object_name=object_name,
+                                              file_path=snapshot_file.name)
+                snapshot_size = os.path.getsize(snapshot_file.name)
+        except Exception as ex:
+            logger.warning(f"Unable to publish package snapshot {object_name}: {ex}")
+            return
+
+        duration = time.time() - t0
+        OpUtil.log_operation_info(f"published package snapshot to bucket: {self.cos_bucket}, "
+                                  f"object: {object_name} ({snapshot_size} bytes)", duration)
+
+
+class ObjectCache(object):
+    """Node-local cache of object storage objects, keyed by bucket, object name and ETag.
+
+    Entries are stored under the SHA-256 digest of their key, so any change of an object
+    results in a new entry.  The SHA-256 digest of each entry's content is stored next to
+    the entry and verified whenever the entry is retrieved, entries that do not match their
+    digest are removed.  The least recently used entries are evicted once the size of
+    the cache exceeds its limit.  Files are copied into and out of the cache, unless
+    ELYRA_CACHE_HARDLINKS is set to true, in which case read-only hardlinks are used
+    where the cache and the working directory are located on the same file system.
+    """
+
+    def __init__(self, cache_dir: str, size_limit: int) -> None:
+        self.cache_dir = cache_dir
+        self.size_limit = size_limit
+        self.use_hardlinks = os.getenv('ELYRA_CACHE_HARDLINKS', 'false').lower() == 'true'
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get_entry_path(self, bucket_name: str, object_name: str, etag: str) -> str:
+        key = hashlib.sha256(f"{bucket_name}/{object_name}/{etag}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, bucket_name: str, object_name: str, etag: str, file_path: str) -> bool:
+        """Stores the cached object in file_path.  Returns False if the object is not cached
+        or if its cached content does not match the digest recorded when it was cached.
+        """
+        entry_path = self.get_entry_path(bucket_name, object_name, etag)
+        if os.path.dirname(file_path):
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        try:
+            with open(entry_path + DIGEST_SUFFIX) as f:
+                sha256 = f.read().strip()
+            self._link_or_copy(entry_path, file_path + '.part')
+            os.utime(entry_path)  # mark the entry as recently used
+        except FileNotFoundError:
+            return False
+        if OpUtil.compute_file_digests(file_path + '.part')['sha256'] != sha256:
+            logger.warning(f"Removing cache entry {entry_path} of {bucket_name}/{object_name}, "
+                           f"its content does not match its digest.")
+            os.remove(file_path + '.part')
+            self.remove(entry_path)
+            return False
+        os.replace(file_path + '.part', file_path)
+        return True
+
+    def put(self, bucket_name: str, object_name: str, etag: str, file_path: str) -> None:
+        """Adds file_path to the cache as the content of the object and evicts
+        the least recently used entries if the cache exceeds its size limit.
+        """
+        entry_path = self.get_entry_path(bucket_name, object_name, etag)
+        if os.path.exists(entry_path) and os.path.exists(entry_path + DIGEST_SUFFIX):
+            os.utime(entry_path)
+            return
+        # cache directories may be shared by concurrently running operations
+        temp_entry_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # the digest is in place before the entry, so that every entry can be verified
+            with open(temp_entry_path, 'w') as f:
+                f.write(OpUtil.compute_file_digests(file_path)['sha256'])
+            os.replace(temp_entry_path, entry_path + DIGEST_SUFFIX)
+            self._link_or_copy(file_path, temp_entry_path)
+            os.replace(temp_entry_path, entry_path)
+        except OSError as ose:
+            logger.warning(f"Unable to cache {file_path}: {ose}")
+            return
+        self.evict()
+
+    def remove(self, entry_path: str) -> None:
+        """Removes an entry and its digest from the cache."""
+        for path in [entry_path, entry_path + DIGEST_SUFFIX]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # removed by a concurrently running operation
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until the cache fits its size limit."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(('.tmp', DIGEST_SUFFIX)):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # evicted by a concurrently running operation
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        cache_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if cache_size <= self.size_limit:
+                break
+            self.remove(path)
+            cache_size -= size
+            logger.debug(f"Evicted {path} from cache {self.cache_dir}")
+
+    def _link_or_copy(self, src: str, dst: str) -> None:
+        if self.use_hardlinks:
+            try:
+                os.link(src, dst)
+                # shared inodes must not be modified in place
+                os.chmod(dst, 0o444)
+                return
+            except FileExistsError:
+                os.remove(dst)
+                return self._link_or_copy(src, dst)
+            except OSError as ose:
+                if not os.path.exists(src):
+                    raise
+                logger.debug(f"Unable to link {src} to {dst}, copying instead: {ose}")
+        shutil.copyfile(src, dst)
+
+
+class KernelSpecIndex(object):
+    """Index of the installed kernels, mapping their names to their languages.
+
+    Building the index requires listing the kernel directories and reading the kernel.json file
+    of each kernel, so it is only used if the notebook's kernel is not installed.  It is persisted
+    as JSON in ELYRA_KERNELSPEC_INDEX, which defaults to the Jupyter data directory of the image,
+    along with the modification times of the kernel directories and kernel.json files.  The index
+    is rebuilt once any of them has changed.
+    """
+
+    def __init__(self, index_file: Optional[str] = None) -> None:
+        if not index_file:
+            from jupyter_core.paths import jupyter_data_dir
+
+            index_file = os.getenv('ELYRA_KERNELSPEC_INDEX') or \
+                os.path.join(jupyter_data_dir(), 'elyra-kernelspec-index.json')
+        self.index_file = index_file
+
+    def has_kernel(self, kernel_name: Optional[str]) -> bool:
+        """Returns True if a kernel named kernel_name is installed.  Only its kernel.json file is
+        looked up in the kernel directories, which are neither listed nor indexed.
+        """
+        from jupyter_client.kernelspec import KernelSpecManager, NATIVE_KERNEL_NAME
+
+        if not kernel_name:
+            return False
+        kernel_spec_manager = KernelSpecManager()
+        if any(os.path.isfile(os.path.join(kernel_dir, kernel_name, 'kernel.json'))
+               for kernel_dir in kernel_spec_manager.kernel_dirs):
+            return True
+        # provided by ipykernel unless it is installed as a kernel
+        return kernel_name == NATIVE_KERNEL_NAME and kernel_spec_manager.ensure_native_kernel and \
+            importlib.util.find_spec('ipykernel') is not None
+
+    def get_kernel_languages(self) -> dict:
+        """Returns the languages of the installed kernels by kernel name"""
+        from jupyter_client.kernelspec import KernelSpecManager
+
+        kernel_dirs = KernelSpecManager().kernel_dirs
+        index = self.load(kernel_dirs)
+        if index is None:
+            index = self.build(kernel_dirs)
+        return {name: kernel['language'] for name, kernel in index['kernels'].items()}
+
+    def load(self, kernel_dirs: List[str]) -> Optional[dict]:
+        """Returns the persisted index, or None if it does not exist or is outdated"""
+        try:
+            with open(self.index_file) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if index.get('kernel_dirs') != {kernel_dir: KernelSpecIndex.get_mtime(kernel_dir)
+                                        for kernel_dir in kernel_dirs}:
+            return None
+        for kernel in index.get('kernels', {}).values():
+            if kernel['mtime'] != KernelSpecIndex.get_mtime(os.path.join(kernel['resource_dir'], 'kernel.json')):
+                return None
+        return index
+
+    def build(self, kernel_dirs: List[str]) -> dict:
+        """Builds the index from the installed kernels and persists it"""
+        from jupyter_client.kernelspec import KernelSpecManager
+
+        index = {'kernel_dirs': {kernel_dir: KernelSpecIndex.get_mtime(kernel_dir) for kernel_dir in kernel_dirs},
+                 'kernels': {}}
+        for name, resource_dir in KernelSpecManager().find_kernel_specs().items():
+            kernel_file = os.path.join(resource_dir, 'kernel.json')
+            mtime = KernelSpecIndex.get_mtime(kernel_file)
+            try:
+                with open(kernel_file) as f:
+                    language = json.load(f).get('language')
+            except (OSError, ValueError):
+                language = None
+            index['kernels'][name] = {'resource_dir': resource_dir, 'language': language, 'mtime': mtime}
+
+        try:
+            os.makedirs(os.path.dirname(self.index_file) or '.', exist_ok=True)
+            with NamedTemporaryFile('w', dir=os.path.dirname(self.index_file) or '.',
+                                    suffix='.tmp', delete=False) as f:
+                json.dump(index, f)
+            os.replace(f.name, self.index_file)
+        except OSError as ose:
+            logger.debug(f"Unable to persist kernelspec index {self.index_file}: {ose}")
+        return index
+
+    @staticmethod
+    def get_mtime(path: str) -> Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+
+class RetryPolicy(object):
+    """Retries operations that fail with transient errors using exponential backoff with full jitter."""
+
+    # Object storage error codes that indicate a transient condition
+    transient_error_codes = ['InternalError', 'RequestTimeout', 'ServiceUnavailable', 'SlowDown']
+
+    def __init__(self, max_attempts: int = 5, initial_backoff: float = 1.0, max_backoff: float = 30.0) -> None:
+        self.max_attempts = max(1, max_attempts)
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+
+    @classmethod
+    def from_env(cls, operation: str) -> 'RetryPolicy':
+        """Creates the retry policy for an operation type (e.g. 'download' or 'upload') from the
+        ELYRA_<OPERATION>_RETRY_ATTEMPTS, ELYRA_<OPERATION>_RETRY_BACKOFF and
+        ELYRA_<OPERATION>_RETRY_MAX_BACKOFF environment variables.
+        """
+        prefix = f"ELYRA_{operation.upper()}_RETRY_"
+        return cls(max_attempts=int(os.getenv(prefix + 'ATTEMPTS', '5')),
+                   initial_backoff=float(os.getenv(prefix + 'BACKOFF', '1')),
+                   max_backoff=float(os.getenv(prefix + 'MAX_BACKOFF', '30')))
+
+    def is_transient(self, error: Exception) -> bool:
+        """Returns True if error is caused by a condition that might not persist"""
+        import urllib3
+
+        if isinstance(error, (ConnectionError, TimeoutError,
+                              urllib3.exceptions.ProtocolError,
+                              urllib3.exceptions.MaxRetryError,
+                              urllib3.exceptions.TimeoutError)):
+            return True
+        return type(error).__name__ in self.transient_error_codes or \
+            getattr(error, 'code', None) in self.transient_error_codes
+
+    def call(self, description: str, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Invokes func with args and kwargs until it succeeds, fails with a permanent error or
+        the maximum number of attempts is reached.
+
+        :param description: description of the operation, used in log messages
+        :param func: the operation to invoke
+        :return: the value returned by func
+        """
+        attempt = 1
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except Exception as ex:
+                if attempt >= self.max_attempts or not self.is_transient(ex):
+                    raise
+                backoff = random.uniform(0, min(self.max_backoff, self.initial_backoff * 2 ** (attempt - 1)))
+                logger.warning(f"Attempt {attempt} of {self.max_attempts} of {description} failed: {ex}. "
+                               f"Retrying in {backoff:.2f} secs ...")
+                time.sleep(backoff)
+                attempt += 1
+
 
 def main():
     # Configure logger format, level
@@ -607,19 +2534,65 @@ def main():
                         level=logging.DEBUG)
     # Setup packages and gather arguments
     input_params = OpUtil.parse_arguments(sys.argv[1:])
-    OpUtil.log_operation_info("starting operation")
+    phase = input_params.get('phase') or 'all'
+    OpUtil.log_operation_info(f"starting operation ({phase} phase)" if phase != 'all' else "starting operation")
     t0 = time.time()
-    OpUtil.package_install(user_volume_path=input_params.get('user-volume-path'))
-
-    # Create the appropriate instance, process dependencies and execute the operation
-    file_op = FileOpBase.get_instance(**input_params)
-
-    file_op.process_dependencies()
-
-    file_op.execute()
-
-    # Process notebook | script metrics and KFP UI metadata
-    file_op.process_metrics_and_metadata()
+    if not os.path.isfile(__file__):
+        # run from the bootstrapper zipapp, which bundles certifi
+        OpUtil.configure_ca_certificates()
+    scheduler = PhaseScheduler()
+    try:
+        file_op = None
+        if phase == 'inventory':
+            # The prepare phase installs the packages that are missing or outdated in this image
+            scheduler.run('list installed packages', OpUtil.write_installed_packages, 'requirements-current.txt',
+                          input_params.get('user-volume-path'))
+
+        if phase in ['all', 'prepare']:
+            snapshot_store = None
+            if input_params.get('site-packages-snapshot'):
+                snapshot_store = SitePackagesSnapshotStore(input_params.get('cos-endpoint'),
+                                                           input_params.get('cos-bucket'))
+            install_kwargs = dict(user_volume_path=input_params.get('user-volume-path'),
+                                  wheelhouse=input_params.get('wheelhouse'),
+                                  snapshot_store=snapshot_store,
+                                  precompile=os.getenv('ELYRA_PRECOMPILE_PACKAGES', 'false').lower() == 'true',
+                                  to_install_list=OpUtil.get_packages_to_install(input_params.get('user-volume-path')))
+            # The download threads would otherwise import a mix of replaced and replacing modules
+            updated_packages = {OpUtil.normalize_package_name(requirement.split('==')[0])
+                                for requirement in install_kwargs['to_install_list']}
+            updates_minio = bool(updated_packages & OpUtil.get_dependency_closure('minio'))
+            if 'minio' not in updated_packages and not importlib.util.find_spec('minio'):
+                # e.g. in an init container whose image lacks minio, unlike the operation's image
+                scheduler.run('install object storage client', OpUtil.install_object_storage_client,
+                              input_params.get('wheelhouse'))
+
+            # If ELYRA_CONCURRENT_PHASES is enabled, dependencies are downloaded while packages are
+            # installed if the object storage client is already available and not updated by the
+            # installation.  Otherwise, it is installed before the download.
+            if importlib.util.find_spec('minio') and not updates_minio and \
+                    os.getenv('ELYRA_CONCURRENT_PHASES', 'false').lower() == 'true':
+                file_op = FileOpBase.get_instance(**input_params)
+                file_op.packages_installed.clear()
+                install = scheduler.submit('install packages', OpUtil.package_install, **install_kwargs)
+                install.add_done_callback(lambda _: file_op.packages_installed.set())
+                dependencies = scheduler.submit('process dependencies', file_op.process_dependencies)
+                scheduler.join(install, dependencies)
+            else:
+                scheduler.run('install packages', OpUtil.package_install, **install_kwargs)
+                file_op = FileOpBase.get_instance(**input_params)
+                scheduler.run('process dependencies', file_op.process_dependencies)
+
+        if phase in ['all', 'execute']:
+            # Create the appropriate instance and execute the operation
+            file_op = file_op or FileOpBase.get_instance(**input_params)
+            scheduler.run('execute', file_op.execute)
+
+            # Process notebook | script metrics and KFP UI metadata
+            scheduler.run('process metrics and metadata', file_op.process_metrics_and_metadata)
+    finally:
+        scheduler.shutdown()
+        scheduler.log_timeline()
 
     duration = time.time() - t0
     OpUtil.log_operation_info("operation completed", duration)
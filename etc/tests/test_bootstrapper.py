@@ -14,17 +14,28 @@
 # limitations under the License.
 #
 
+import base64
+import csv
+import io
+import importlib.util
 import json
 import hashlib
 import logging
+import math
 import minio
 import nbformat
 import os
 import papermill
 import pytest
 import mock
+import subprocess
 import sys
+import tarfile
+import threading
+import time
+import urllib3
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from tempfile import TemporaryFile
@@ -66,6 +77,7 @@ def main_method_setup_execution(monkeypatch, s3_setup, tmpdir, argument_dict):
     """Primary body for main method testing..."""
     monkeypatch.setattr(bootstrapper.OpUtil, 'parse_arguments', lambda x: argument_dict)
     monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', mock.Mock(return_value=True))
+    monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', mock.Mock(return_value=[]))
 
     monkeypatch.setenv("AWS_ACCESS_KEY_ID", "minioadmin")
     monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
@@ -137,6 +149,189 @@ def test_main_method(monkeypatch, s3_setup, tmpdir):
     main_method_setup_execution(monkeypatch, s3_setup, tmpdir, argument_dict)
 
 
+def test_main_method_phases(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'inputs': 'test-file.txt;test,file.txt',
+                     'outputs': 'test-file/test-file-copy.txt',
+                     'user-volume-path': None}
+    package_install = mock.Mock(return_value=True)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'parse_arguments', lambda x: argument_dict)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', package_install)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', mock.Mock(return_value=[]))
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "minioadmin")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
+
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-file.txt",
+                         file_path="etc/tests/resources/test-requirements-elyra.txt")
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test,file.txt",
+                         file_path="etc/tests/resources/test-bad-requirements-elyra.txt")
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-archive.tgz",
+                         file_path="etc/tests/resources/test-archive.tgz")
+
+    with tmpdir.as_cwd():
+        # e.g. in an init container that runs the operation's image
+        argument_dict['phase'] = 'inventory'
+        bootstrapper.main()
+        assert package_install.call_count == 0
+        assert not os.path.isfile('test-notebookA.ipynb')
+        installed_packages = bootstrapper.OpUtil.package_list_to_dict('requirements-current.txt')
+        assert installed_packages == bootstrapper.OpUtil.get_installed_packages()
+
+        # e.g. in an init container that runs another image
+        argument_dict['phase'] = 'prepare'
+        bootstrapper.main()
+        assert package_install.call_count == 1
+        assert os.path.isfile('test-file.txt')
+        assert os.path.isfile('test-notebookA.ipynb')
+        assert not os.path.isfile('test-notebookA-output.ipynb')
+
+        argument_dict['phase'] = 'execute'
+        bootstrapper.main()
+        assert package_install.call_count == 1
+        assert os.path.isfile('test-notebookA-output.ipynb')
+        assert s3_setup.stat_object(bucket_name=argument_dict['cos-bucket'],
+                                    object_name="test-directory/test-file/test-file-copy.txt")
+
+
+def test_main_method_prepare_phase_without_minio(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'user-volume-path': None,
+                     'phase': 'prepare'}
+    run_calls = []
+    find_spec = importlib.util.find_spec
+
+    def find_spec_without_minio(name, *args, **kwargs):
+        # minio is available once it was installed
+        if name == 'minio' and not run_calls:
+            return None
+        return find_spec(name, *args, **kwargs)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'parse_arguments', lambda x: argument_dict)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', mock.Mock(return_value=True))
+    monkeypatch.setattr(bootstrapper.subprocess, 'run', lambda args, **kwargs: run_calls.append(args))
+    monkeypatch.setattr(bootstrapper.importlib.util, 'find_spec', find_spec_without_minio)
+    monkeypatch.setattr(sys, 'path', list(sys.path))
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "minioadmin")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-archive.tgz",
+                         file_path="etc/tests/resources/test-archive.tgz")
+
+    with tmpdir.as_cwd():
+        # in an init container whose image lacks minio, while the operation's image provides it
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("minio==6.0.2\n")
+        with open("requirements-current.txt", "w") as f:
+            f.write("minio==6.0.2\n")
+        bootstrapper.main()
+
+        # minio is installed for the bootstrapper, not into the user volume
+        assert len(run_calls) == 1
+        target_dir = sys.path[0]
+        assert run_calls[0] == [sys.executable, '-m', 'pip', 'install', '--target=' + target_dir, '--no-cache-dir',
+                                '--constraint=requirements-elyra.txt', 'minio']
+        assert os.path.isfile('test-notebookA.ipynb')
+    os.rmdir(target_dir)
+
+
+def test_main_method_concurrent_phases(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'user-volume-path': None,
+                     'phase': 'prepare'}
+    install_threads = []
+
+    def package_install(**kwargs):
+        install_threads.append(threading.current_thread().name)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'parse_arguments', lambda x: argument_dict)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', package_install)
+    monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', mock.Mock(return_value=[]))
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "minioadmin")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "minioadmin")
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-archive.tgz",
+                         file_path="etc/tests/resources/test-archive.tgz")
+
+    with tmpdir.as_cwd():
+        # packages are installed before the dependencies are downloaded, unless enabled
+        monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', lambda path: ['papermill==2.1.2'])
+        bootstrapper.main()
+        assert install_threads[-1] == threading.main_thread().name
+
+        # then packages are installed while the dependencies are downloaded
+        monkeypatch.setenv("ELYRA_CONCURRENT_PHASES", "true")
+        bootstrapper.main()
+        assert install_threads[-1].startswith('phase')
+
+        # unless the object storage client or its dependencies are updated
+        assert {'minio', 'urllib3', 'certifi'} <= bootstrapper.OpUtil.get_dependency_closure('minio')
+        monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', lambda path: ['urllib3==1.26.5'])
+        bootstrapper.main()
+        assert install_threads[-1] == threading.main_thread().name
+
+
+def test_main_method_prewarm_kernel(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'inputs': 'test-file.txt;test,file.txt',
+                     'outputs': 'test-file/test-file-copy.txt;test-file/test,file/test,file-copy.txt',
+                     'user-volume-path': None}
+    monkeypatch.setenv("ELYRA_PREWARM_KERNEL", "true")
+
+    # the notebook is executed in the kernel that was started once the notebook was extracted
+    execute_notebook = papermill.execute_notebook
+    kernel_managers = []
+
+    def execute_notebook_with_kernel_manager(*args, **kwargs):
+        assert kwargs['km'].is_alive()
+        assert kwargs['engine_name'] == bootstrapper.PREWARMED_KERNEL_ENGINE
+        kernel_managers.append(kwargs['km'])
+        return execute_notebook(*args, **kwargs)
+    monkeypatch.setattr(papermill, "execute_notebook", execute_notebook_with_kernel_manager)
+
+    main_method_setup_execution(monkeypatch, s3_setup, tmpdir, argument_dict)
+    assert len(kernel_managers) == 1
+    assert not kernel_managers[0].is_alive()
+
+
+def test_main_method_externalize_outputs(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'inputs': 'test-file.txt;test,file.txt',
+                     'outputs': 'test-file/test-file-copy.txt;test-file/test,file/test,file-copy.txt',
+                     'user-volume-path': None,
+                     'externalize-outputs': '16'}
+    main_method_setup_execution(monkeypatch, s3_setup, tmpdir, argument_dict)
+
+    externalized_outputs = list(s3_setup.list_objects('test-bucket', prefix='test-directory/test-notebookA-outputs/',
+                                                      recursive=True))
+    assert externalized_outputs
+    with tmpdir.as_cwd():
+        with open('test-notebookA-output.ipynb') as f:
+            assert '\n' not in f.read()
+        nb = nbformat.read('test-notebookA-output.ipynb', as_version=4)
+        nbformat.validate(nb)
+
+
 def test_main_method_with_wildcard_outputs(monkeypatch, s3_setup, tmpdir):
     argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
                      'cos-bucket': 'test-bucket',
@@ -248,7 +443,7 @@ def test_process_metrics_method_no_metadata_file(monkeypatch, s3_setup, tmpdir):
             metadata = json.load(f)
             assert metadata.get('outputs') is not None
             assert isinstance(metadata['outputs'], list)
-            assert len(metadata['outputs']) == 1
+            assert len(metadata['outputs']) == 2
             assert metadata['outputs'][0]['storage'] == 'inline'
             assert metadata['outputs'][0]['type'] == 'markdown'
             assert '{}/{}/{}'.format(argument_dict['cos-endpoint'],
@@ -257,6 +452,21 @@ def test_process_metrics_method_no_metadata_file(monkeypatch, s3_setup, tmpdir):
                 in metadata['outputs'][0]['source']
             assert argument_dict['cos-dependencies-archive']\
                 in metadata['outputs'][0]['source']
+            # the cells that took longest to execute
+            assert metadata['outputs'][1]['storage'] == 'inline'
+            assert metadata['outputs'][1]['type'] == 'table'
+            assert metadata['outputs'][1]['header'] == ['cell', 'duration (secs)', 'status', 'source']
+            hot_cells = list(csv.reader(io.StringIO(metadata['outputs'][1]['source'])))
+            assert sorted(int(hot_cell[0]) for hot_cell in hot_cells) == [1, 2]
+            durations = [float(hot_cell[1]) for hot_cell in hot_cells]
+            assert durations == sorted(durations, reverse=True)
+            assert all(hot_cell[2] == 'completed' for hot_cell in hot_cells)
+        with open(output_path / 'mlpipeline-metrics.json', 'r') as f:
+            metrics = json.load(f)
+            assert len(metrics['metrics']) == 1
+            assert metrics['metrics'][0]['name'] == 'elyra-execution-seconds'
+            assert metrics['metrics'][0]['numberValue'] > 0
+            assert metrics['metrics'][0]['format'] == 'RAW'
     except AssertionError:
         raise
     except Exception as ex:
@@ -318,9 +528,12 @@ def test_process_metrics_method_valid_metadata_file(monkeypatch, s3_setup, tmpdi
             assert metadata['some_property'] == custom_metadata['some_property']
             assert metadata.get('outputs') is not None
             assert isinstance(metadata['outputs'], list)
-            assert len(metadata['outputs']) == 2
+            assert len(metadata['outputs']) == 3
             for output in metadata['outputs']:
-                if output.get('storage') is not None:
+                if output['type'] == 'table':
+                    # the cells that took longest to execute
+                    assert output['storage'] == 'inline'
+                elif output.get('storage') is not None:
                     assert output['storage'] == 'inline'
                     assert output['type'] == 'markdown'
                     assert '{}/{}/{}'.format(argument_dict['cos-endpoint'],
@@ -387,7 +600,7 @@ def test_process_metrics_method_invalid_metadata_file(monkeypatch, s3_setup, tmp
             metadata = json.load(f)
             assert metadata.get('outputs') is not None
             assert isinstance(metadata['outputs'], list)
-            assert len(metadata['outputs']) == 1
+            assert len(metadata['outputs']) == 2
             assert metadata['outputs'][0]['storage'] == 'inline'
             assert metadata['outputs'][0]['type'] == 'markdown'
             assert '{}/{}/{}'.format(argument_dict['cos-endpoint'],
@@ -405,6 +618,83 @@ def test_process_metrics_method_invalid_metadata_file(monkeypatch, s3_setup, tmp
         assert False
 
 
+def test_cell_timing_report(monkeypatch, s3_setup, tmpdir):
+    monkeypatch.setenv('ELYRA_HOT_CELLS', '2')
+    monkeypatch.setenv('ELYRA_WRITABLE_CONTAINER_DIR', str(tmpdir))
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_markdown_cell("# Title"))
+    for duration, source in [(1.5, 'load()'), (30.25, 'train(x, y)\nevaluate()'), (0.5, '')]:
+        nb.cells.append(nbformat.v4.new_code_cell(source, metadata={
+            'papermill': {'duration': duration, 'status': 'completed'}}))
+
+    with tmpdir.as_cwd():
+        # metrics produced by the notebook
+        with open('mlpipeline-metrics.json', 'w') as f:
+            json.dump({'metrics': [{'name': 'accuracy', 'numberValue': 0.9, 'format': 'PERCENTAGE'}]}, f)
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.input_params['cos-dependencies-archive'] = 'test-archive.tgz'
+        op.add_cell_timing_report(nb, 32.5)
+        op.process_metrics_and_metadata()
+
+    with open(os.path.join(tmpdir, 'mlpipeline-ui-metadata.json')) as f:
+        hot_cells = json.load(f)['outputs'][1]
+    assert hot_cells['type'] == 'table'
+    assert list(csv.reader(io.StringIO(hot_cells['source']))) == [
+        ['3', '30.250', 'completed', 'train(x, y)'],
+        ['2', '1.500', 'completed', 'load()']]
+    with open(os.path.join(tmpdir, 'mlpipeline-metrics.json')) as f:
+        assert json.load(f)['metrics'] == [
+            {'name': 'accuracy', 'numberValue': 0.9, 'format': 'PERCENTAGE'},
+            {'name': 'elyra-execution-seconds', 'numberValue': 32.5, 'format': 'RAW'}]
+
+
+def test_profile_python_script(monkeypatch, s3_setup, tmpdir):
+    config = {
+        'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+        'cos-bucket': 'test-bucket',
+        'cos-directory': 'test-directory',
+        'filepath': 'test-script.py',
+        'profile': True
+    }
+    with tmpdir.as_cwd():
+        with open('test-script.py', 'w') as f:
+            f.write('import sys\n'
+                    'def fib(n):\n'
+                    '    return n if n < 2 else fib(n - 1) + fib(n - 2)\n'
+                    'print(fib(20))\n'
+                    'sys.exit(int(sys.argv[1]) if len(sys.argv) > 1 else 0)\n')
+
+        op = bootstrapper.FileOpBase.get_instance(**config)
+        monkeypatch.setattr(op, "cos_client", s3_setup)
+        op.execute()
+
+        for file in ['test-script.log', 'test-script.pstats', 'test-script.collapsed.txt']:
+            assert s3_setup.stat_object('test-bucket', 'test-directory/' + file)
+        with open('test-script.log') as f:
+            assert f.read() == '6765\n'
+        with open('test-script.collapsed.txt') as f:
+            stacks = [line.rsplit(' ', 1) for line in f.read().splitlines()]
+        assert any(stack.endswith('test-script.py:2(fib)') and int(microseconds) > 0
+                   for stack, microseconds in stacks)
+
+        top_functions = op.ui_metadata_outputs[0]
+        assert top_functions['type'] == 'table'
+        assert top_functions['header'] == ['function', 'calls', 'total time (secs)', 'cumulative time (secs)']
+        top_functions = list(csv.reader(io.StringIO(top_functions['source'])))
+        assert any(function[0].endswith('test-script.py:2(fib)') and function[1] == '21891'
+                   for function in top_functions)
+
+        # the exit status of the script is preserved
+        monkeypatch.setattr(bootstrapper, 'PROFILE_SCRIPT', bootstrapper.PROFILE_SCRIPT.replace(
+            'sys.argv = [script]', 'sys.argv = [script, "3"]'))
+        s3_setup.remove_object('test-bucket', 'test-directory/test-script.pstats')
+        with pytest.raises(subprocess.CalledProcessError) as error:
+            op.execute()
+        assert error.value.returncode == 3
+        assert s3_setup.stat_object('test-bucket', 'test-directory/test-script.pstats')
+
+
 def test_fail_bad_endpoint_main_method(monkeypatch, tmpdir):
     argument_dict = {'cos-endpoint': MINIO_HOST_PORT,
                      'cos-bucket': 'test-bucket',
@@ -416,6 +706,7 @@ def test_fail_bad_endpoint_main_method(monkeypatch, tmpdir):
                      'user-volume-path': None}
     monkeypatch.setattr(bootstrapper.OpUtil, "parse_arguments", lambda x: argument_dict)
     monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', mock.Mock(return_value=True))
+    monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', mock.Mock(return_value=[]))
 
     mocked_func = mock.Mock(return_value="default", side_effect=['test-archive.tgz',
                                                                  'test-file.txt',
@@ -444,6 +735,7 @@ def test_fail_bad_notebook_main_method(monkeypatch, s3_setup, tmpdir):
 
     monkeypatch.setattr(bootstrapper.OpUtil, "parse_arguments", lambda x: argument_dict)
     monkeypatch.setattr(bootstrapper.OpUtil, 'package_install', mock.Mock(return_value=True))
+    monkeypatch.setattr(bootstrapper.OpUtil, 'get_packages_to_install', mock.Mock(return_value=[]))
 
     mocked_func = mock.Mock(return_value="default", side_effect=['test-bad-archiveB.tgz',
                                                                  'test-file.txt',
@@ -467,7 +759,7 @@ def test_fail_bad_notebook_main_method(monkeypatch, s3_setup, tmpdir):
             bootstrapper.main()
 
 
-def test_package_installation(monkeypatch, virtualenv):
+def test_package_installation(monkeypatch, virtualenv, tmpdir):
     elyra_dict = {'ipykernel': '5.3.0',
                   'ansiwrap': '0.8.4',
                   'packaging': '20.0',
@@ -488,6 +780,9 @@ def test_package_installation(monkeypatch, virtualenv):
 
     monkeypatch.setattr(bootstrapper.OpUtil, "package_list_to_dict", mocked_func)
     monkeypatch.setattr(sys, "executable", virtualenv.python)
+    # the list of installed packages is read from requirements-current.txt if it exists
+    tmpdir.join("requirements-current.txt").write("")
+    monkeypatch.chdir(tmpdir)
 
     virtualenv.run("python3 -m pip install bleach==3.1.5")
     virtualenv.run("python3 -m pip install ansiwrap==0.7.0")
@@ -512,7 +807,7 @@ def test_package_installation(monkeypatch, virtualenv):
         assert virtual_env_dict[package] == version
 
 
-def test_package_installation_with_target_path(monkeypatch, virtualenv):
+def test_package_installation_with_target_path(monkeypatch, virtualenv, tmpdir):
     # TODO : Need to add test for direct-source e.g. ' @ '
     elyra_dict = {'ipykernel': '5.3.0',
                   'ansiwrap': '0.8.4',
@@ -534,6 +829,9 @@ def test_package_installation_with_target_path(monkeypatch, virtualenv):
 
     monkeypatch.setattr(bootstrapper.OpUtil, "package_list_to_dict", mocked_func)
     monkeypatch.setattr(sys, "executable", virtualenv.python)
+    # the list of installed packages is read from requirements-current.txt if it exists
+    tmpdir.join("requirements-current.txt").write("")
+    monkeypatch.chdir(tmpdir)
 
     virtualenv.run("python3 -m pip install --upgrade pip")
     virtualenv.run("python3 -m pip install --target='/tmp/lib/' bleach==3.1.5")
@@ -559,6 +857,288 @@ def test_package_installation_with_target_path(monkeypatch, virtualenv):
         assert virtual_env_dict[package] == version
 
 
+def test_package_installation_in_process(monkeypatch, tmpdir):
+    installed_packages = bootstrapper.OpUtil.get_installed_packages()
+    assert installed_packages['minio'] == minio.__version__
+    assert installed_packages['papermill'] == papermill.__version__
+
+    run_calls = []
+    monkeypatch.setattr(bootstrapper.subprocess, "run", lambda *args, **kwargs: run_calls.append(args[0]))
+
+    with tmpdir.as_cwd():
+        # satisfied requirements do not invoke pip
+        with open("requirements-elyra.txt", "w") as f:
+            f.write(f"minio=={minio.__version__}\n")
+            f.write("Papermill==0.1\n")
+        bootstrapper.OpUtil.package_install(user_volume_path=None)
+        assert not run_calls
+
+        with open("requirements-elyra.txt", "a") as f:
+            f.write("not-installed-package==1.0\n")
+        bootstrapper.OpUtil.package_install(user_volume_path=None)
+        assert run_calls == [[sys.executable, '-m', 'pip', 'install', 'not-installed-package==1.0']]
+
+
+def test_package_installation_from_wheelhouse(monkeypatch, tmpdir):
+    run_calls = []
+    monkeypatch.setattr(bootstrapper.subprocess, "run", lambda *args, **kwargs: run_calls.append(args[0]))
+
+    with tmpdir.as_cwd():
+        os.mkdir("wheelhouse")
+        for filename in ["not_installed_package-1.0-py3-none-any.whl", "other-package-2.0.0.tar.gz"]:
+            open(os.path.join("wheelhouse", filename), "w").close()
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("not-installed-package==1.0\n")
+            f.write("Other.Package==2.0\n")
+
+        bootstrapper.OpUtil.package_install(user_volume_path=None, wheelhouse="wheelhouse")
+        assert run_calls == [[sys.executable, '-m', 'pip', 'install', '--no-index', '--find-links=wheelhouse',
+                              'not-installed-package==1.0', 'Other.Package==2.0']]
+
+        # requirements missing from the wheelhouse are installed from the index
+        with open("requirements-elyra.txt", "a") as f:
+            f.write("missing-package==1.0\n")
+        assert bootstrapper.OpUtil.find_missing_distributions("wheelhouse", ['missing-package==1.0',
+                                                                             'not-installed-package==1.0.0',
+                                                                             'not-installed-package==1.1']) \
+            == ['missing-package==1.0', 'not-installed-package==1.1']
+        run_calls.clear()
+        bootstrapper.OpUtil.package_install(user_volume_path=None, wheelhouse="wheelhouse")
+        assert run_calls == [[sys.executable, '-m', 'pip', 'install', '--find-links=wheelhouse',
+                              'not-installed-package==1.0', 'Other.Package==2.0', 'missing-package==1.0']]
+
+        # a missing wheelhouse is ignored
+        run_calls.clear()
+        bootstrapper.OpUtil.package_install(user_volume_path=None, wheelhouse="nonexistent")
+        assert run_calls == [[sys.executable, '-m', 'pip', 'install',
+                              'not-installed-package==1.0', 'Other.Package==2.0', 'missing-package==1.0']]
+
+
+def test_package_installation_from_snapshot(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+
+    def pip_install(args, **kwargs):
+        # simulate the installation of the packages into the target directory
+        target_dir = [arg for arg in args if arg.startswith('--target=')][0][len('--target='):]
+        os.makedirs(os.path.join(target_dir, "not_installed_package"))
+        with open(os.path.join(target_dir, "not_installed_package", "__init__.py"), "w") as f:
+            f.write("VERSION = '1.0'\n")
+        run_calls.append(args)
+    run_calls = []
+    monkeypatch.setattr(bootstrapper.subprocess, "run", pip_install)
+
+    with tmpdir.as_cwd():
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("not-installed-package==1.0\n")
+        snapshot_store = bootstrapper.SitePackagesSnapshotStore('http://' + MINIO_HOST_PORT, bucket_name)
+        monkeypatch.setattr(snapshot_store, "cos_client", s3_setup)
+
+        # the snapshot is published after the packages were installed
+        os.makedirs("lib1")
+        bootstrapper.OpUtil.package_install(user_volume_path="lib1", snapshot_store=snapshot_store)
+        assert len(run_calls) == 1
+        snapshot_key = snapshot_store.get_snapshot_key(['not-installed-package==1.0'])
+        assert s3_setup.stat_object(bucket_name, snapshot_store.get_object_name(snapshot_key))
+
+        # and restored instead of installing the packages
+        os.makedirs("lib2")
+        with open(os.path.join("lib2", "pip.conf"), "w") as f:
+            f.write("[global]\n")
+        bootstrapper.OpUtil.package_install(user_volume_path="lib2", snapshot_store=snapshot_store)
+        assert len(run_calls) == 1
+        assert sorted(os.listdir("lib2")) == ["not_installed_package", "pip.conf"]
+        assert _fileChecksum("lib2/not_installed_package/__init__.py") == \
+            _fileChecksum("lib1/not_installed_package/__init__.py")
+
+        # a different installation plan does not match the snapshot
+        assert not snapshot_store.restore(snapshot_store.get_snapshot_key(['not-installed-package==1.0',
+                                                                           'other-package==2.0']), "lib2")
+
+
+def test_package_snapshot_publish_and_restore(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+
+    with tmpdir.as_cwd():
+        for package in ["package_a", "package_b"]:
+            os.makedirs(os.path.join("lib1", package))
+            with open(os.path.join("lib1", package, "__init__.py"), "w") as f:
+                f.write(f"NAME = '{package}'\n")
+        snapshot_store = bootstrapper.SitePackagesSnapshotStore('http://' + MINIO_HOST_PORT, bucket_name)
+        monkeypatch.setattr(snapshot_store, "cos_client", s3_setup)
+        snapshot_key = snapshot_store.get_snapshot_key(['package-a==1.0', 'package-b==1.0'])
+        object_name = snapshot_store.get_object_name(snapshot_key)
+        snapshot_store.publish(snapshot_key, "lib1")
+        etag = s3_setup.stat_object(bucket_name, object_name).etag
+
+        # published snapshots are not overwritten
+        with open(os.path.join("lib1", "package_a", "__init__.py"), "a") as f:
+            f.write("VERSION = '1.1'\n")
+        snapshot_store.publish(snapshot_key, "lib1")
+        assert s3_setup.stat_object(bucket_name, object_name).etag == etag
+
+        # conflicting entries leave the target directory unchanged
+        os.makedirs("lib2/package_b")
+        assert snapshot_store.restore(snapshot_key, "lib2") is None
+        assert os.listdir("lib2") == ["package_b"]
+        assert os.listdir("lib2/package_b") == []
+
+        # as does a failure while the entries are moved into the target directory
+        os.makedirs("lib3")
+        rename = os.rename
+
+        def fail_second_rename(src, dst):
+            if os.listdir("lib3"):
+                raise OSError("No space left on device")
+            rename(src, dst)
+        monkeypatch.setattr(bootstrapper.os, "rename", fail_second_rename)
+        assert snapshot_store.restore(snapshot_key, "lib3") is None
+        assert os.listdir("lib3") == []
+
+
+def test_package_installation_snapshot_unavailable(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+
+    def pip_install(args, **kwargs):
+        target_dir = [arg for arg in args if arg.startswith('--target=')][0][len('--target='):]
+        os.makedirs(os.path.join(target_dir, "unavailable_package"))
+    monkeypatch.setattr(bootstrapper.subprocess, "run", pip_install)
+
+    with tmpdir.as_cwd():
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("unavailable-package==1.0\n")
+        snapshot_store = bootstrapper.SitePackagesSnapshotStore('http://' + MINIO_HOST_PORT, bucket_name)
+        # minio is only available once the packages were installed
+        cos_clients = iter([None])
+        monkeypatch.setattr(snapshot_store, "get_cos_client", lambda: next(cos_clients, s3_setup))
+
+        # snapshots that could not be looked up are not published
+        os.makedirs("lib")
+        bootstrapper.OpUtil.package_install(user_volume_path="lib", snapshot_store=snapshot_store)
+        snapshot_key = snapshot_store.get_snapshot_key(['unavailable-package==1.0'])
+        with pytest.raises(minio.error.NoSuchKey):
+            s3_setup.stat_object(bucket_name, snapshot_store.get_object_name(snapshot_key))
+
+
+def test_precompile_packages(monkeypatch, tmpdir, caplog):
+    caplog.set_level(logging.INFO)
+    monkeypatch.setattr(bootstrapper, "LAZY_IMPORT_MODULES", ["json", "not_a_module"])
+
+    with tmpdir.as_cwd():
+        os.makedirs("lib/test_package")
+        with open("lib/test_package/__init__.py", "w") as f:
+            f.write("VERSION = '1.0'\n")
+
+        bootstrapper.OpUtil.precompile_packages("lib")
+        assert any(filename.startswith("__init__.") and filename.endswith(".pyc")
+                   for filename in os.listdir("lib/test_package/__pycache__"))
+        assert "Import times before/after precompilation" not in caplog.text
+
+        # import times are only measured on request
+        monkeypatch.setenv("ELYRA_MEASURE_IMPORT_TIMES", "true")
+        bootstrapper.OpUtil.precompile_packages("lib")
+        assert "Import times before/after precompilation: json " in caplog.text
+
+    import_times = bootstrapper.OpUtil.measure_import_times(["json", "not_a_module"], write_bytecode=False)
+    assert list(import_times.keys()) == ["json"]
+
+
+def test_precompile_packages_workers(monkeypatch, tmpdir):
+    compile_calls = []
+    monkeypatch.setattr(bootstrapper.compileall, "compile_dir",
+                        lambda packages_dir, **kwargs: compile_calls.append(kwargs['workers']) or True)
+    monkeypatch.setattr(bootstrapper.OpUtil, "get_usable_cpu_count", lambda: 2)
+
+    # one process per CPU that the container may use
+    bootstrapper.OpUtil.precompile_packages("lib")
+    monkeypatch.setenv("ELYRA_PRECOMPILE_WORKERS", "3")
+    bootstrapper.OpUtil.precompile_packages("lib")
+    assert compile_calls == [2, 3]
+
+
+def test_get_usable_cpu_count(monkeypatch, tmpdir):
+    monkeypatch.setattr(bootstrapper.os, "sched_getaffinity", lambda pid: {0, 1, 2, 3, 4, 5, 6, 7}, raising=False)
+
+    with tmpdir.as_cwd():
+        # no cgroup CPU controller
+        assert bootstrapper.OpUtil.get_usable_cpu_count("cgroup") == 8
+
+        # cgroup v1
+        os.makedirs("cgroup/cpu")
+        with open("cgroup/cpu/cpu.cfs_period_us", "w") as f:
+            f.write("100000\n")
+        for quota, cpu_count in [("-1", 8), ("150000", 2), ("50000", 1), ("2000000", 8)]:
+            with open("cgroup/cpu/cpu.cfs_quota_us", "w") as f:
+                f.write(quota + "\n")
+            assert bootstrapper.OpUtil.get_usable_cpu_count("cgroup") == cpu_count
+
+        # cgroup v2
+        for cpu_max, cpu_count in [("max 100000", 8), ("200000 100000", 2)]:
+            with open("cgroup/cpu.max", "w") as f:
+                f.write(cpu_max + "\n")
+            assert bootstrapper.OpUtil.get_usable_cpu_count("cgroup") == cpu_count
+
+
+def test_package_installation_precompile(monkeypatch, tmpdir):
+    run_calls = []
+    precompile_calls = []
+    monkeypatch.setattr(bootstrapper.subprocess, "run", lambda args, **kwargs: run_calls.append(args))
+    monkeypatch.setattr(bootstrapper.OpUtil, "precompile_packages", precompile_calls.append)
+
+    with tmpdir.as_cwd():
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("not-installed-package==1.0\n")
+        os.makedirs("lib")
+
+        # pip leaves the compilation of the installed packages to precompile_packages
+        bootstrapper.OpUtil.package_install(user_volume_path="lib", precompile=True)
+        assert run_calls == [[sys.executable, '-m', 'pip', 'install', '--target=lib', '--no-cache-dir',
+                              '--no-compile', 'not-installed-package==1.0']]
+        assert precompile_calls == ["lib"]
+
+        # which is skipped if no packages were installed
+        with open("requirements-elyra.txt", "w") as f:
+            f.write("")
+        bootstrapper.OpUtil.package_install(user_volume_path="lib", precompile=True)
+        assert precompile_calls == ["lib"]
+
+
+def test_configure_ca_certificates(monkeypatch, tmpdir):
+    import certifi
+    import ssl
+    monkeypatch.delenv("SSL_CERT_FILE", raising=False)
+
+    with tmpdir.as_cwd():
+        with open("ca-certificates.crt", "w") as f:
+            f.write("")
+        monkeypatch.setattr(ssl, "get_default_verify_paths",
+                            lambda: ssl.DefaultVerifyPaths(cafile=None, capath=None,
+                                                           openssl_cafile_env="SSL_CERT_FILE",
+                                                           openssl_cafile="ca-certificates.crt",
+                                                           openssl_capath_env="SSL_CERT_DIR", openssl_capath=""))
+
+        # the CA bundle of certifi is used if it is a file
+        bootstrapper.OpUtil.configure_ca_certificates()
+        assert "SSL_CERT_FILE" not in os.environ
+
+        # otherwise the system's CA bundle
+        monkeypatch.setattr(certifi, "where", lambda: "bootstrapper.pyz/certifi/cacert.pem")
+        bootstrapper.OpUtil.configure_ca_certificates()
+        assert os.environ["SSL_CERT_FILE"] == "ca-certificates.crt"
+
+
+def test_package_version():
+    versions = ['1.0.dev0', '1.0a1.dev1', '1.0a1', '1.0b2', '1.0rc1', '1.0', '1.0+local.7',
+                '1.0.post1.dev2', '1.0.post1', '1.1', '2.0', '1!0.5']
+    for lower, higher in zip(versions, versions[1:]):
+        assert bootstrapper.PackageVersion(lower) < bootstrapper.PackageVersion(higher)
+    assert bootstrapper.PackageVersion('1.0') == bootstrapper.PackageVersion('1.0.0')
+    assert bootstrapper.PackageVersion('1.0c1') == bootstrapper.PackageVersion('1.0rc1')
+    assert bootstrapper.PackageVersion('1.0-1') == bootstrapper.PackageVersion('1.0.post1')
+    assert not bootstrapper.PackageVersion.is_valid('0.0.1-prealpha')
+    with pytest.raises(ValueError):
+        bootstrapper.PackageVersion('0.0.1-prealpha')
+
+
 def test_convert_notebook_to_html(tmpdir):
     notebook_file = os.getcwd() + "/etc/tests/resources/test-notebookA.ipynb"
     notebook_output_html_file = "test-notebookA.html"
@@ -585,6 +1165,157 @@ def test_fail_convert_notebook_to_html(tmpdir):
             bootstrapper.NotebookFileOp.convert_notebook_to_html(notebook_file, notebook_output_html_file)
 
 
+def test_convert_notebook_node_to_html(tmpdir):
+    notebook_file = os.getcwd() + "/etc/tests/resources/test-notebookA.ipynb"
+    notebook_output_html_file = "test-notebookA.html"
+    nb = nbformat.read(notebook_file, as_version=4)
+
+    with tmpdir.as_cwd():
+        bootstrapper.NotebookFileOp.convert_notebook_to_html(nb, notebook_output_html_file)
+
+        assert os.path.isfile(notebook_output_html_file)
+        with open(notebook_output_html_file, 'r') as html_file:
+            html_data = html_file.read()
+            assert html_data.startswith("<!DOCTYPE html>")
+            assert html_data.endswith("</html>\n")
+
+
+def test_convert_notebook_to_html_fast(tmpdir):
+    # 1x1 pixel png
+    png = ('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk'
+           '+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg==')
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell("plot()", outputs=[
+        nbformat.v4.new_output('display_data', data={'image/png': png, 'text/plain': '<Figure>'})]))
+
+    with tmpdir.as_cwd():
+        bootstrapper.NotebookFileOp.convert_notebook_to_html(nb, "test-notebook.html", export_mode='fast')
+        with open("test-notebook.html") as html_file:
+            html_data = html_file.read()
+        assert html_data.startswith("<!DOCTYPE html>")
+        assert "<title>test-notebook</title>" in html_data
+        assert png not in html_data
+        assert 'src="test-notebook_files/output_0_0.png"' in html_data
+        assert os.path.isfile("test-notebook_files/output_0_0.png")
+        # the notebook is not modified by the extraction of the images
+        assert 'filenames' not in nb.cells[0].outputs[0].metadata
+
+    # the exporter is reused
+    assert bootstrapper.NotebookFileOp.get_html_exporter('fast') is \
+        bootstrapper.NotebookFileOp.get_html_exporter('fast')
+
+
+def test_html_exporter_loaded_before_failed_notebook_export(monkeypatch, s3_setup, tmpdir):
+    # the notebook fails before the html exporter is loaded, which is awaited before the export is forked
+    events = []
+
+    def get_html_exporter(export_mode):
+        time.sleep(1)
+        events.append('exporter loaded')
+
+    def execute_notebook(*args, **kwargs):
+        raise RuntimeError("notebook failed")
+
+    monkeypatch.setattr(bootstrapper.NotebookFileOp, "get_html_exporter", staticmethod(get_html_exporter))
+    monkeypatch.setattr(papermill, "execute_notebook", execute_notebook)
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        monkeypatch.setattr(op, "get_kernel_name", lambda: "python3")
+        monkeypatch.setattr(op, "start_html_export", lambda nb, html_file: events.append('export started'))
+        monkeypatch.setattr(op, "upload_results", lambda *args, **kwargs: events.append('results uploaded'))
+        with pytest.raises(RuntimeError, match="notebook failed"):
+            op.execute()
+    assert events == ['exporter loaded', 'export started', 'results uploaded']
+
+
+def test_externalize_outputs(tmpdir):
+    png = base64.b64encode(b'\x89PNG' + b'\x00' * 1024).decode()
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell("plot()", outputs=[
+        nbformat.v4.new_output('display_data', data={'image/png': png, 'text/plain': '<Figure>'}),
+        nbformat.v4.new_output('execute_result', data={'text/html': '<table>' + 'x' * 1024 + '</table>'},
+                               execution_count=1)]))
+    nb.cells.append(nbformat.v4.new_code_cell("print()", outputs=[
+        nbformat.v4.new_output('stream', name='stdout', text='small'),
+        nbformat.v4.new_output('stream', name='stdout', text=['line\n'] * 512)]))
+
+    with tmpdir.as_cwd():
+        externalized_files = bootstrapper.NotebookFileOp.externalize_outputs(nb, 'test-output.ipynb', 'test-outputs',
+                                                                             1024)
+        assert externalized_files == [os.path.join('test-outputs', 'output_0_0.png'),
+                                      os.path.join('test-outputs', 'output_0_1.html'),
+                                      os.path.join('test-outputs', 'output_1_1.txt')]
+        with open(os.path.join('test-outputs', 'output_0_0.png'), 'rb') as f:
+            assert f.read() == b'\x89PNG' + b'\x00' * 1024
+        with open(os.path.join('test-outputs', 'output_1_1.txt')) as f:
+            assert f.read() == 'line\n' * 512
+
+        nb = nbformat.read('test-output.ipynb', as_version=4)
+        nbformat.validate(nb)
+        image_output, html_output = nb.cells[0].outputs
+        assert image_output.data == {'text/plain': '<Figure>'}
+        assert image_output.metadata['elyra']['externalized_outputs'] == {'image/png': 'test-outputs/output_0_0.png'}
+        assert html_output.data == {'text/plain': '[text/html output stored in test-outputs/output_0_1.html]'}
+        assert nb.cells[1].outputs[0].text == 'small'
+        assert nb.cells[1].outputs[1].text == \
+            '[2560 characters of stdout output stored in test-outputs/output_1_1.txt]\n'
+
+
+def test_externalize_outputs_non_ascii(tmpdir):
+    nb = nbformat.v4.new_notebook()
+    nb.cells.append(nbformat.v4.new_code_cell("print()", outputs=[
+        nbformat.v4.new_output('stream', name='stdout', text='Größe: 1 µm\n' * 128),
+        nbformat.v4.new_output('stream', name='stdout', text='café')]))
+
+    with tmpdir.as_cwd():
+        nbformat.write(nb, 'test-notebook.ipynb')
+        # in a container whose locale encoding is ASCII
+        script = ("import nbformat, sys\n"
+                  f"sys.path.insert(0, {os.path.dirname(bootstrapper.__file__)!r})\n"
+                  "import bootstrapper\n"
+                  "nb = nbformat.read('test-notebook.ipynb', as_version=4)\n"
+                  "bootstrapper.NotebookFileOp.externalize_outputs(nb, 'test-output.ipynb', 'test-outputs', 1024)\n")
+        subprocess.run([sys.executable, '-c', script], check=True,
+                       env=dict(os.environ, LC_ALL='C', PYTHONCOERCECLOCALE='0', PYTHONUTF8='0'))
+
+        with open(os.path.join('test-outputs', 'output_0_0.txt'), encoding='utf-8') as f:
+            assert f.read() == 'Größe: 1 µm\n' * 128
+        nb = nbformat.read('test-output.ipynb', as_version=4)
+        assert nb.cells[0].outputs[1].text == 'café'
+
+
+def test_html_export(monkeypatch, s3_setup, tmpdir, caplog):
+    notebook_file = os.getcwd() + "/etc/tests/resources/test-notebookA.ipynb"
+    bad_notebook_file = os.getcwd() + "/etc/tests/resources/test-bad-notebookA.ipynb"
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        process = op.start_html_export(notebook_file, "test-notebookA.html")
+        assert bootstrapper.NotebookFileOp.finish_html_export(process, "test-notebookA.html")
+        assert os.path.isfile("test-notebookA.html")
+
+        # conversion errors do not fail the operation, the html file is not uploaded
+        process = op.start_html_export(bad_notebook_file, "bad-notebookA.html")
+        assert not bootstrapper.NotebookFileOp.finish_html_export(process, "bad-notebookA.html")
+        assert "bad-notebookA.html failed with exit code 1" in caplog.text
+
+        monkeypatch.setattr(op, "html_export", "none")
+        assert op.start_html_export(notebook_file, "test-notebookA.html") is None
+
+
+def test_html_export_timeout(monkeypatch, s3_setup, tmpdir, caplog):
+    monkeypatch.setenv("ELYRA_HTML_EXPORT_TIMEOUT", "0.5")
+    monkeypatch.setattr(bootstrapper.NotebookFileOp, "convert_notebook_to_html",
+                        staticmethod(lambda notebook_file, html_file, export_mode: time.sleep(60)))
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        t0 = time.time()
+        process = op.start_html_export("test-notebookA.ipynb", "test-notebookA.html")
+        assert not bootstrapper.NotebookFileOp.finish_html_export(process, "test-notebookA.html")
+        assert time.time() - t0 < 30
+        assert not process.is_alive()
+        assert "did not complete within 0.5 secs" in caplog.text
+
+
 def test_get_file_object_store(monkeypatch, s3_setup, tmpdir):
     file_to_get = "README.md"
     current_directory = os.getcwd() + '/'
@@ -602,6 +1333,47 @@ def test_get_file_object_store(monkeypatch, s3_setup, tmpdir):
         assert _fileChecksum(file_to_get) == _fileChecksum(current_directory + file_to_get)
 
 
+def test_get_file_object_store_ranges(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_get = "large-file.bin"
+    monkeypatch.setenv("ELYRA_RANGED_DOWNLOAD_THRESHOLD", "1Mi")
+    monkeypatch.setenv("ELYRA_RANGED_DOWNLOAD_CHUNK_SIZE", "1Mi")
+    monkeypatch.setenv("ELYRA_RANGED_DOWNLOAD_WORKERS", "3")
+    monkeypatch.setenv("ELYRA_DOWNLOAD_RETRY_BACKOFF", "0.01")
+
+    with tmpdir.as_cwd():
+        with open("source-file.bin", "wb") as f:
+            f.write(os.urandom(5 * 1024 * 1024 + 17))
+        s3_setup.fput_object(bucket_name=bucket_name,
+                             object_name=file_to_get,
+                             file_path="source-file.bin")
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+
+        # reset the connection of the first request after some bytes were received
+        get_partial_object = s3_setup.get_partial_object
+        requests = []
+
+        def reset_first_request(bucket_name, object_name, offset, length, **kwargs):
+            response = get_partial_object(bucket_name, object_name, offset, length, **kwargs)
+            requests.append((offset, length))
+            if len(requests) == 1:
+                def broken_stream(amt):
+                    yield response.read(1000)
+                    raise urllib3.exceptions.ProtocolError("Connection reset by peer")
+                monkeypatch.setattr(response, "stream", broken_stream)
+            return response
+
+        monkeypatch.setattr(s3_setup, "get_partial_object", reset_first_request)
+        op.get_file_from_object_storage(file_to_get)
+
+        assert _fileChecksum(file_to_get) == _fileChecksum("source-file.bin")
+        assert not os.path.exists(file_to_get + ".part")
+        # six ranges plus the resumed request, which starts after the received bytes
+        assert len(requests) == 7
+        assert requests[0][0] + 1000 in [offset for offset, length in requests[1:]]
+
+
 def test_fail_get_file_object_store(monkeypatch, s3_setup, tmpdir):
     file_to_get = "test-file.txt"
 
@@ -611,6 +1383,195 @@ def test_fail_get_file_object_store(monkeypatch, s3_setup, tmpdir):
             op.get_file_from_object_storage(file_to_get=file_to_get)
 
 
+def test_get_files_object_store(monkeypatch, s3_setup, tmpdir):
+    files_to_get = ["README.md", "LICENSE", "setup.py", "tox.ini"]
+    current_directory = os.getcwd() + '/'
+    bucket_name = "test-bucket"
+
+    for file_to_get in files_to_get:
+        s3_setup.fput_object(bucket_name=bucket_name,
+                             object_name=file_to_get,
+                             file_path=file_to_get)
+
+    monkeypatch.setenv("ELYRA_MAX_DOWNLOAD_WORKERS", "2")
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        assert op.max_download_workers == 2
+
+        op.get_files_from_object_storage(files_to_get)
+        for file_to_get in files_to_get:
+            assert os.path.isfile(file_to_get)
+            assert _fileChecksum(file_to_get) == _fileChecksum(current_directory + file_to_get)
+
+
+def test_get_files_object_store_duplicates(monkeypatch, s3_setup, tmpdir):
+    file_to_get = "README.md"
+    current_directory = os.getcwd() + '/'
+
+    s3_setup.fput_object(bucket_name="test-bucket",
+                         object_name=file_to_get,
+                         file_path=file_to_get)
+
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        get_object = mock.Mock(wraps=op._get_object)
+        monkeypatch.setattr(op, "_get_object", get_object)
+
+        op.get_files_from_object_storage([file_to_get, file_to_get])
+        assert get_object.call_count == 1
+        assert _fileChecksum(file_to_get) == _fileChecksum(current_directory + file_to_get)
+        assert not os.path.exists(file_to_get + ".part")
+
+
+def test_fail_get_files_object_store(monkeypatch, s3_setup, tmpdir):
+    file_to_get = "README.md"
+
+    s3_setup.fput_object(bucket_name="test-bucket",
+                         object_name=file_to_get,
+                         file_path=file_to_get)
+
+    with tmpdir.as_cwd():
+        with pytest.raises(minio.error.NoSuchKey):
+            op = _get_operation_instance(monkeypatch, s3_setup)
+            op.get_files_from_object_storage([file_to_get, "test-file.txt"])
+        # downloads that succeeded are not affected by the failure
+        assert os.path.isfile(file_to_get)
+
+
+def test_get_file_object_store_cached(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_get = "README.md"
+    current_directory = os.getcwd() + '/'
+
+    s3_setup.fput_object(bucket_name=bucket_name,
+                         object_name=file_to_get,
+                         file_path=file_to_get)
+
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.object_cache = bootstrapper.ObjectCache("cache", 1024 * 1024)
+
+        op.get_file_from_object_storage(file_to_get)
+        os.remove(file_to_get)
+
+        # the second download is served from the cache
+        def fail_get_partial_object(*args, **kwargs):
+            raise AssertionError("object should be retrieved from cache")
+        monkeypatch.setattr(s3_setup, "get_partial_object", fail_get_partial_object)
+        op.get_file_from_object_storage(file_to_get)
+        assert _fileChecksum(file_to_get) == _fileChecksum(current_directory + file_to_get)
+
+        # a changed object results in a cache miss
+        with open("changed.md", "w") as f:
+            f.write("changed content")
+        s3_setup.fput_object(bucket_name=bucket_name,
+                             object_name=file_to_get,
+                             file_path="changed.md")
+        with pytest.raises(AssertionError):
+            op.get_file_from_object_storage(file_to_get)
+
+
+def test_object_cache_eviction(tmpdir):
+    with tmpdir.as_cwd():
+        cache = bootstrapper.ObjectCache("cache", 2500)
+        for i in range(3):
+            with open(f"file{i}.bin", "wb") as f:
+                f.write(os.urandom(1000))
+            cache.put("test-bucket", f"file{i}.bin", f"etag{i}", f"file{i}.bin")
+            # ensure distinct access times
+            os.utime(cache.get_entry_path("test-bucket", f"file{i}.bin", f"etag{i}"), (i, i))
+
+        # the least recently used entry was evicted, along with its digest
+        assert len(os.listdir("cache")) == 4
+        assert not os.path.exists(cache.get_entry_path("test-bucket", "file0.bin", "etag0") + ".sha256")
+        assert not cache.get("test-bucket", "file0.bin", "etag0", "restored0.bin")
+        assert cache.get("test-bucket", "file2.bin", "etag2", "restored2.bin")
+        assert _fileChecksum("restored2.bin") == _fileChecksum("file2.bin")
+        assert not os.path.exists("restored0.bin")
+
+
+def test_object_cache_integrity(tmpdir):
+    with tmpdir.as_cwd():
+        cache = bootstrapper.ObjectCache("cache", 1024 * 1024)
+        with open("file.bin", "wb") as f:
+            f.write(os.urandom(1000))
+        cache.put("test-bucket", "file.bin", "etag", "file.bin")
+        entry_path = cache.get_entry_path("test-bucket", "file.bin", "etag")
+        with open(entry_path + ".sha256") as f:
+            assert f.read() == _fileChecksum("file.bin")
+        assert cache.get("test-bucket", "file.bin", "etag", "restored.bin")
+
+        # corrupted entries are cache misses and are removed
+        with open(entry_path, "r+b") as f:
+            f.write(b"corrupted")
+        assert not cache.get("test-bucket", "file.bin", "etag", "corrupted.bin")
+        assert not os.path.exists("corrupted.bin")
+        assert not os.path.exists("corrupted.bin.part")
+        assert os.listdir("cache") == []
+
+
+def test_put_file_object_store_cached(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_put = "output.txt"
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "w") as f:
+            f.write("operation output")
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.object_cache = bootstrapper.ObjectCache("cache", 1024 * 1024)
+        op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        # uploaded outputs are available to downstream operations on the same node
+        etag = s3_setup.stat_object(bucket_name, file_to_put).etag
+        assert op.object_cache.get(bucket_name, file_to_put, etag, "restored.txt")
+        assert _fileChecksum("restored.txt") == _fileChecksum(file_to_put)
+
+
+def test_stream_dependencies_archive(monkeypatch, s3_setup, tmpdir):
+    argument_dict = {'cos-endpoint': 'http://' + MINIO_HOST_PORT,
+                     'cos-bucket': 'test-bucket',
+                     'cos-directory': 'test-directory',
+                     'cos-dependencies-archive': 'test-archive.tgz',
+                     'filepath': 'etc/tests/resources/test-notebookA.ipynb',
+                     'inputs': 'test-file.txt'}
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-archive.tgz",
+                         file_path="etc/tests/resources/test-archive.tgz")
+    s3_setup.fput_object(bucket_name=argument_dict['cos-bucket'],
+                         object_name="test-directory/test-file.txt",
+                         file_path="etc/tests/resources/test-requirements-elyra.txt")
+
+    monkeypatch.setenv("ELYRA_STREAM_DEPENDENCIES_ARCHIVE", "true")
+    with tmpdir.as_cwd():
+        op = bootstrapper.FileOpBase.get_instance(**argument_dict)
+        monkeypatch.setattr(op, "cos_client", s3_setup)
+        op.process_dependencies()
+
+        assert os.path.isfile('test-notebookA.ipynb')
+        assert os.path.isfile('test-file.txt')
+        # the archive is never stored locally
+        assert not os.path.exists('test-archive.tgz')
+
+
+def test_fail_stream_dependencies_archive_bad_member(monkeypatch, s3_setup, tmpdir):
+    with tmpdir.as_cwd():
+        with open('payload.txt', 'w') as f:
+            f.write('payload')
+        with tarfile.open('test-evil-archive.tgz', 'w:gz') as tar:
+            tar.add('payload.txt', arcname='../evil.txt')
+        s3_setup.fput_object(bucket_name="test-bucket",
+                             object_name="test-evil-archive.tgz",
+                             file_path="test-evil-archive.tgz")
+        os.makedirs('work')
+        os.chdir('work')
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        with pytest.raises(ValueError):
+            op.extract_archive_from_object_storage('test-evil-archive.tgz')
+        assert not os.path.exists(os.path.join('..', 'evil.txt'))
+
+
 def test_put_file_object_store(monkeypatch, s3_setup, tmpdir):
     bucket_name = "test-bucket"
     file_to_put = "LICENSE"
@@ -625,6 +1586,313 @@ def test_put_file_object_store(monkeypatch, s3_setup, tmpdir):
         assert _fileChecksum(file_to_put) == _fileChecksum(current_directory + file_to_put)
 
 
+def test_checkpoint_output_notebook(monkeypatch, s3_setup, tmpdir):
+    def get_checkpoint():
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                return s3_setup.get_object("test-bucket", "test-notebook.ipynb").read()
+            except minio.error.NoSuchKey:
+                time.sleep(0.1)
+
+    def write_notebook(content):
+        with open("test-notebook-output.ipynb", "w") as f:
+            f.write(content)
+        # written by papermill more than a second ago
+        os.utime("test-notebook-output.ipynb", (time.time() - 5, time.time() - 5))
+
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        monkeypatch.setattr(op, "checkpoint_interval", 0.1)
+        checkpoints = op.start_checkpoints("test-notebook-output.ipynb", "test-notebook.ipynb")
+        write_notebook('{"cells": []}')
+        assert get_checkpoint() == b'{"cells": []}'
+
+        s3_setup.remove_object("test-bucket", "test-notebook.ipynb")
+        write_notebook('{"cells": [{}]}')
+        assert get_checkpoint() == b'{"cells": [{}]}'
+
+        op.stop_checkpoints(checkpoints)
+        assert not checkpoints[0].is_alive()
+        assert not os.path.exists("test-notebook-output.ipynb.checkpoint")
+
+    # checkpoints are disabled by default
+    monkeypatch.setattr(op, "checkpoint_interval", 0)
+    assert op.start_checkpoints("test-notebook-output.ipynb", "test-notebook.ipynb") is None
+
+
+def test_put_files_object_store(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    monkeypatch.setenv("ELYRA_MAX_UPLOAD_WORKERS", "3")
+
+    with tmpdir.as_cwd():
+        os.makedirs("checkpoints/nested")
+        files_to_put = [f"checkpoints/shard-{i}.bin" for i in range(20)] + ["checkpoints/nested/shard.bin"]
+        for file_to_put in files_to_put:
+            with open(file_to_put, "w") as f:
+                f.write(file_to_put)
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        assert op.max_upload_workers == 3
+        op.process_output_file("checkpoints")
+
+        for file_to_put in files_to_put:
+            assert s3_setup.stat_object(bucket_name=bucket_name, object_name=file_to_put)
+
+
+def test_fail_put_files_object_store(monkeypatch, s3_setup, tmpdir):
+    monkeypatch.setenv("ELYRA_MAX_UPLOAD_WORKERS", "2")
+    uploaded = []
+
+    def put_file(file_to_upload, object_name=None):
+        if file_to_upload == "file-1":
+            raise FileNotFoundError(file_to_upload)
+        time.sleep(0.01)
+        uploaded.append(file_to_upload)
+
+    files_to_put = [f"file-{i}" for i in range(100)]
+    op = _get_operation_instance(monkeypatch, s3_setup)
+    monkeypatch.setattr(op, "put_file_to_object_storage", put_file)
+    with pytest.raises(FileNotFoundError):
+        op.put_files_to_object_storage(iter(files_to_put))
+    # no new uploads are scheduled after the failure
+    assert len(uploaded) < len(files_to_put) - 1
+
+
+def test_put_file_object_store_multipart(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_put = "large-file.bin"
+    monkeypatch.setenv("ELYRA_MULTIPART_THRESHOLD", "6Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_PART_SIZE", "5Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_UPLOAD_WORKERS", "3")
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "wb") as f:
+            f.write(os.urandom(17 * 1024 * 1024))
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        stat = s3_setup.stat_object(bucket_name, file_to_put)
+        assert stat.size == 17 * 1024 * 1024
+        assert stat.etag.endswith("-4")  # four parts
+
+        s3_setup.fget_object(bucket_name, file_to_put, "downloaded-file.bin")
+        assert _fileChecksum("downloaded-file.bin") == _fileChecksum(file_to_put)
+
+
+def test_put_file_object_store_multipart_retry(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_put = "large-file.bin"
+    monkeypatch.setenv("ELYRA_MULTIPART_THRESHOLD", "6Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_PART_SIZE", "5Mi")
+    monkeypatch.setenv("ELYRA_UPLOAD_RETRY_BACKOFF", "0.01")
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "wb") as f:
+            f.write(os.urandom(12 * 1024 * 1024))
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+
+        # fail the first upload attempt of the second part
+        do_put_object = s3_setup._do_put_object
+        uploaded_parts = []
+
+        def fail_second_part_once(*args, **kwargs):
+            uploaded_parts.append(kwargs['part_number'])
+            if uploaded_parts.count(2) == 1 and kwargs['part_number'] == 2:
+                raise urllib3.exceptions.ProtocolError("Connection reset by peer")
+            return do_put_object(*args, **kwargs)
+
+        monkeypatch.setattr(s3_setup, "_do_put_object", fail_second_part_once)
+        op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        # only the failed part was uploaded again
+        assert sorted(uploaded_parts) == [1, 2, 2, 3]
+        s3_setup.fget_object(bucket_name, file_to_put, "downloaded-file.bin")
+        assert _fileChecksum("downloaded-file.bin") == _fileChecksum(file_to_put)
+
+
+def test_put_file_object_store_multipart_part_failure(monkeypatch, s3_setup, tmpdir):
+    file_to_put = "large-file.bin"
+    monkeypatch.setenv("ELYRA_MULTIPART_THRESHOLD", "6Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_PART_SIZE", "5Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_UPLOAD_WORKERS", "1")
+    monkeypatch.setenv("ELYRA_UPLOAD_RETRY_ATTEMPTS", "1")
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "wb") as f:
+            f.write(os.urandom(17 * 1024 * 1024))
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+
+        do_put_object = s3_setup._do_put_object
+        uploaded_parts = []
+
+        def fail_second_part(*args, **kwargs):
+            uploaded_parts.append(kwargs['part_number'])
+            if kwargs['part_number'] == 2:
+                raise urllib3.exceptions.ProtocolError("Connection reset by peer")
+            return do_put_object(*args, **kwargs)
+
+        remove_incomplete_upload = mock.Mock(wraps=s3_setup._remove_incomplete_upload)
+        monkeypatch.setattr(s3_setup, "_do_put_object", fail_second_part)
+        monkeypatch.setattr(s3_setup, "_remove_incomplete_upload", remove_incomplete_upload)
+        with pytest.raises(urllib3.exceptions.ProtocolError):
+            op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        # the remaining parts are not uploaded once a part failed, and the upload is aborted
+        assert uploaded_parts == [1, 2]
+        remove_incomplete_upload.assert_called_once()
+
+
+def test_put_file_object_store_multipart_abort_failure(monkeypatch, s3_setup, tmpdir):
+    file_to_put = "large-file.bin"
+    monkeypatch.setenv("ELYRA_MULTIPART_THRESHOLD", "6Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_PART_SIZE", "5Mi")
+    monkeypatch.setenv("ELYRA_UPLOAD_RETRY_ATTEMPTS", "1")
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "wb") as f:
+            f.write(os.urandom(12 * 1024 * 1024))
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+
+        def fail_put_object(*args, **kwargs):
+            raise urllib3.exceptions.ProtocolError("Connection reset by peer")
+
+        def fail_remove_incomplete_upload(*args, **kwargs):
+            raise urllib3.exceptions.MaxRetryError(None, "/", "Connection refused")
+
+        monkeypatch.setattr(s3_setup, "_do_put_object", fail_put_object)
+        monkeypatch.setattr(s3_setup, "_remove_incomplete_upload", fail_remove_incomplete_upload)
+        # the upload error is raised rather than the error of the abort
+        with pytest.raises(urllib3.exceptions.ProtocolError):
+            op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+
+def test_put_file_object_store_skip_unchanged(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    file_to_put = "output.txt"
+    monkeypatch.setenv("ELYRA_SKIP_UNCHANGED_OUTPUTS", "true")
+
+    with tmpdir.as_cwd():
+        with open(file_to_put, "w") as f:
+            f.write("first version")
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        assert op.put_file_to_object_storage(file_to_upload=file_to_put)
+        # new objects are uploaded together with their digest
+        stat = s3_setup.stat_object(bucket_name, file_to_put)
+        metadata = {key.lower(): value for key, value in stat.metadata.items()}
+        assert metadata['x-amz-meta-elyra-sha256'] == _fileChecksum(file_to_put)
+        assert not op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        # identical content of objects without a digest is compared with the object's ETag
+        s3_setup.fput_object(bucket_name, file_to_put, file_to_put)
+        assert not op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+        # changed content of the same size is uploaded together with its digest
+        with open(file_to_put, "w") as f:
+            f.write("later version")
+        assert op.put_file_to_object_storage(file_to_upload=file_to_put)
+        stat = s3_setup.stat_object(bucket_name, file_to_put)
+        metadata = {key.lower(): value for key, value in stat.metadata.items()}
+        assert metadata['x-amz-meta-elyra-sha256'] == _fileChecksum(file_to_put)
+        # which is used to detect unchanged content
+        assert not op.put_file_to_object_storage(file_to_upload=file_to_put)
+
+
+def test_put_file_object_store_skip_unchanged_multipart(monkeypatch, s3_setup, tmpdir):
+    bucket_name = "test-bucket"
+    monkeypatch.setenv("ELYRA_SKIP_UNCHANGED_OUTPUTS", "true")
+    monkeypatch.setenv("ELYRA_MULTIPART_THRESHOLD", "6Mi")
+    monkeypatch.setenv("ELYRA_MULTIPART_PART_SIZE", "6Mi")
+    messages = []
+    monkeypatch.setattr(bootstrapper.OpUtil, "log_operation_info",
+                        lambda action_clause, duration_secs=None: messages.append(action_clause))
+
+    with tmpdir.as_cwd():
+        for file_to_put in ["large-file.bin", "large-minio-file.bin"]:
+            with open(file_to_put, "wb") as f:
+                f.write(os.urandom(13 * 1024 * 1024))
+
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.put_file_to_object_storage(file_to_upload="large-file.bin")
+        # uploaded by a client that uses a different part size
+        s3_setup.fput_object(bucket_name, "large-minio-file.bin", "large-minio-file.bin")
+        assert s3_setup.stat_object(bucket_name, "large-file.bin").etag.endswith("-3")
+        assert s3_setup.stat_object(bucket_name, "large-minio-file.bin").etag.endswith("-3")
+
+        op.put_files_to_object_storage(["large-file.bin", "large-minio-file.bin"])
+        assert messages[-1].startswith("uploaded 0 file(s)")
+        assert messages[-1].endswith(f"skipped 2 unchanged file(s) ({2 * 13 * 1024 * 1024} bytes)")
+
+
+def test_put_files_object_store_skip_unchanged_concurrent_calls(monkeypatch, s3_setup, tmpdir):
+    monkeypatch.setenv("ELYRA_SKIP_UNCHANGED_OUTPUTS", "true")
+    messages = []
+    monkeypatch.setattr(bootstrapper.OpUtil, "log_operation_info",
+                        lambda action_clause, duration_secs=None: messages.append(action_clause))
+
+    with tmpdir.as_cwd():
+        unchanged_files = [f"unchanged-{i}.txt" for i in range(8)]
+        changed_files = [f"changed-{i}.txt" for i in range(8)]
+        for file in unchanged_files + changed_files:
+            with open(file, "w") as f:
+                f.write("first version")
+        op = _get_operation_instance(monkeypatch, s3_setup)
+        op.put_files_to_object_storage(unchanged_files + changed_files)
+        for file in changed_files:
+            with open(file, "w") as f:
+                f.write("later version")
+
+        messages.clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(op.put_files_to_object_storage, files)
+                       for files in [unchanged_files, changed_files]]
+        for future in futures:
+            future.result()
+
+        # the summary of each call only reports the files of that call
+        summaries = [message for message in messages if "unchanged file(s)" in message]
+        workers = op.max_upload_workers
+        assert sorted(summaries) == [
+            f"uploaded 0 file(s) to bucket: test-bucket using {workers} worker(s), "
+            f"skipped 8 unchanged file(s) (104 bytes)",
+            f"uploaded 8 file(s) to bucket: test-bucket using {workers} worker(s), "
+            f"skipped 0 unchanged file(s) (0 bytes)"]
+
+
+def test_compute_file_digests(tmpdir):
+    with tmpdir.as_cwd():
+        with open("file.bin", "wb") as f:
+            f.write(b"a" * 10 + b"b" * 10 + b"c" * 5)
+        digests = bootstrapper.OpUtil.compute_file_digests("file.bin", [10, 25])
+
+        assert digests['md5'] == hashlib.md5(b"a" * 10 + b"b" * 10 + b"c" * 5).hexdigest()
+        assert digests['sha256'] == _fileChecksum("file.bin")
+        part_digests = [hashlib.md5(b"a" * 10).digest(),
+                        hashlib.md5(b"b" * 10).digest(),
+                        hashlib.md5(b"c" * 5).digest()]
+        assert digests['multipart_etags'][0] == hashlib.md5(b"".join(part_digests)).hexdigest() + "-3"
+        assert digests['multipart_etags'][1] == hashlib.md5(hashlib.md5(b"a" * 10 + b"b" * 10 + b"c" * 5)
+                                                            .digest()).hexdigest() + "-1"
+
+
+def test_multipart_part_size(monkeypatch, s3_setup):
+    mib = 1024 * 1024
+    op = _get_operation_instance(monkeypatch, s3_setup)
+    # adaptive part sizes
+    assert op.get_multipart_part_size(100 * mib) == 16 * mib
+    assert op.get_multipart_part_size(8 * 1024 * mib) == 16 * mib
+    assert op.get_multipart_part_size(20 * 1024 * mib) == 40 * mib
+    # configured part sizes are bound by the S3 limits
+    op.multipart_part_size = 1 * mib
+    assert op.get_multipart_part_size(100 * mib) == 5 * mib
+    assert op.get_multipart_part_size(100 * 1024 * mib) == math.ceil(100 * 1024 * mib / 10000)
+
+
 def test_fail_invalid_filename_put_file_object_store(monkeypatch, s3_setup):
     file_to_put = "LICENSE_NOT_HERE"
 
@@ -691,13 +1959,150 @@ def test_find_best_kernel_nomatch(tmpdir, caplog):
         assert caplog.records[0].message.startswith("Reverting back to missing notebook kernel 'test-kernel'")
 
 
+def test_find_best_kernel_node(caplog):
+    source_nb_file = os.path.join(os.getcwd(), "etc/tests/resources/test-notebookA.ipynb")
+
+    # the notebook node is used as is, without reading the notebook file
+    nb = nbformat.read(source_nb_file, 4)
+    nb.metadata.kernelspec['name'] = 'test-kernel'
+    nb.metadata.kernelspec['language'] = 'test-language'
+
+    kernel_name = bootstrapper.NotebookFileOp.find_best_kernel(nb)
+    assert kernel_name == 'test-kernel'
+    assert len(caplog.records) == 1
+
+
+def _write_kernel_spec(kernels_dir, name, language):
+    os.makedirs(os.path.join(kernels_dir, name))
+    with open(os.path.join(kernels_dir, name, 'kernel.json'), 'w') as f:
+        json.dump({'argv': ['python3'], 'display_name': name, 'language': language}, f)
+
+
+def test_kernelspec_index(monkeypatch, tmpdir):
+    kernels_dir = os.path.join(tmpdir, 'jupyter', 'kernels')
+    _write_kernel_spec(kernels_dir, 'test-kernel', 'test-language')
+    monkeypatch.setenv('JUPYTER_PATH', os.path.join(tmpdir, 'jupyter'))
+    index_file = os.path.join(tmpdir, 'kernelspec-index.json')
+
+    kernelspec_index = bootstrapper.KernelSpecIndex(index_file)
+    assert kernelspec_index.get_kernel_languages()['test-kernel'] == 'test-language'
+    assert os.path.isfile(index_file)
+
+    # the persisted index is used as long as the kernels are unchanged
+    from jupyter_client.kernelspec import KernelSpecManager
+    find_kernel_specs = KernelSpecManager.find_kernel_specs
+    with mock.patch.object(KernelSpecManager, 'find_kernel_specs', side_effect=AssertionError()):
+        nb = nbformat.read('etc/tests/resources/test-notebookA.ipynb', 4)
+        nb.metadata.kernelspec['name'] = 'missing-kernel'
+        nb.metadata.kernelspec['language'] = 'test-language'
+        assert bootstrapper.NotebookFileOp.find_best_kernel(nb, kernelspec_index) == 'test-kernel'
+
+    # the index is rebuilt once a kernel is installed
+    _write_kernel_spec(kernels_dir, 'other-kernel', 'other-language')
+    with mock.patch.object(KernelSpecManager, 'find_kernel_specs', autospec=True,
+                           side_effect=find_kernel_specs) as find:
+        assert kernelspec_index.get_kernel_languages()['other-kernel'] == 'other-language'
+        assert find.call_count == 1
+
+
+def test_kernelspec_index_not_needed(monkeypatch, tmpdir):
+    kernels_dir = os.path.join(tmpdir, 'jupyter', 'kernels')
+    _write_kernel_spec(kernels_dir, 'test-kernel', 'test-language')
+    monkeypatch.setenv('JUPYTER_PATH', os.path.join(tmpdir, 'jupyter'))
+    kernelspec_index = bootstrapper.KernelSpecIndex(os.path.join(tmpdir, 'kernelspec-index.json'))
+
+    # installed kernels are used without listing the kernels
+    from jupyter_client.kernelspec import KernelSpecManager
+    with mock.patch.object(KernelSpecManager, 'find_kernel_specs', side_effect=AssertionError()):
+        nb = nbformat.read('etc/tests/resources/test-notebookA.ipynb', 4)
+        nb.metadata.kernelspec['name'] = 'test-kernel'
+        assert bootstrapper.NotebookFileOp.find_best_kernel(nb, kernelspec_index) == 'test-kernel'
+        nb.metadata.kernelspec['name'] = 'python3'
+        assert bootstrapper.NotebookFileOp.find_best_kernel(nb, kernelspec_index) == 'python3'
+    assert not os.path.isfile(kernelspec_index.index_file)
+    assert not kernelspec_index.has_kernel('missing-kernel')
+
+
+def test_pinned_kernel_name(monkeypatch, s3_setup, tmpdir):
+    with tmpdir.as_cwd():
+        op = _get_operation_instance(monkeypatch, s3_setup)
+    op.input_params['kernel-name'] = 'pinned-kernel'
+    with mock.patch.object(bootstrapper.NotebookFileOp, 'find_best_kernel', side_effect=AssertionError()):
+        assert op.get_kernel_name() == 'pinned-kernel'
+
+
+def test_phase_scheduler(caplog):
+    caplog.set_level(logging.INFO)
+    scheduler = bootstrapper.PhaseScheduler()
+
+    first = scheduler.submit('first', time.sleep, 0.2)
+    second = scheduler.submit('second', time.sleep, 0.2)
+    scheduler.join(first, second)
+    assert scheduler.run('third', max, 1, 2) == 2
+
+    def fail():
+        raise ValueError("failed phase")
+    failing = scheduler.submit('failing', fail)
+    succeeding = scheduler.submit('succeeding', time.sleep, 0.1)
+    with pytest.raises(ValueError):
+        scheduler.join(failing, succeeding)
+    # the other phases complete nevertheless
+    assert succeeding.done()
+    scheduler.shutdown()
+
+    timeline = {phase: (start, end) for phase, start, end in scheduler.timeline}
+    assert set(timeline.keys()) == {'first', 'second', 'third', 'failing', 'succeeding'}
+    # first and second ran concurrently
+    assert timeline['first'][0] < timeline['second'][1] and timeline['second'][0] < timeline['first'][1]
+    assert timeline['third'][0] >= max(timeline['first'][1], timeline['second'][1])
+
+    scheduler.log_timeline()
+    assert "phase 'first' ran from " in caplog.text
+    assert "less than if run sequentially" in caplog.text
+
+
+def test_retry_policy(monkeypatch):
+    monkeypatch.setenv("ELYRA_UPLOAD_RETRY_ATTEMPTS", "3")
+    monkeypatch.setenv("ELYRA_UPLOAD_RETRY_BACKOFF", "0.01")
+    policy = bootstrapper.RetryPolicy.from_env('upload')
+    assert policy.max_attempts == 3
+
+    # transient errors are retried
+    func = mock.Mock(side_effect=[ConnectionResetError(), urllib3.exceptions.ProtocolError(), 'done'])
+    assert policy.call('test operation', func, 'arg', key='value') == 'done'
+    assert func.call_count == 3
+    func.assert_called_with('arg', key='value')
+
+    # up to the maximum number of attempts
+    func = mock.Mock(side_effect=ConnectionResetError())
+    with pytest.raises(ConnectionResetError):
+        policy.call('test operation', func)
+    assert func.call_count == 3
+
+    # permanent errors are not retried
+    func = mock.Mock(side_effect=FileNotFoundError())
+    with pytest.raises(FileNotFoundError):
+        policy.call('test operation', func)
+    assert func.call_count == 1
+
+
 def test_parse_arguments():
     test_args = ['-e', 'http://test.me.now',
                  '-d', 'test-directory',
                  '-t', 'test-archive.tgz',
                  '-f', 'test-notebook.ipynb',
                  '-b', 'test-bucket',
-                 '-p', '/tmp/lib']
+                 '-p', '/tmp/lib',
+                 '--wheelhouse', '/opt/elyra/wheelhouse',
+                 '--site-packages-snapshot',
+                 '--phase', 'prepare',
+                 '--cache-dir', '/opt/elyra/cache',
+                 '--cache-size-limit', '5Gi',
+                 '--kernel-name', 'python3',
+                 '--html-export', 'fast',
+                 '--externalize-outputs', '1Mi',
+                 '--checkpoint-interval', '60',
+                 '--profile']
     args_dict = bootstrapper.OpUtil.parse_arguments(test_args)
 
     assert args_dict['cos-endpoint'] == 'http://test.me.now'
@@ -706,6 +2111,16 @@ def test_parse_arguments():
     assert args_dict['cos-bucket'] == 'test-bucket'
     assert args_dict['filepath'] == 'test-notebook.ipynb'
     assert args_dict['user-volume-path'] == '/tmp/lib'
+    assert args_dict['wheelhouse'] == '/opt/elyra/wheelhouse'
+    assert args_dict['site-packages-snapshot']
+    assert args_dict['phase'] == 'prepare'
+    assert args_dict['cache-dir'] == '/opt/elyra/cache'
+    assert args_dict['cache-size-limit'] == '5Gi'
+    assert args_dict['kernel-name'] == 'python3'
+    assert args_dict['html-export'] == 'fast'
+    assert args_dict['externalize-outputs'] == '1Mi'
+    assert args_dict['checkpoint-interval'] == '60'
+    assert args_dict['profile']
     assert not args_dict['inputs']
     assert not args_dict['outputs']
 
@@ -15,4 +15,5 @@
 # limitations under the License.
 #
 
+from ._bootstrap_config_map import render_bootstrap_config_map
 from ._notebook_op import NotebookOp
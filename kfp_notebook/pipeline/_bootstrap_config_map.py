@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2018-2021 Elyra Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import argparse
+import os
+import pkgutil
+import sys
+import yaml
+
+from typing import Optional
+
+
+"""
+Renders the manifest of a ConfigMap containing the files that the NotebookOp otherwise downloads
+in each pod, for use with NotebookOp(bootstrap_config_map=...).  Create the ConfigMap in the
+namespace in which the pipelines are run, e.g. using
+    make bootstrap-config-map && kubectl apply -n kubeflow -f dist/elyra-bootstrap-config-map.yaml
+"""
+
+ELYRA_BOOTSTRAP_CONFIG_MAP_NAME = 'elyra-bootstrap'
+
+# Location of the bootstrap files in source distributions and repository clones, installed
+# packages contain them as the package data kfp_notebook/etc/...
+ELYRA_ETC_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, 'etc')
+
+# Keys of the ConfigMap and the files they are rendered from, relative to the etc directory
+BOOTSTRAP_FILES = {
+    'bootstrapper.py': 'docker-scripts/bootstrapper.py',
+    'requirements-elyra.txt': 'requirements-elyra.txt',
+    'pip.conf': 'pip.conf',
+}
+
+
+class _LiteralStyleDumper(yaml.SafeDumper):
+    """Renders multi-line strings, such as the file contents, as literal blocks"""
+
+
+def _represent_str(dumper, data):
+    style = '|' if '\n' in data else None
+    return dumper.represent_scalar('tag:yaml.org,2002:str', data, style=style)
+
+
+_LiteralStyleDumper.add_representer(str, _represent_str)
+
+
+def _read_bootstrap_file(path: str, etc_dir: Optional[str] = None) -> str:
+    if not etc_dir:
+        try:
+            data = pkgutil.get_data('kfp_notebook', 'etc/' + path)
+        except OSError:  # not installed from a distribution, e.g. run from a repository clone
+            data = None
+        if data is not None:
+            return data.decode('utf-8')
+        etc_dir = ELYRA_ETC_DIR
+    with open(os.path.join(etc_dir, *path.split('/')), encoding='utf-8') as f:
+        return f.read()
+
+
+def render_bootstrap_config_map(name: Optional[str] = ELYRA_BOOTSTRAP_CONFIG_MAP_NAME,
+                                namespace: Optional[str] = None,
+                                etc_dir: Optional[str] = None) -> dict:
+    """Returns the ConfigMap manifest containing the bootstrapper files.
+    Args:
+      name: name of the ConfigMap, to be passed as bootstrap_config_map to the NotebookOp
+      namespace: namespace of the ConfigMap, omitted by default
+      etc_dir: directory containing the files, defaults to the files packaged with kfp-notebook
+    """
+    data = {key: _read_bootstrap_file(path, etc_dir) for key, path in BOOTSTRAP_FILES.items()}
+
+    metadata = {'name': name,
+                'labels': {'app.kubernetes.io/part-of': 'elyra'}}
+    if namespace:
+        metadata['namespace'] = namespace
+
+    return {'apiVersion': 'v1',
+            'kind': 'ConfigMap',
+            'metadata': metadata,
+            'data': data}
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Render the manifest of the NotebookOp bootstrap ConfigMap')
+    parser.add_argument('--name', default=ELYRA_BOOTSTRAP_CONFIG_MAP_NAME, help='Name of the ConfigMap')
+    parser.add_argument('--namespace', help='Namespace of the ConfigMap')
+    parser.add_argument('--etc-dir', help='Directory containing the bootstrapper files')
+    parser.add_argument('--output', help='File to write the manifest to, defaults to stdout')
+    parsed_args = parser.parse_args(args)
+
+    manifest = render_bootstrap_config_map(parsed_args.name, parsed_args.namespace, parsed_args.etc_dir)
+    if parsed_args.output:
+        with open(parsed_args.output, 'w') as f:
+            yaml.dump(manifest, f, Dumper=_LiteralStyleDumper, default_flow_style=False, sort_keys=False)
+    else:
+        yaml.dump(manifest, sys.stdout, Dumper=_LiteralStyleDumper, default_flow_style=False, sort_keys=False)
+
+
+if __name__ == '__main__':
+    main()
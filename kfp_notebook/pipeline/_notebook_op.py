@@ -15,12 +15,16 @@
 # limitations under the License.
 #
 
+import json
 import os
 import string
 
-from kfp.dsl import ContainerOp
+from kfp.dsl import ContainerOp, UserContainer
 from kfp_notebook import __version__
+from kubernetes.client.models import V1Affinity, V1LabelSelector, V1PodAffinity, V1PodAffinityTerm
+from kubernetes.client.models import V1ConfigMapVolumeSource
 from kubernetes.client.models import V1EmptyDirVolumeSource, V1EnvVar, V1Volume, V1VolumeMount
+from kubernetes.client.models import V1HostPathVolumeSource, V1WeightedPodAffinityTerm
 from kubernetes.client.models import V1EnvVarSource
 from kubernetes.client.models import V1ObjectFieldSelector
 from typing import Dict, List, Optional
@@ -51,6 +55,34 @@ ELYRA_REQUIREMENTS_URL = os.getenv('ELYRA_REQUIREMENTS_URL', 'https://raw.github
                                                              format(org=ELYRA_GITHUB_ORG,
                                                                     branch=ELYRA_GITHUB_BRANCH))
 
+# Location at which the bootstrap_config_map or bootstrap_volume is mounted
+ELYRA_BOOTSTRAP_MOUNT_PATH = '/opt/elyra/bootstrap/'
+
+
+class _BootstrapInitContainer(UserContainer):
+    """Init container whose environment is that of the operation's container when the pipeline
+    is compiled, including e.g. the credentials added by op.apply(use_aws_secret(...))"""
+
+    def __init__(self, op_container, **kwargs):
+        self._op_container = op_container
+        super().__init__(**kwargs)
+
+    @property
+    def env(self):
+        return self._env if self._env is not None else self._op_container.env
+
+    @env.setter
+    def env(self, env):
+        self._env = env
+
+    @property
+    def env_from(self):
+        return self._env_from if self._env_from is not None else self._op_container.env_from
+
+    @env_from.setter
+    def env_from(self, env_from):
+        self._env_from = env_from
+
 
 class NotebookOp(ContainerOp):
 
@@ -74,6 +106,23 @@ class NotebookOp(ContainerOp):
                  mem_request: Optional[str] = None,
                  gpu_limit: Optional[str] = None,
                  workflow_engine: Optional[str] = 'argo',
+                 cache_host_path: Optional[str] = None,
+                 cache_volume: Optional[V1Volume] = None,
+                 cache_size_limit: Optional[str] = None,
+                 cache_affinity: Optional[bool] = False,
+                 wheelhouse_path: Optional[str] = None,
+                 wheelhouse_volume: Optional[V1Volume] = None,
+                 site_packages_snapshot: Optional[bool] = False,
+                 bootstrap_config_map: Optional[str] = None,
+                 bootstrap_volume: Optional[V1Volume] = None,
+                 init_container_image: Optional[str] = None,
+                 kernel_name: Optional[str] = None,
+                 pin_kernel: Optional[bool] = False,
+                 html_export: Optional[str] = 'full',
+                 externalize_outputs_threshold: Optional[str] = None,
+                 checkpoint_interval: Optional[int] = None,
+                 profile: Optional[bool] = False,
+                 prewarm_kernel: Optional[bool] = False,
                  **kwargs):
         """Create a new instance of ContainerOp.
         Args:
@@ -90,12 +139,55 @@ class NotebookOp(ContainerOp):
           pipeline_inputs: comma delimited list of files to be consumed/are required by the notebook
           pipeline_envs: dictionary of environmental variables to set in the container prior to execution
           requirements_url: URL to a python requirements.txt file to be installed prior to running the notebook
-          bootstrap_script_url: URL to a custom python bootstrap script to run
+          bootstrap_script_url: URL to a custom python bootstrap script to run, or to a bootstrapper zipapp (.pyz)
+                                that bundles its dependencies (see 'make bootstrapper-zipapp'). On Python < 3.7, the
+                                zipapp requires the image to provide a system CA bundle to access HTTPS endpoints
           emptydir_volume_size: Size(GB) of the volume to create for the workspace when using CRIO container runtime
           cpu_request: number of CPUs requested for the operation
           mem_request: memory requested for the operation (in Gi)
           gpu_limit: maximum number of GPUs allowed for the operation
           workflow_engine: Kubeflow workflow engine, defaults to 'argo'
+          cache_host_path: path on the node to mount as cache for object storage objects
+          cache_volume: volume to mount as cache for object storage objects, alternative to cache_host_path
+          cache_size_limit: maximum size of the object cache e.g. 10Gi, defaults to the bootstrapper's limit
+          cache_affinity: prefer scheduling onto nodes running other operations of the same pipeline,
+                          whose cache is likely to contain this operation's inputs
+          wheelhouse_path: directory in the container with the distributions of Elyra's python requirements,
+                           which are then installed without accessing the package index
+          wheelhouse_volume: volume containing the wheelhouse, mounted read-only at wheelhouse_path
+          site_packages_snapshot: restore the python packages installed into the emptydir volume from a snapshot
+                                  in the cos_bucket, which is created by the first operation that installs them
+          bootstrap_config_map: name of a ConfigMap containing bootstrapper.py, requirements-elyra.txt and pip.conf,
+                                which are then used instead of downloading them from the bootstrap_script_url,
+                                requirements_url and ELYRA_PIP_CONFIG_URL. See render_bootstrap_config_map.
+          bootstrap_volume: volume containing these files, alternative to bootstrap_config_map
+          init_container_image: image of an init container that installs the packages and downloads the
+                                dependencies into a workspace volume that it shares with the operation's container,
+                                which then only executes the notebook. The image must provide curl, pip and the
+                                same python version as the operation's image, which does not need curl or pip.
+                                Unless both images are the same, another init container running the operation's
+                                image first lists its installed packages, against which the packages are installed.
+                                If the operation's image provides minio, the bootstrapper then installs it for its
+                                own use if the init container's image lacks it.
+          kernel_name: kernel to execute the notebook with, which the bootstrapper then uses without
+                       determining the best kernel from the kernels installed in the image
+          pin_kernel: use the kernel recorded in the notebook's kernelspec as kernel_name, which requires
+                      the notebook to be readable when the pipeline is compiled
+          html_export: conversion of the executed notebook to html: 'full' (default), 'fast', which renders a
+                       minimal template and uploads the images as separate objects, or 'none' for notebooks
+                       whose html file is not needed
+          externalize_outputs_threshold: size e.g. 1Mi from which outputs of the executed notebook are stored as
+                                         separate objects next to it in the cos_directory, which the outputs
+                                         then reference. The notebook is stored as compact JSON.
+          checkpoint_interval: interval in seconds at which the partially executed notebook is uploaded to the
+                               cos_directory while the notebook is executed, e.g. to follow the progress of long
+                               running notebooks
+          profile: run python scripts under cProfile, whose profile and collapsed stacks (for flame graphs) are
+                   uploaded next to the script's log, and list the functions with the highest cumulative time
+                   in the KFP UI
+          prewarm_kernel: start the notebook's kernel once the notebook was extracted, while the inputs are
+                          downloaded, rather than when the notebook is executed. Not applicable to operations
+                          using an init_container_image, whose container only executes the notebook.
           kwargs: additional key value pairs to pass e.g. name, image, sidecars & is_exit_handler.
                   See Kubeflow pipelines ContainerOp definition for more parameters or how to use
                   https://kubeflow-pipelines.readthedocs.io/en/latest/source/kfp.dsl.html#kfp.dsl.ContainerOp
@@ -122,6 +214,23 @@ class NotebookOp(ContainerOp):
         self.cpu_request = cpu_request
         self.mem_request = mem_request
         self.gpu_limit = gpu_limit
+        self.cache_host_path = cache_host_path
+        self.cache_volume = cache_volume
+        self.cache_size_limit = cache_size_limit
+        self.cache_affinity = cache_affinity
+        self.cache_dir = "/opt/elyra/cache/"
+        self.wheelhouse_path = wheelhouse_path
+        self.wheelhouse_volume = wheelhouse_volume
+        self.site_packages_snapshot = site_packages_snapshot
+        self.bootstrap_config_map = bootstrap_config_map
+        self.bootstrap_volume = bootstrap_volume
+        self.init_container_image = init_container_image
+        self.kernel_name = kernel_name
+        self.html_export = html_export or 'full'
+        self.externalize_outputs_threshold = externalize_outputs_threshold
+        self.checkpoint_interval = checkpoint_interval
+        self.profile = profile
+        self.prewarm_kernel = prewarm_kernel
 
         argument_list = []
 
@@ -134,8 +243,10 @@ class NotebookOp(ContainerOp):
         self.python_user_lib_path = ''
         self.python_user_lib_path_target = ''
         self.python_pip_config_url = ''
+        # The workspace is shared with the init container, if any
+        use_workspace_volume = self.emptydir_volume_size or self.init_container_image
 
-        if self.emptydir_volume_size:
+        if use_workspace_volume:
             self.container_work_dir_root_path = "/opt/app-root/src/"
             self.container_python_dir_name = "python3/"
             self.container_work_dir = self.container_work_dir_root_path + self.container_work_dir_name
@@ -146,6 +257,11 @@ class NotebookOp(ContainerOp):
         if not self.bootstrap_script_url:
             self.bootstrap_script_url = ELYRA_BOOTSTRAP_SCRIPT_URL
 
+        # A zipapp bundles the bootstrapper with the packages it requires to access object storage
+        self.bootstrap_script = 'bootstrapper.py'
+        if self.bootstrap_script_url.endswith('.pyz') and not (bootstrap_config_map or bootstrap_volume):
+            self.bootstrap_script = 'bootstrapper.pyz'
+
         if not self.requirements_url:
             self.requirements_url = ELYRA_REQUIREMENTS_URL
 
@@ -160,42 +276,85 @@ class NotebookOp(ContainerOp):
         if not notebook:
             raise ValueError("You need to provide a notebook.")
 
+        if self.cache_host_path and self.cache_volume:
+            raise ValueError("Only one of cache_host_path and cache_volume can be provided.")
+
+        if self.wheelhouse_volume and not self.wheelhouse_path:
+            raise ValueError("You need to provide the wheelhouse_path to mount the wheelhouse_volume at.")
+
+        if self.site_packages_snapshot and not use_workspace_volume:
+            raise ValueError("Site-packages snapshots require an emptydir_volume_size or init_container_image.")
+
+        if self.init_container_image and 'arguments' in kwargs:
+            raise ValueError("The init_container_image cannot be used with custom arguments.")
+
+        if self.bootstrap_config_map and self.bootstrap_volume:
+            raise ValueError("Only one of bootstrap_config_map and bootstrap_volume can be provided.")
+
+        if self.html_export not in ['full', 'fast', 'none']:
+            raise ValueError("html_export must be one of 'full', 'fast' or 'none'.")
+
+        if pin_kernel and not self.kernel_name and self.notebook.endswith('.ipynb'):
+            self.kernel_name = NotebookOp._read_kernel_name(self.notebook)
+
+        if self.bootstrap_config_map:
+            self.bootstrap_volume = V1Volume(config_map=V1ConfigMapVolumeSource(name=self.bootstrap_config_map),
+                                             name='elyra-bootstrap')
+
         if 'arguments' not in kwargs:
             """ If no arguments are passed, we use our own.
                 If ['arguments'] are set, we assume container's ENTRYPOINT is set and dependencies are installed
                 NOTE: Images being pulled must have python3 available on PATH and cURL utility
             """
 
-            argument_list.append('mkdir -p {container_work_dir} && cd {container_work_dir} && '
-                                 'curl -H "Cache-Control: no-cache" -L {bootscript_url} --output bootstrapper.py && '
-                                 'curl -H "Cache-Control: no-cache" -L {reqs_url} --output requirements-elyra.txt && '
-                                 .format(container_work_dir=self.container_work_dir,
-                                         bootscript_url=self.bootstrap_script_url,
-                                         reqs_url=self.requirements_url)
-                                 )
+            if self.bootstrap_volume:
+                # The bootstrap files are mounted, which avoids downloading them in each pod
+                argument_list.append('mkdir -p {container_work_dir} && cd {container_work_dir} && '
+                                     'cp {mount_path}bootstrapper.py {mount_path}requirements-elyra.txt . && '
+                                     .format(container_work_dir=self.container_work_dir,
+                                             mount_path=ELYRA_BOOTSTRAP_MOUNT_PATH)
+                                     )
 
-            if self.emptydir_volume_size:
-                argument_list.append('mkdir {container_python_dir} && cd {container_python_dir} && '
-                                     'curl -H "Cache-Control: no-cache" -L {python_pip_config_url} '
-                                     '--output pip.conf && cd .. &&'
-                                     .format(python_pip_config_url=self.python_pip_config_url,
-                                             container_python_dir=self.container_python_dir_name)
+                if use_workspace_volume:
+                    argument_list.append('mkdir {container_python_dir} && '
+                                         'cp {mount_path}pip.conf {container_python_dir} && '
+                                         .format(mount_path=ELYRA_BOOTSTRAP_MOUNT_PATH,
+                                                 container_python_dir=self.container_python_dir_name)
+                                         )
+            else:
+                argument_list.append('mkdir -p {container_work_dir} && cd {container_work_dir} && '
+                                     'curl -H "Cache-Control: no-cache" -L {bootscript_url} '
+                                     '--output {bootstrap_script} && '
+                                     'curl -H "Cache-Control: no-cache" -L {reqs_url} '
+                                     '--output requirements-elyra.txt && '
+                                     .format(container_work_dir=self.container_work_dir,
+                                             bootscript_url=self.bootstrap_script_url,
+                                             bootstrap_script=self.bootstrap_script,
+                                             reqs_url=self.requirements_url)
                                      )
 
-            argument_list.append('python3 -m pip install {python_user_lib_path_target} packaging && '
-                                 'python3 -m pip freeze > requirements-current.txt && '
-                                 'python3 bootstrapper.py '
+                if use_workspace_volume:
+                    argument_list.append('mkdir {container_python_dir} && cd {container_python_dir} && '
+                                         'curl -H "Cache-Control: no-cache" -L {python_pip_config_url} '
+                                         '--output pip.conf && cd .. &&'
+                                         .format(python_pip_config_url=self.python_pip_config_url,
+                                                 container_python_dir=self.container_python_dir_name)
+                                         )
+
+            setup_arguments = "".join(argument_list)
+            argument_list = []
+            argument_list.append('python3 {bootstrap_script} '
                                  '--cos-endpoint {cos_endpoint} '
                                  '--cos-bucket {cos_bucket} '
                                  '--cos-directory "{cos_directory}" '
                                  '--cos-dependencies-archive "{cos_dependencies_archive}" '
                                  '--file "{notebook}" '
-                                 .format(cos_endpoint=self.cos_endpoint,
+                                 .format(bootstrap_script=self.bootstrap_script,
+                                         cos_endpoint=self.cos_endpoint,
                                          cos_bucket=self.cos_bucket,
                                          cos_directory=self.cos_directory,
                                          cos_dependencies_archive=self.cos_dependencies_archive,
-                                         notebook=self.notebook,
-                                         python_user_lib_path_target=self.python_user_lib_path_target)
+                                         notebook=self.notebook)
                                  )
 
             if self.pipeline_inputs:
@@ -206,11 +365,54 @@ class NotebookOp(ContainerOp):
                 outputs_str = self._artifact_list_to_str(self.pipeline_outputs)
                 argument_list.append('--outputs "{}" '.format(outputs_str))
 
-            if self.emptydir_volume_size:
+            if use_workspace_volume:
                 argument_list.append('--user-volume-path "{}" '.format(self.python_user_lib_path))
+                if self.site_packages_snapshot:
+                    argument_list.append('--site-packages-snapshot ')
+
+            if self.wheelhouse_path:
+                argument_list.append('--wheelhouse "{}" '.format(self.wheelhouse_path))
+
+            if self.cache_host_path or self.cache_volume:
+                argument_list.append('--cache-dir "{}" '.format(self.cache_dir))
+                if self.cache_size_limit:
+                    argument_list.append('--cache-size-limit "{}" '.format(self.cache_size_limit))
+
+            if self.kernel_name:
+                argument_list.append('--kernel-name "{}" '.format(self.kernel_name))
+
+            if self.html_export != 'full':
+                argument_list.append('--html-export "{}" '.format(self.html_export))
+
+            if self.externalize_outputs_threshold:
+                argument_list.append('--externalize-outputs "{}" '.format(self.externalize_outputs_threshold))
+
+            if self.checkpoint_interval:
+                argument_list.append('--checkpoint-interval "{}" '.format(self.checkpoint_interval))
+
+            if self.profile:
+                argument_list.append('--profile ')
 
             kwargs['command'] = ['sh', '-c']
-            kwargs['arguments'] = "".join(argument_list)
+            if self.init_container_image:
+                # The init containers prepare the workspace, which the operation's container executes in
+                workspace_arguments = 'cd {container_work_dir} && {bootstrapper_arguments}'.format(
+                    container_work_dir=self.container_work_dir, bootstrapper_arguments="".join(argument_list))
+                if self.init_container_image == kwargs['image']:
+                    self.init_container_specs = [('elyra-bootstrap', self.init_container_image,
+                                                  setup_arguments + "".join(argument_list) + '--phase prepare ')]
+                else:
+                    # Packages that are missing or outdated in the operation's image are installed, not
+                    # those missing or outdated in the init container's image, which may well differ
+                    self.init_container_specs = [('elyra-bootstrap-setup', self.init_container_image,
+                                                  setup_arguments + ' true'),
+                                                 ('elyra-bootstrap-inventory', kwargs['image'],
+                                                  workspace_arguments + '--phase inventory '),
+                                                 ('elyra-bootstrap', self.init_container_image,
+                                                  workspace_arguments + '--phase prepare ')]
+                kwargs['arguments'] = workspace_arguments + '--phase execute '
+            else:
+                kwargs['arguments'] = setup_arguments + "".join(argument_list)
 
         super().__init__(**kwargs)
 
@@ -220,9 +422,12 @@ class NotebookOp(ContainerOp):
             for key, value in self.pipeline_envs.items():  # Convert dict entries to format kfp needs
                 self.container.add_env_variable(V1EnvVar(name=key, value=value))
 
+        if self.prewarm_kernel:
+            self.container.add_env_variable(V1EnvVar(name='ELYRA_PREWARM_KERNEL', value='true'))
+
         # If crio volume size is found then assume kubeflow pipelines environment is using CRI-o as
         # its container runtime
-        if self.emptydir_volume_size:
+        if use_workspace_volume:
             self.add_volume(V1Volume(empty_dir=V1EmptyDirVolumeSource(
                                      medium="",
                                      size_limit=self.emptydir_volume_size),
@@ -235,6 +440,47 @@ class NotebookOp(ContainerOp):
             self.container.add_env_variable(V1EnvVar(name='PYTHONPATH',
                                                      value=self.python_user_lib_path))
 
+        # The object cache is shared by all operations that run on the same node
+        if self.cache_host_path or self.cache_volume:
+            if not self.cache_volume:
+                self.cache_volume = V1Volume(host_path=V1HostPathVolumeSource(path=self.cache_host_path,
+                                                                              type='DirectoryOrCreate'),
+                                             name='elyra-cache')
+            self.add_volume(self.cache_volume)
+            self.container.add_volume_mount(V1VolumeMount(mount_path=self.cache_dir,
+                                                          name=self.cache_volume.name))
+
+        if self.bootstrap_volume:
+            self.add_volume(self.bootstrap_volume)
+            self.container.add_volume_mount(V1VolumeMount(mount_path=ELYRA_BOOTSTRAP_MOUNT_PATH,
+                                                          name=self.bootstrap_volume.name,
+                                                          read_only=True))
+
+        if self.wheelhouse_volume:
+            self.add_volume(self.wheelhouse_volume)
+            self.container.add_volume_mount(V1VolumeMount(mount_path=self.wheelhouse_path,
+                                                          name=self.wheelhouse_volume.name,
+                                                          read_only=True))
+
+        if self.cache_affinity:
+            pipeline_label = NotebookOp._normalize_label_value(self.pipeline_name)
+            self.add_affinity(V1Affinity(pod_affinity=V1PodAffinity(
+                preferred_during_scheduling_ignored_during_execution=[V1WeightedPodAffinityTerm(
+                    weight=100,
+                    pod_affinity_term=V1PodAffinityTerm(
+                        label_selector=V1LabelSelector(match_labels={'elyra/pipeline-name': pipeline_label}),
+                        topology_key='kubernetes.io/hostname'))])))
+
+        if self.init_container_image:
+            for name, image, args in self.init_container_specs:
+                # e.g. the object storage credentials and PYTHONPATH
+                self.add_init_container(_BootstrapInitContainer(self.container,
+                                                                name=name,
+                                                                image=image,
+                                                                command=['sh', '-c'],
+                                                                args=args,
+                                                                mirror_volume_mounts=True))
+
         if self.cpu_request:
             self.container.set_cpu_request(cpu=str(cpu_request))
 
@@ -296,6 +542,20 @@ class NotebookOp(ContainerOp):
             trimmed_artifact_list.append(artifact_name.strip())
         return INOUT_SEPARATOR.join(trimmed_artifact_list)
 
+    @staticmethod
+    def _read_kernel_name(notebook_path):
+        """Returns the name of the kernel recorded in the notebook's kernelspec"""
+        try:
+            with open(notebook_path) as f:
+                notebook = json.load(f)
+        except (OSError, ValueError) as ex:
+            raise ValueError("Unable to read the kernel of notebook '{}': {}".format(notebook_path, ex))
+
+        kernel_name = notebook.get('metadata', {}).get('kernelspec', {}).get('name')
+        if not kernel_name:
+            raise ValueError("Notebook '{}' does not specify a kernel.".format(notebook_path))
+        return kernel_name
+
     @staticmethod
     def _normalize_label_value(value):
 
@@ -0,0 +1,63 @@
+#
+# Copyright 2018-2021 Elyra Authors
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+from kfp_notebook.pipeline import render_bootstrap_config_map
+from kfp_notebook.pipeline._bootstrap_config_map import main
+import json
+import os
+import subprocess
+import sys
+import yaml
+
+
+def test_render_bootstrap_config_map():
+    manifest = render_bootstrap_config_map(namespace="kubeflow")
+    assert manifest['kind'] == 'ConfigMap'
+    assert manifest['metadata']['name'] == 'elyra-bootstrap'
+    assert manifest['metadata']['namespace'] == 'kubeflow'
+    assert sorted(manifest['data'].keys()) == ['bootstrapper.py', 'pip.conf', 'requirements-elyra.txt']
+    with open(os.path.join("etc", "docker-scripts", "bootstrapper.py")) as f:
+        assert manifest['data']['bootstrapper.py'] == f.read()
+
+
+def test_render_bootstrap_config_map_file(tmpdir):
+    output_file = tmpdir.join("config-map.yaml")
+    main(['--name', 'test-bootstrap', '--output', str(output_file)])
+    with open(output_file) as f:
+        manifest = yaml.safe_load(f)
+    assert manifest == render_bootstrap_config_map(name='test-bootstrap')
+
+
+def test_render_bootstrap_config_map_from_package_data(tmpdir):
+    # build the package as it is installed, without the etc directory of the source tree
+    build_lib = tmpdir.join("build")
+    subprocess.run([sys.executable, "setup.py", "-q", "build_py", "--build-lib", str(build_lib)],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    assert not build_lib.join("etc").exists()
+    assert build_lib.join("kfp_notebook", "etc", "docker-scripts", "bootstrapper.py").isfile()
+
+    script = ("import json, kfp_notebook\n"
+              "from kfp_notebook.pipeline import render_bootstrap_config_map\n"
+              "print(json.dumps([kfp_notebook.__file__, render_bootstrap_config_map()]))\n")
+    result = subprocess.run([sys.executable, "-c", script], cwd=str(tmpdir), check=True,
+                            stdout=subprocess.PIPE, env=dict(os.environ, PYTHONPATH=str(build_lib)))
+    package_file, manifest = json.loads(result.stdout)
+    assert package_file.startswith(str(build_lib))
+    assert manifest == render_bootstrap_config_map()
+    for key, path in [('bootstrapper.py', 'docker-scripts/bootstrapper.py'),
+                      ('requirements-elyra.txt', 'requirements-elyra.txt'),
+                      ('pip.conf', 'pip.conf')]:
+        with open(os.path.join("etc", path)) as f:
+            assert manifest['data'][key] == f.read()
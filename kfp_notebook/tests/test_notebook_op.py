@@ -13,7 +13,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 #
+from kfp.aws import use_aws_secret
+from kfp.compiler._op_to_template import _op_to_template
 from kfp_notebook.pipeline import NotebookOp
+from kubernetes.client.models import V1ConfigMapEnvSource, V1EnvFromSource, V1Volume
+import json
 import pytest
 import string
 
@@ -211,6 +215,331 @@ def test_user_crio_volume_creation():
     assert notebook_op.container.env.__len__() == 2, notebook_op.container.env
 
 
+def test_cache_host_path_volume_creation():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             cache_host_path="/var/cache/elyra",
+                             cache_size_limit="5Gi",
+                             cache_affinity=True)
+    assert notebook_op.volumes[0].host_path.path == "/var/cache/elyra"
+    assert notebook_op.container.volume_mounts[0].mount_path == "/opt/elyra/cache/"
+    assert notebook_op.container.volume_mounts[0].name == notebook_op.volumes[0].name
+    assert '--cache-dir "/opt/elyra/cache/" --cache-size-limit "5Gi" ' in notebook_op.container.args[0]
+    affinity_term = notebook_op.affinity.pod_affinity.preferred_during_scheduling_ignored_during_execution[0]
+    assert affinity_term.pod_affinity_term.label_selector.match_labels == {'elyra/pipeline-name': 'test-pipeline'}
+
+
+def test_construct_without_cache(notebook_op):
+    assert not notebook_op.volumes
+    assert '--cache-dir' not in notebook_op.container.args[0]
+    assert not notebook_op.affinity
+
+
+def test_fail_with_cache_host_path_and_volume():
+    with pytest.raises(ValueError):
+        NotebookOp(name="test",
+                   pipeline_name="test-pipeline",
+                   experiment_name="experiment-name",
+                   notebook="test_notebook.ipynb",
+                   cos_endpoint="http://testserver:32525",
+                   cos_bucket="test_bucket",
+                   cos_directory="test_directory",
+                   cos_dependencies_archive="test_archive.tgz",
+                   image="test/image:dev",
+                   cache_host_path="/var/cache/elyra",
+                   cache_volume=V1Volume(name="cache"))
+
+
+def test_wheelhouse_volume_creation():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             wheelhouse_path="/opt/elyra/wheelhouse",
+                             wheelhouse_volume=V1Volume(name="wheelhouse"))
+    assert '--wheelhouse "/opt/elyra/wheelhouse" ' in notebook_op.container.args[0]
+    assert notebook_op.volumes[0].name == "wheelhouse"
+    assert notebook_op.container.volume_mounts[0].mount_path == "/opt/elyra/wheelhouse"
+    assert notebook_op.container.volume_mounts[0].read_only
+
+
+def test_fail_with_wheelhouse_volume_without_path():
+    with pytest.raises(ValueError):
+        NotebookOp(name="test",
+                   pipeline_name="test-pipeline",
+                   experiment_name="experiment-name",
+                   notebook="test_notebook.ipynb",
+                   cos_endpoint="http://testserver:32525",
+                   cos_bucket="test_bucket",
+                   cos_directory="test_directory",
+                   cos_dependencies_archive="test_archive.tgz",
+                   image="test/image:dev",
+                   wheelhouse_volume=V1Volume(name="wheelhouse"))
+
+
+def test_site_packages_snapshot():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             emptydir_volume_size='20Gi',
+                             site_packages_snapshot=True)
+    assert '--user-volume-path "/opt/app-root/src/jupyter-work-dir/python3/" --site-packages-snapshot ' \
+        in notebook_op.container.args[0]
+
+    with pytest.raises(ValueError):
+        NotebookOp(name="test",
+                   pipeline_name="test-pipeline",
+                   experiment_name="experiment-name",
+                   notebook="test_notebook.ipynb",
+                   cos_endpoint="http://testserver:32525",
+                   cos_bucket="test_bucket",
+                   cos_directory="test_directory",
+                   cos_dependencies_archive="test_archive.tgz",
+                   image="test/image:dev",
+                   site_packages_snapshot=True)
+
+
+def test_bootstrap_config_map():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             emptydir_volume_size='20Gi',
+                             bootstrap_config_map="elyra-bootstrap")
+    assert 'curl' not in notebook_op.container.args[0]
+    assert 'cp /opt/elyra/bootstrap/bootstrapper.py /opt/elyra/bootstrap/requirements-elyra.txt . && ' \
+           'mkdir python3/ && cp /opt/elyra/bootstrap/pip.conf python3/ && python3 bootstrapper.py ' \
+        in notebook_op.container.args[0]
+    bootstrap_volume = [volume for volume in notebook_op.volumes if volume.config_map][0]
+    assert bootstrap_volume.config_map.name == "elyra-bootstrap"
+    assert "/opt/elyra/bootstrap/" in [volume_mount.mount_path for volume_mount in notebook_op.container.volume_mounts]
+
+
+def test_init_container_bootstrap():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             pipeline_envs={"AWS_ACCESS_KEY_ID": "test-key"},
+                             image="test/image:dev",
+                             init_container_image="python:3.8-slim")
+    setup_container, inventory_container, init_container = notebook_op.init_containers
+    assert setup_container.image == "python:3.8-slim"
+    assert 'curl' in setup_container.args[0]
+    assert 'bootstrapper.py --cos-endpoint' not in setup_container.args[0]
+
+    # the packages of the operation's image are listed in the workspace
+    assert inventory_container.image == "test/image:dev"
+    assert inventory_container.args[0].startswith('cd /opt/app-root/src/jupyter-work-dir/ && '
+                                                  'python3 bootstrapper.py ')
+    assert inventory_container.args[0].endswith('--phase inventory ')
+    assert 'curl' not in inventory_container.args[0]
+
+    # before the init container prepares the workspace
+    assert init_container.image == "python:3.8-slim"
+    assert init_container.mirror_volume_mounts
+    assert '--user-volume-path "/opt/app-root/src/jupyter-work-dir/python3/" --phase prepare ' \
+        in init_container.args[0]
+    for container in notebook_op.init_containers:
+        assert {"AWS_ACCESS_KEY_ID", "PYTHONPATH"} <= {env_var.name for env_var in container.env}
+
+    # the operation's container executes in the shared workspace
+    assert notebook_op.container.args[0].startswith('cd /opt/app-root/src/jupyter-work-dir/ && '
+                                                    'python3 bootstrapper.py ')
+    assert notebook_op.container.args[0].endswith('--phase execute ')
+    assert 'curl' not in notebook_op.container.args[0]
+    assert notebook_op.volumes[0].name == "workspace"
+    assert notebook_op.container.volume_mounts[0].mount_path == "/opt/app-root/src/"
+
+    # the init containers share the environment of the operation's container,
+    # including the environment that is added once the operation was created
+    notebook_op.apply(use_aws_secret(secret_name="test-secret"))
+    notebook_op.container.add_env_from(V1EnvFromSource(config_map_ref=V1ConfigMapEnvSource(name="test-config")))
+    template = _op_to_template(notebook_op)
+    for container in template['initContainers']:
+        assert {"AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "PYTHONPATH"} <= \
+            {env_var['name'] for env_var in container['env']}
+        assert container['envFrom'] == [{'configMapRef': {'name': 'test-config'}}]
+    assert template['initContainers'][0]['env'] == template['container']['env']
+
+    # an init container running the operation's image prepares the workspace by itself
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             init_container_image="test/image:dev")
+    assert len(notebook_op.init_containers) == 1
+    init_container = notebook_op.init_containers[0]
+    assert 'curl' in init_container.args[0]
+    assert init_container.args[0].endswith('--phase prepare ')
+
+
+def test_kernel_name(tmpdir):
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             kernel_name="python3")
+    assert '--kernel-name "python3" ' in notebook_op.container.args[0]
+
+    with tmpdir.as_cwd():
+        with open("test_notebook.ipynb", "w") as f:
+            json.dump({"metadata": {"kernelspec": {"name": "test-kernel", "language": "python"}}}, f)
+        notebook_op = NotebookOp(name="test",
+                                 pipeline_name="test-pipeline",
+                                 experiment_name="experiment-name",
+                                 notebook="test_notebook.ipynb",
+                                 cos_endpoint="http://testserver:32525",
+                                 cos_bucket="test_bucket",
+                                 cos_directory="test_directory",
+                                 cos_dependencies_archive="test_archive.tgz",
+                                 image="test/image:dev",
+                                 pin_kernel=True)
+        assert '--kernel-name "test-kernel" ' in notebook_op.container.args[0]
+
+        with pytest.raises(ValueError):
+            NotebookOp(name="test",
+                       pipeline_name="test-pipeline",
+                       experiment_name="experiment-name",
+                       notebook="missing_notebook.ipynb",
+                       cos_endpoint="http://testserver:32525",
+                       cos_bucket="test_bucket",
+                       cos_directory="test_directory",
+                       cos_dependencies_archive="test_archive.tgz",
+                       image="test/image:dev",
+                       pin_kernel=True)
+
+
+def test_html_export(notebook_op):
+    assert '--html-export' not in notebook_op.container.args[0]
+
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             html_export="fast")
+    assert '--html-export "fast" ' in notebook_op.container.args[0]
+
+    with pytest.raises(ValueError):
+        NotebookOp(name="test",
+                   pipeline_name="test-pipeline",
+                   experiment_name="experiment-name",
+                   notebook="test_notebook.ipynb",
+                   cos_endpoint="http://testserver:32525",
+                   cos_bucket="test_bucket",
+                   cos_directory="test_directory",
+                   cos_dependencies_archive="test_archive.tgz",
+                   image="test/image:dev",
+                   html_export="pdf")
+
+
+def test_externalize_outputs(notebook_op):
+    assert '--externalize-outputs' not in notebook_op.container.args[0]
+
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             externalize_outputs_threshold="1Mi")
+    assert '--externalize-outputs "1Mi" ' in notebook_op.container.args[0]
+
+
+def test_checkpoint_interval(notebook_op):
+    assert '--checkpoint-interval' not in notebook_op.container.args[0]
+
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             checkpoint_interval=300)
+    assert '--checkpoint-interval "300" ' in notebook_op.container.args[0]
+
+
+def test_profile(notebook_op):
+    assert '--profile' not in notebook_op.container.args[0]
+
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_script.py",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             profile=True)
+    assert '--profile ' in notebook_op.container.args[0]
+
+
+def test_prewarm_kernel(notebook_op):
+    assert 'ELYRA_PREWARM_KERNEL' not in {env_var.name for env_var in notebook_op.container.env}
+
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             prewarm_kernel=True)
+    assert {'name': 'ELYRA_PREWARM_KERNEL', 'value': 'true'} in \
+        [{'name': env_var.name, 'value': env_var.value} for env_var in notebook_op.container.env]
+
+
 @pytest.mark.skip(reason="not sure if we should even test this")
 def test_default_bootstrap_url(notebook_op):
     assert notebook_op.bootstrap_script_url == \
@@ -231,6 +560,23 @@ def test_override_bootstrap_url():
     assert notebook_op.bootstrap_script_url == "https://test.server.com/bootscript.py"
 
 
+def test_bootstrapper_zipapp_url():
+    notebook_op = NotebookOp(name="test",
+                             pipeline_name="test-pipeline",
+                             experiment_name="experiment-name",
+                             notebook="test_notebook.ipynb",
+                             cos_endpoint="http://testserver:32525",
+                             cos_bucket="test_bucket",
+                             cos_directory="test_directory",
+                             cos_dependencies_archive="test_archive.tgz",
+                             image="test/image:dev",
+                             bootstrap_script_url="https://test.server.here/bootstrapper.pyz")
+    assert '-L https://test.server.here/bootstrapper.pyz --output bootstrapper.pyz && ' \
+        in notebook_op.container.args[0]
+    assert 'python3 bootstrapper.pyz --cos-endpoint' in notebook_op.container.args[0]
+    assert 'pip' not in notebook_op.container.args[0]
+
+
 @pytest.mark.skip(reason="not sure if we should even test this")
 def test_default_requirements_url(notebook_op):
     assert notebook_op.requirements_url == \
@@ -17,7 +17,10 @@
 
 """The setup script."""
 
+import os
+
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 
 with open('README.md') as readme_file:
     readme = readme_file.read()
@@ -38,7 +41,28 @@ setup_requirements = [ ]
 
 test_requirements = [ ]
 
+# Bootstrapper files that are packaged as kfp_notebook/etc/..., relative to the etc directory
+bootstrap_files = [
+    'docker-scripts/bootstrapper.py',
+    'requirements-elyra.txt',
+    'pip.conf',
+]
+
+
+class BuildPyCommand(build_py):
+    """Adds the bootstrapper files to the kfp_notebook package, from which
+    render_bootstrap_config_map renders the bootstrap ConfigMap"""
+
+    def run(self):
+        super().run()
+        for path in bootstrap_files:
+            target_dir = os.path.join(self.build_lib, 'kfp_notebook', 'etc', os.path.dirname(path))
+            self.mkpath(target_dir)
+            self.copy_file(os.path.join('etc', path), target_dir)
+
+
 setup(
+    cmdclass={'build_py': BuildPyCommand},
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',